@@ -1,11 +1,25 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
+import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
-app = FastAPI(title="TripSync Backend API", version="1.0.0")
+from utils.serialization import MongoJSONResponse
+from utils.rate_limit import RATE_LIMIT, RateLimitMiddleware
+from utils.compression import COMPRESS, CompressionMiddleware
+
+# server.py builds indexes once before starting its workers and sets this to 0
+ENSURE_INDEXES = os.getenv("ENSURE_INDEXES", "1") == "1"
+
+# orjson-backed responses: ObjectId/datetime encoded directly (utils/serialization.py)
+app = FastAPI(title="TripSync Backend API", version="1.0.0", default_response_class=MongoJSONResponse)
+
+# Rate limiting (RATE_LIMIT=0 disables); added first so it runs inside
+# CORS and 429 responses still carry the CORS headers
+if RATE_LIMIT:
+    app.add_middleware(RateLimitMiddleware)
 
 # CORS
 app.add_middleware(
@@ -16,11 +30,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-
-
+# br/gzip for bodies over COMPRESS_MIN_SIZE (COMPRESS=0 disables); outside
+# CORS so every response passes through it, inside metrics so its cost is timed
+if COMPRESS:
+    app.add_middleware(CompressionMiddleware)
 
 # Import Routes
-from routes import auth_routes, package_routes, booking_routes, external_routes, admin_routes
+from database.db_connection import close_client
+from database.indexes import ensure_indexes
+from database.repositories import packages_repo
+from utils.search_index import search_index
+from utils.http_client import external_client
+from utils.hashing import hashing_pool
+from utils.payment_worker import payment_worker, PAYMENT_DRAIN_TIMEOUT
+from utils.event_bus import event_bus, EVENT_DRAIN_TIMEOUT
+import utils.event_handlers  # registers the event subscribers
+from utils.cache import catalog_cache
+from utils.jwt_helper import token_cache
+from utils.metrics import METRICS, MetricsMiddleware, FuncMetric, metrics_endpoint, registry
+from routes import auth_routes, package_routes, booking_routes, external_routes, admin_routes, stats_routes, health_routes
 
 # Mount Routes
 app.include_router(auth_routes.router, prefix="/api/auth", tags=["Auth"])
@@ -28,10 +56,54 @@ app.include_router(package_routes.router, prefix="/api/packages", tags=["Package
 app.include_router(booking_routes.router, prefix="/api/bookings", tags=["Bookings"])
 app.include_router(external_routes.router, prefix="/api/external", tags=["External APIs"])
 app.include_router(admin_routes.router, prefix="/api/admin", tags=["Admin"])
+app.include_router(stats_routes.router, prefix="/api/admin/stats", tags=["Admin Stats"])
+app.include_router(health_routes.router, prefix="/health", tags=["Health"])
+
+# --------------------------
+# Metrics (METRICS=0 disables)
+# --------------------------
+if METRICS:
+    app.add_middleware(MetricsMiddleware)
+    app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
+
+    for name, help, fn, kind in [
+        ("catalog_cache_hits_total", "Catalog cache hits", lambda: catalog_cache.hits, "counter"),
+        ("catalog_cache_misses_total", "Catalog cache misses", lambda: catalog_cache.misses, "counter"),
+        ("jwt_cache_hits_total", "Verified-token cache hits", lambda: token_cache.hits, "counter"),
+        ("jwt_cache_misses_total", "Verified-token cache misses", lambda: token_cache.misses, "counter"),
+        ("password_hash_pending", "Hash/verify operations running or queued", lambda: hashing_pool.pending, "gauge"),
+        ("password_hash_rejected_total", "Hash/verify operations rejected as overloaded", lambda: hashing_pool.rejected, "counter"),
+        ("payment_queue_depth", "Bookings waiting for the payment worker",
+         lambda: payment_worker.queue.qsize() if payment_worker.queue else 0, "gauge"),
+        ("events_published_total", "Events published by request handlers", lambda: event_bus.published, "counter"),
+        ("event_queue_depth", "Events waiting for their subscribers",
+         lambda: event_bus.queue.qsize() if event_bus.queue else 0, "gauge"),
+        ("event_handler_failures_total", "Event subscriber calls that raised", lambda: event_bus.failures, "counter"),
+    ]:
+        registry.register(FuncMetric(name, help, fn, kind))
+
+@app.on_event("startup")
+async def startup():
+    if ENSURE_INDEXES:
+        await ensure_indexes()
+    await search_index.rebuild(packages_repo)
+    payment_worker.start()
+    await payment_worker.recover()
+    event_bus.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    # runs after the server has stopped accepting and in-flight requests finished
+    await payment_worker.stop(drain_timeout=PAYMENT_DRAIN_TIMEOUT)
+    await event_bus.stop(drain_timeout=EVENT_DRAIN_TIMEOUT)
+    await external_client.aclose()
+    hashing_pool.shutdown()
+    close_client()
 
 @app.get("/")
 def root():
     return {"message": "TripSync Backend Running"}
 
+# dev server with auto-reload; production runs `python server.py`
 if __name__ == "__main__":
     uvicorn.run("app:app", host="0.0.0.0", port=8000, reload=True)
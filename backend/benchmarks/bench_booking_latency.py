@@ -0,0 +1,105 @@
+"""
+Booking latency with a slow payment gateway.
+
+Payments run in the background worker, so POST /api/bookings/ should
+return in roughly the same time whatever the gateway latency is. The
+script books N times, reports POST latency percentiles, then polls the
+payment status endpoint until every booking is settled.
+
+Usage (from backend/):
+    # in-process against the mongomock stand-in, 500 ms simulated gateway
+    MONGO_URI=mongomock:// PAYMENT_MOCK_LATENCY=0.5 python -m benchmarks.bench_booking_latency --in-process
+
+    # against a running API (start it with PAYMENT_MOCK_LATENCY set)
+    python -m benchmarks.bench_booking_latency --base-url http://127.0.0.1:8000 --requests 200
+"""
+import argparse
+import asyncio
+import collections
+import os
+import statistics
+import time
+import uuid
+
+import httpx
+
+
+async def login(http, email, role):
+    await http.post("/api/auth/register", json={"name": email, "email": email, "password": "pw", "role": role})
+    res = await http.post("/api/auth/login", json={"email": email, "password": "pw"})
+    return {"Authorization": f"Bearer {res.json()['access_token']}"}
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+async def timed_post(http, url, payload, headers):
+    start = time.perf_counter()
+    res = await http.post(url, json=payload, headers=headers)
+    return res, (time.perf_counter() - start) * 1000
+
+
+async def run(http, requests, concurrency):
+    suffix = uuid.uuid4().hex[:8]
+    admin = await login(http, f"bench-admin-{suffix}@tripsync.com", "admin")
+    agent = await login(http, f"bench-agent-{suffix}@tripsync.com", "travel_partner")
+    traveler = await login(http, f"bench-traveler-{suffix}@tripsync.com", "traveler")
+
+    pkg = {"title": "Latency", "description": "bench", "location": "Goa", "price": 100, "days": 1}
+    res = await http.post("/api/packages/", json=pkg, headers=agent)
+    package_id = res.json()["package"]["id"]
+    await http.patch(f"/api/packages/{package_id}/approve", headers=admin)
+
+    sem = asyncio.Semaphore(concurrency)
+    booking = {"package_id": package_id, "date": "2030-01-01", "persons": 1}
+
+    async def one():
+        async with sem:
+            return await timed_post(http, "/api/bookings/", booking, traveler)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*[one() for _ in range(requests)])
+    elapsed = time.perf_counter() - started
+
+    latencies = [ms for _, ms in results]
+    print(f"POST /api/bookings/  n={requests} concurrency={concurrency} "
+          f"rps={requests / elapsed:.0f} p50={statistics.median(latencies):.1f}ms "
+          f"p95={percentile(latencies, 0.95):.1f}ms p99={percentile(latencies, 0.99):.1f}ms")
+
+    # wait for the worker to settle every payment
+    ids = [r.json()["booking"]["id"] for r, _ in results if r.status_code == 200]
+    while True:
+        statuses = await asyncio.gather(*[
+            http.get(f"/api/bookings/{booking_id}/payment", headers=traveler) for booking_id in ids
+        ])
+        counts = collections.Counter(s.json()["payment_status"] for s in statuses)
+        if not counts.keys() & {"pending", "processing"}:
+            break
+        await asyncio.sleep(0.2)
+    print(f"settled after {time.perf_counter() - started:.1f}s: {dict(counts)}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Booking latency benchmark")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--in-process", action="store_true")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.in_process:
+        os.environ.setdefault("RATE_LIMIT", "0")   # one client would hit the booking limit
+        from app import app
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as http:
+            await run(http, args.requests, args.concurrency)
+    else:
+        limits = httpx.Limits(max_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as http:
+            await run(http, args.requests, args.concurrency)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
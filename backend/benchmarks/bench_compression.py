@@ -0,0 +1,79 @@
+"""
+Bytes on the wire and server CPU for a repeat catalog fetch.
+
+Serves one catalog page of N packages through CatalogCache (memory
+backend, no Mongo) and reports, per request, the mean time inside
+respond() and the body size for:
+
+  identity     cache hit, uncompressed
+  gzip / br    cache hit, pre-compressed variant
+  304          If-None-Match with the version ETag (no lookup at all)
+
+plus the one-off cost of compressing the page (paid once per catalog
+version and encoding, on the first miss).
+
+Usage (from backend/):
+    python -m benchmarks.bench_compression --packages 1000 --requests 2000
+"""
+import argparse
+import asyncio
+import time
+from starlette.requests import Request
+from benchmarks.bench_serialization import make_docs
+from utils.cache import CatalogCache, MemoryBackend
+from utils.compression import compress, supported_encodings
+from utils.serialization import dumps, serialize_doc
+
+
+def make_request(headers):
+    return Request({
+        "type": "http", "method": "GET", "path": "/api/packages/", "query_string": b"",
+        "headers": [(k.encode(), v.encode()) for k, v in headers.items()],
+    })
+
+
+async def measure(cache, key, items, headers, requests):
+    async def build():
+        return items
+
+    request = make_request(headers)
+    response = await cache.respond(request, key, build, etag=cache.list_etag(key))   # warm
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = await cache.respond(request, key, build, etag=cache.list_etag(key))
+    return (time.perf_counter() - start) / requests, response
+
+
+async def run(packages, requests):
+    items = [serialize_doc(d) for d in make_docs(packages)]
+    body = dumps(items)
+    cache = CatalogCache(MemoryBackend(), ttl=3600, enabled=True)
+    key = await cache.list_key(limit=packages)
+    etag = cache.list_etag(key)
+
+    print(f"{packages} packages, {len(body) / 1e3:.1f} kB JSON, mean of {requests} requests")
+    cases = [("identity", {})]
+    cases += [(enc, {"accept-encoding": enc}) for enc in supported_encodings()]
+    cases += [("304", {"accept-encoding": "gzip, br", "if-none-match": etag})]
+    for name, headers in cases:
+        seconds, response = await measure(cache, key, items, headers, requests)
+        size = len(response.body)
+        print(f"  {name:9s} {seconds * 1e6:8.1f} us  {size / 1e3:8.1f} kB  ({response.status_code})")
+
+    for enc in supported_encodings():
+        start = time.perf_counter()
+        compressed = compress(body, enc)
+        print(f"  compress {enc:5s} once: {(time.perf_counter() - start) * 1000:.1f} ms, "
+              f"ratio {len(body) / len(compressed):.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compression / conditional GET benchmark")
+    parser.add_argument("--packages", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(run(args.packages, args.requests))
+
+
+if __name__ == "__main__":
+    main()
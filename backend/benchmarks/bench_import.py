@@ -0,0 +1,83 @@
+"""
+Bulk import throughput.
+
+Generates N synthetic packages as NDJSON (and optionally CSV) and runs
+them through utils.package_import twice: the first pass inserts, the
+second updates every row in place via the natural-key upsert.
+
+Usage (from backend/):
+    python -m benchmarks.bench_import --rows 100000
+    python -m benchmarks.bench_import --rows 100000 --format csv --batch-size 2000
+"""
+import argparse
+import asyncio
+import csv
+import io
+import json
+import random
+import uuid
+
+from database.repositories import packages_repo
+from utils.package_import import parse_rows, import_packages
+
+CITIES = ["Goa", "Manali", "Jaipur", "Kerala", "Dubai", "Bali", "Paris", "Phuket"]
+CATEGORIES = ["packages", "hotels", "Adventure", "Luxury", "Family"]
+
+
+def make_rows(n, owner):
+    for i in range(n):
+        yield {
+            "title": f"Bench package {i}",
+            "description": "Synthetic package for import benchmarks",
+            "location": random.choice(CITIES),
+            "price": random.randint(5, 500) * 100,
+            "days": random.randint(2, 10),
+            "category": random.choice(CATEGORIES),
+            "highlights": ["Sightseeing", "Breakfast"],
+            "created_by": owner,
+        }
+
+
+def encode(rows, fmt):
+    if fmt == "ndjson":
+        return "".join(json.dumps(r) + "\n" for r in rows).encode()
+    out = io.StringIO()
+    writer = None
+    for r in rows:
+        r = dict(r, highlights="|".join(r["highlights"]))
+        if writer is None:
+            writer = csv.DictWriter(out, fieldnames=list(r))
+            writer.writeheader()
+        writer.writerow(r)
+    return out.getvalue().encode()
+
+
+async def chunks(body, size=1 << 20):
+    for i in range(0, len(body), size):
+        yield body[i:i + size]
+
+
+async def run(rows, fmt, batch_size):
+    owner = f"bench-{uuid.uuid4().hex[:8]}@tripsync.com"
+    body = encode(list(make_rows(rows, owner)), fmt)
+
+    for label in ("insert", "upsert"):
+        report = await import_packages(parse_rows(chunks(body), fmt), batch_size=batch_size)
+        print(f"{label:6} rows={report['received']} inserted={report['inserted']} "
+              f"updated={report['updated']} failed={report['failed']} "
+              f"{report['received'] / report['seconds']:.0f} rows/sec")
+
+    await packages_repo.delete_many({"created_by": owner})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import benchmark")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.format, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
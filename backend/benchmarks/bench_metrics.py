@@ -0,0 +1,122 @@
+"""
+Overhead of the metrics middleware and timing hooks.
+
+Runs the same in-process workload with METRICS=1 and METRICS=0 (each in
+a fresh interpreter, since the switch is read at import time) and
+compares per-request latency. Also times a bare Histogram.observe().
+
+Usage (from backend/):
+    MONGO_URI=mongomock:// python -m benchmarks.bench_metrics --requests 3000 --rounds 5
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+
+
+async def workload(requests):
+    import httpx
+    from app import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        pkg = {"title": "Metrics", "description": "bench", "location": "Goa", "price": 100, "days": 1}
+        await http.post("/api/auth/register", json={"name": "m", "email": "m@x.com", "password": "pw", "role": "admin"})
+        token = (await http.post("/api/auth/login", json={"email": "m@x.com", "password": "pw"})).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        package_id = (await http.post("/api/packages/", json=pkg, headers=headers)).json()["package"]["id"]
+
+        # cached read + authenticated DB read: middleware, JWT and repo hooks all fire
+        urls = {"GET /api/packages/{id}": f"/api/packages/{package_id}", "GET /api/bookings/my": "/api/bookings/my"}
+        for url in urls.values():
+            for _ in range(200):
+                await http.get(url, headers=headers)   # warm-up
+
+        timings = []
+        for label, url in urls.items():
+            samples = []
+            for _ in range(requests):
+                start = time.perf_counter()
+                await http.get(url, headers=headers)
+                samples.append(time.perf_counter() - start)
+            timings.append((label, statistics.median(samples) * 1e6, statistics.mean(samples) * 1e6))
+        return timings
+
+
+async def middleware_overhead(n=100_000, rounds=5):
+    # same process, interleaved: wrapped vs bare no-op ASGI app
+    from utils.metrics import MetricsMiddleware
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message):
+        pass
+
+    wrapped = MetricsMiddleware(app)
+    scope = {"type": "http", "method": "GET", "path": "/bench"}
+    best = {app: float("inf"), wrapped: float("inf")}
+    for _ in range(rounds):
+        for target in (app, wrapped):
+            start = time.perf_counter()
+            for _ in range(n):
+                await target(scope, None, send)
+            best[target] = min(best[target], (time.perf_counter() - start) / n)
+    return (best[wrapped] - best[app]) * 1e6
+
+
+def child(requests):
+    for label, median, mean in asyncio.run(workload(requests)):
+        print(f"{label}|{median:.1f}|{mean:.1f}")
+
+
+def run(requests, metrics):
+    env = dict(os.environ, METRICS=metrics)
+    env.setdefault("MONGO_URI", "mongomock://")
+    env.setdefault("RATE_LIMIT", "0")
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_metrics", "--child", "--requests", str(requests)],
+        env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    rows = [line.split("|") for line in out.splitlines() if line.startswith("GET ")]
+    return {label: (float(median), float(mean)) for label, median, mean in rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Metrics overhead benchmark")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--child", action="store_true")
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.requests)
+        return
+
+    from utils.metrics import Histogram
+    h = Histogram("bench", "bench", ("route",))
+    n = 200_000
+    per_observe = timeit.timeit(lambda: h.observe(0.003, "/api/packages/"), number=n) / n * 1e9
+    print(f"Histogram.observe: {per_observe:.0f} ns")
+    print(f"MetricsMiddleware: {asyncio.run(middleware_overhead()):.2f} us/request")
+
+    # alternate fresh processes and keep the best median of each mode,
+    # so run-to-run noise does not swamp a few microseconds of overhead
+    on, off = {}, {}
+    for _ in range(args.rounds):
+        for mode, best in (("1", on), ("0", off)):
+            for label, timing in run(args.requests, mode).items():
+                best[label] = min(best.get(label, timing), timing)
+    for label in on:
+        (on_med, _), (off_med, _) = on[label], off[label]
+        print(f"{label:26} median on={on_med:.1f}us off={off_med:.1f}us "
+              f"overhead={on_med - off_med:+.1f}us ({(on_med - off_med) / off_med * 100:+.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
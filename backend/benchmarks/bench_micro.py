@@ -0,0 +1,83 @@
+"""
+Micro-benchmarks (pytest-benchmark) for the per-request hot spots:
+response serialization, JWT verification and password hashing.
+
+Not part of a normal test run; pass the file explicitly (from backend/):
+    pip install pytest pytest-benchmark
+    python -m pytest benchmarks/bench_micro.py --benchmark-json=benchmarks/results/micro.json
+    python -m pytest benchmarks/bench_micro.py --benchmark-compare --benchmark-compare-fail=mean:10%
+
+--benchmark-autosave keeps numbered JSON runs under .benchmarks/ for
+regression tracking.
+"""
+import copy
+import json
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+
+from benchmarks.bench_serialization import make_docs
+from utils.hashing import pwd_context
+from utils.jwt_helper import TokenCache, create_access_token, decode_token
+from utils.serialization import dumps, serialize_doc
+
+LISTING = 1000
+CLAIMS = {"email": "bench@bench.tripsync", "role": "traveler", "name": "Bench"}
+
+
+@pytest.fixture(scope="module")
+def docs():
+    return make_docs(LISTING)
+
+
+@pytest.fixture(scope="module")
+def token():
+    return create_access_token(CLAIMS)
+
+
+# --------------------------
+# Serialization (1k-package listing)
+# --------------------------
+def test_listing_orjson(benchmark, docs):
+    items = [serialize_doc(d) for d in copy.deepcopy(docs)]
+    benchmark(dumps, items)
+
+
+def test_listing_jsonable_encoder(benchmark, docs):
+    items = [serialize_doc(d) for d in copy.deepcopy(docs)]
+    benchmark(lambda: json.dumps(jsonable_encoder(items)).encode())
+
+
+def test_single_package_orjson(benchmark, docs):
+    item = serialize_doc(copy.deepcopy(docs[0]))
+    benchmark(dumps, item)
+
+
+# --------------------------
+# JWT
+# --------------------------
+def test_jwt_decode(benchmark, token):
+    assert benchmark(decode_token, token)["email"] == CLAIMS["email"]
+
+
+def test_jwt_cached_verify(benchmark, token):
+    cache = TokenCache()
+    cache.verify(token)
+    assert benchmark(cache.verify, token)["email"] == CLAIMS["email"]
+
+
+def test_jwt_encode(benchmark):
+    benchmark(create_access_token, CLAIMS)
+
+
+# --------------------------
+# Password hashing (argon2, the login/register floor)
+# --------------------------
+def test_password_hash(benchmark):
+    benchmark.pedantic(pwd_context.hash, args=("bench-password",), rounds=20, iterations=1)
+
+
+def test_password_verify(benchmark):
+    hashed = pwd_context.hash("bench-password")
+    result = benchmark.pedantic(pwd_context.verify, args=("bench-password", hashed), rounds=20, iterations=1)
+    assert result
@@ -0,0 +1,90 @@
+"""
+Per-request overhead of the rate-limit middleware.
+
+Times RateLimitMiddleware around a no-op ASGI app against the bare app,
+interleaved in one process, for:
+
+    unmatched   a route outside every group (path match only)
+    ip          a grouped route keyed by client IP
+    ip+user     a grouped route keyed by IP and JWT email (cached token)
+
+Buckets are sized so nothing is rejected; the memory backend is used,
+or redis with --redis (needs a reachable REDIS_URL).
+
+Most of the ip+user cost is the (cached) JWT verification, which
+AuthBearer then skips because the middleware hands it the claims; it is
+printed separately.
+
+Usage (from backend/):
+    python -m benchmarks.bench_rate_limit --requests 100000 --rounds 5
+"""
+import argparse
+import asyncio
+import time
+import timeit
+
+from utils.jwt_helper import create_access_token, verify_token
+from utils.rate_limit import RULES, RateLimitMiddleware, make_backend
+
+BIG = (10**9, 10**9)   # capacity, refill/s - never empty during the run
+
+
+async def noop(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def send(message):
+    pass
+
+
+def scope(method, path, query=b"", headers=()):
+    return {
+        "type": "http", "method": method, "path": path, "query_string": query,
+        "headers": list(headers), "client": ("10.0.0.1", 50000),
+    }
+
+
+async def overhead(backend, requests, rounds):
+    limits = {"auth": (BIG, None), "booking": (BIG, BIG), "search": (BIG, BIG), "external": (BIG, BIG)}
+    wrapped = RateLimitMiddleware(noop, backend=backend, rules=RULES, limits=limits)
+    token = create_access_token({"email": "bench@bench.tripsync", "role": "traveler", "name": "Bench"})
+    cases = {
+        "unmatched": scope("GET", "/api/packages/65a000000000000000000000"),
+        "ip": scope("GET", "/api/packages/suggest", b"q=go"),
+        "ip+user": scope("POST", "/api/bookings/", headers=[(b"authorization", f"Bearer {token}".encode())]),
+    }
+
+    results = {}
+    for label, sc in cases.items():
+        best = {noop: float("inf"), wrapped: float("inf")}
+        for _ in range(rounds):
+            for target in (noop, wrapped):
+                start = time.perf_counter()
+                for _ in range(requests):
+                    await target(dict(sc), None, send)
+                best[target] = min(best[target], (time.perf_counter() - start) / requests)
+        results[label] = (best[wrapped] - best[noop]) * 1e6
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rate limit overhead benchmark")
+    parser.add_argument("--requests", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--redis", action="store_true")
+    args = parser.parse_args()
+
+    backend = make_backend("redis" if args.redis else "memory")
+    for label, us in asyncio.run(overhead(backend, args.requests, args.rounds)).items():
+        print(f"{label:>10}: {us:.2f} us/request")
+
+    token = create_access_token({"email": "bench@bench.tripsync", "role": "traveler", "name": "Bench"})
+    verify_token(token)
+    n = 200_000
+    per_verify = timeit.timeit(lambda: verify_token(token), number=n) / n * 1e6
+    print(f"   of which cached JWT verify (reused by AuthBearer): {per_verify:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
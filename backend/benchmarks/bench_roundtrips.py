@@ -0,0 +1,71 @@
+"""
+Counts database round trips per mutating endpoint.
+
+Usage (from backend/):
+    MONGO_URI=mongomock:// python -m benchmarks.bench_roundtrips
+
+Every awaited Repository call is one round trip to Mongo. The script
+drives each endpoint once through the ASGI app and prints the count.
+"""
+import collections
+import functools
+import os
+
+os.environ.setdefault("MONGO_URI", "mongomock://")
+os.environ.setdefault("RATE_LIMIT", "0")
+
+from fastapi.testclient import TestClient
+
+from app import app
+from database.repositories import Repository
+
+CALLS = collections.Counter()
+ROUND_TRIP_METHODS = [
+    "find_one", "get_by_id", "find", "insert_one", "update_one", "delete_one",
+    "find_one_and_update",
+]
+
+
+def count_calls(name, fn):
+    @functools.wraps(fn)
+    async def wrapper(self, *args, **kwargs):
+        CALLS[name] += 1
+        return await fn(self, *args, **kwargs)
+    return wrapper
+
+
+def measure(label, call):
+    CALLS.clear()
+    res = call()
+    assert res.status_code < 400, res.text
+    print(f"{label:<22} round trips={sum(CALLS.values())}  {dict(CALLS)}")
+    return res
+
+
+def main():
+    for name in ROUND_TRIP_METHODS:
+        setattr(Repository, name, count_calls(name, getattr(Repository, name)))
+
+    with TestClient(app) as c:
+        def login(email, role):
+            c.post("/api/auth/register", json={"name": email, "email": email, "password": "pw", "role": role})
+            token = c.post("/api/auth/login", json={"email": email, "password": "pw"}).json()["access_token"]
+            return {"Authorization": f"Bearer {token}"}
+
+        admin = login("bench-admin@tripsync.com", "admin")
+        agent = login("bench-agent@tripsync.com", "travel_partner")
+        traveler = login("bench-traveler@tripsync.com", "traveler")
+
+        pkg = {"title": "Bench Trip", "description": "d", "location": "Goa", "price": 100, "days": 2}
+        res = measure("create_package", lambda: c.post("/api/packages/", json=pkg, headers=agent))
+        pid = res.json()["package"]["id"]
+        measure("update_package", lambda: c.put(f"/api/packages/{pid}", json=pkg, headers=agent))
+        measure("approve_package", lambda: c.patch(f"/api/packages/{pid}/approve", headers=admin))
+        measure("reject_package", lambda: c.patch(f"/api/packages/{pid}/reject", headers=admin))
+        c.patch(f"/api/packages/{pid}/approve", headers=admin)
+        booking = {"package_id": pid, "date": "2030-01-01", "persons": 2, "total": 200}
+        measure("create_booking", lambda: c.post("/api/bookings/", json=booking, headers=traveler))
+
+
+if __name__ == "__main__":
+    main()
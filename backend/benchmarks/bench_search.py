@@ -0,0 +1,75 @@
+"""
+Latency benchmark for utils.search_index.
+
+Usage (from backend/):
+    python -m benchmarks.bench_search --packages 100000
+
+Builds an index of synthetic packages and reports per-query latency
+percentiles for exact, prefix and multi-term searches. Target: p99 < 10ms.
+"""
+import argparse
+import random
+import time
+
+from bson import ObjectId
+
+from utils.search_index import PackageSearchIndex
+
+LOCATIONS = [
+    "Goa", "Manali", "Alleppey", "Jaipur", "Udaipur", "Shimla", "Ooty", "Dubai",
+    "Maldives", "Bali", "Paris", "Phuket", "Interlaken", "Singapore", "Cusco",
+]
+THEMES = ["Beach", "Adventure", "Honeymoon", "Heritage", "Family", "Luxury", "Trek", "Safari"]
+WORDS = [
+    "resort", "temple", "cruise", "sunset", "island", "valley", "palace", "lake",
+    "market", "waterfall", "snorkeling", "desert", "villa", "spa", "hiking", "museum",
+    "fort", "houseboat", "safari", "rafting", "camping", "vineyard", "glacier", "canyon",
+    "lagoon", "reef", "monastery", "bazaar", "gardens", "cathedral", "harbour", "dunes",
+    "rainforest", "volcano", "castle", "skyline", "promenade", "caves", "tea", "spice",
+]
+QUERIES = ["goa", "beach", "ma", "goa beach", "luxury spa", "he", "interlaken trek", "paris museum", "zzz"]
+
+
+def make_package(rng):
+    location = rng.choice(LOCATIONS)
+    theme = rng.choice(THEMES)
+    return {
+        "_id": ObjectId(),
+        "title": f"{location} {theme} {rng.choice(WORDS).title()} Escape",
+        "location": location,
+        "description": " ".join(rng.sample(WORDS, 8)),
+        "highlights": [rng.choice(WORDS).title() for _ in range(3)],
+        "category": rng.choice(["packages", "hotels", "experiences"]),
+        "status": "approved" if rng.random() < 0.9 else "pending",
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search index benchmark")
+    parser.add_argument("--packages", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    index = PackageSearchIndex()
+
+    start = time.perf_counter()
+    for _ in range(args.packages):
+        index.add(make_package(rng))
+    print(f"indexed {len(index)} packages in {time.perf_counter() - start:.2f}s")
+
+    for q in QUERIES:
+        samples = []
+        for _ in range(args.rounds):
+            t = time.perf_counter()
+            hits = index.search(q, limit=args.limit)
+            samples.append(time.perf_counter() - t)
+        samples.sort()
+        p50 = samples[len(samples) // 2] * 1000
+        p99 = samples[int(len(samples) * 0.99) - 1] * 1000
+        print(f"{q!r:>18}: hits={len(hits):>3} p50={p50:.2f}ms p99={p99:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Serialization cost of a package listing.
+
+Encodes N Mongo-shaped package documents (ObjectId _id, datetime,
+nested geo) three ways and reports the best of several rounds:
+
+  jsonable_encoder   - the old path: FastAPI's jsonable_encoder + json.dumps
+  response_model     - pydantic validate + dump_json against PackageOut
+  orjson             - serialize_doc + dumps (utils/serialization.py)
+
+Usage (from backend/):
+    python -m benchmarks.bench_serialization --packages 10000 --rounds 5
+"""
+import argparse
+import copy
+import json
+import time
+from datetime import datetime
+from typing import List
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from models.package_model import PackageOut
+from utils.serialization import dumps, orjson, serialize_doc
+
+
+def make_docs(n):
+    return [{
+        "_id": ObjectId(),
+        "title": f"Package {i}",
+        "description": "Sun, sand and a slow week by the sea. " * 5,
+        "location": ["Goa, India", "Bali", "Leh"][i % 3],
+        "price": 5000.0 + i,
+        "days": 2 + i % 6,
+        "category": ["packages", "hotels", "Luxury"][i % 3],
+        "image": f"https://images.example.com/{i}.jpg",
+        "offers": ["Early bird", "Free transfer"],
+        "inclusions": ["Breakfast", "Hotel"],
+        "highlights": ["Beach", "Sunset cruise"],
+        "itinerary": ["Arrive", "Explore", "Depart"],
+        "gallery": [],
+        "discount": float(i % 5 * 5),
+        "rating": 3.5 + i % 3 * 0.5,
+        "capacity_per_date": None,
+        "status": "approved",
+        "created_by": "agent@example.com",
+        "created_at": datetime(2025, 1, 1, 12, 30),
+        "geo": {"type": "Point", "coordinates": [74.124, 15.299]},
+    } for i in range(n)]
+
+
+def old_path(docs):
+    items = []
+    for d in docs:
+        d["id"] = str(d["_id"])
+        del d["_id"]
+        items.append(d)
+    return json.dumps(jsonable_encoder(items)).encode()
+
+
+adapter = TypeAdapter(List[PackageOut])
+
+
+def response_model_path(docs):
+    items = [serialize_doc(d) for d in docs]
+    return adapter.dump_json(adapter.validate_python(items), exclude_unset=True)
+
+
+def new_path(docs):
+    return dumps([serialize_doc(d) for d in docs])
+
+
+def best_of(fn, docs, rounds):
+    best, size = float("inf"), 0
+    for _ in range(rounds):
+        fresh = copy.deepcopy(docs)   # serializers rename _id in place
+        start = time.perf_counter()
+        body = fn(fresh)
+        best = min(best, time.perf_counter() - start)
+        size = len(body)
+    return best, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serialization benchmark")
+    parser.add_argument("--packages", type=int, default=10_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    docs = make_docs(args.packages)
+    print(f"{args.packages} packages, best of {args.rounds} (orjson {'installed' if orjson else 'missing: stdlib json'})")
+
+    baseline = None
+    for name, fn in (("jsonable_encoder", old_path), ("response_model", response_model_path), ("orjson", new_path)):
+        seconds, size = best_of(fn, docs, args.rounds)
+        baseline = baseline or seconds
+        print(f"  {name:18s} {seconds * 1000:8.1f} ms  {size / 1e6:6.2f} MB  x{baseline / seconds:5.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Compare two load results written by benchmarks.scenarios.
+
+Flags every scenario / endpoint whose throughput dropped or whose p99
+grew by more than --threshold percent; exits 1 when anything regressed,
+so it can gate CI. (Micro-benchmarks use pytest-benchmark's own
+--benchmark-compare.)
+
+Usage (from backend/):
+    python -m benchmarks.compare benchmarks/results/base.json benchmarks/results/load-20250101-120000.json
+    python -m benchmarks.compare base.json new.json --threshold 5
+"""
+import argparse
+import json
+import sys
+
+
+def change(old, new):
+    return (new - old) / old * 100 if old else 0.0
+
+
+def rows(base, new):
+    for name, result in new["scenarios"].items():
+        old = base["scenarios"].get(name)
+        if old is None:
+            continue
+        yield name, old, result
+        for label, stats in result["endpoints"].items():
+            if label in old["endpoints"]:
+                yield f"  {label}", old["endpoints"][label], stats
+
+
+def compare(base, new, threshold):
+    regressions = 0
+    print(f"{'':<46} {'rps':>18} {'p99 ms':>20}")
+    for label, old, cur in rows(base, new):
+        rps, p99 = change(old["rps"], cur["rps"]), change(old["p99_ms"], cur["p99_ms"])
+        bad = rps < -threshold or p99 > threshold
+        regressions += bad
+        print(f"{label:<46} {cur['rps']:>9} ({rps:+6.1f}%) {cur['p99_ms']:>10} ({p99:+6.1f}%)"
+              + ("  REGRESSION" if bad else ""))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare load test results")
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed change in percent")
+    args = parser.parse_args()
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+
+    regressions = compare(base, new, args.threshold)
+    print(f"{regressions} regression(s) beyond {args.threshold}%")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""
+Benchmark data generator.
+
+Builds a realistic catalog, user base and booking history from the
+seed_packages.py templates, at a fixed scale:
+
+    scale   packages   users     bookings
+    10k       10,000    1,000      10,000
+    100k     100,000   10,000     100,000
+    1m     1,000,000  100,000   1,000,000
+
+Every generated document is identifiable (emails and owners end in
+@bench.tripsync), so --drop only removes earlier benchmark data.
+All users share BENCH_PASSWORD; benchmarks.scenarios logs in as them.
+Rollups are rebuilt at the end so the admin dashboards have data.
+
+Usage (from backend/, against a local Mongo - not mongomock):
+    python -m benchmarks.datagen --scale 10k --drop
+    python -m benchmarks.datagen --scale 1m --seed 7 --batch-size 10000
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+from bson import ObjectId
+
+from database.repositories import users_repo, packages_repo, bookings_repo
+from database.rollups import rebuild_rollups
+from seed_packages import packages as TEMPLATES
+from utils.geocoding import normalize, offline_lookup
+from utils.hashing import pwd_context
+
+BENCH_DOMAIN = "bench.tripsync"
+BENCH_PASSWORD = "bench-password"
+ADMIN_EMAIL = f"admin@{BENCH_DOMAIN}"
+
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+AGENT_SHARE = 0.05          # of users
+HOT_PACKAGES = 50_000       # bookings are drawn from the first N approved packages
+STATUS_WEIGHTS = (("approved", 0.90), ("pending", 0.07), ("rejected", 0.03))
+PAYMENT_WEIGHTS = (("success", 0.92), ("failed", 0.08))
+
+THEMES = ["Escape", "Getaway", "Explorer", "Retreat", "Discovery", "Classic", "Signature", "Weekender"]
+EXTRAS = [
+    "Breakfast", "Airport transfer", "Guided tour", "Spa session", "Sunset cruise",
+    "City pass", "Travel insurance", "Private guide", "Dinner show", "Photo shoot",
+]
+
+
+def scale_counts(scale):
+    packages = SCALES[scale]
+    users = max(packages // 10, 20)
+    return {"packages": packages, "users": users, "agents": max(int(users * AGENT_SHARE), 1), "bookings": packages}
+
+
+def traveler_email(i):
+    return f"traveler-{i}@{BENCH_DOMAIN}"
+
+
+def agent_email(i):
+    return f"agent-{i}@{BENCH_DOMAIN}"
+
+
+def weighted(rng, weights):
+    roll, total = rng.random(), 0.0
+    for value, weight in weights:
+        total += weight
+        if roll < total:
+            return value
+    return weights[-1][0]
+
+
+# --------------------------
+# Document factories
+# --------------------------
+def make_users(counts, password_hash):
+    yield {"name": "Bench Admin", "email": ADMIN_EMAIL, "password": password_hash, "role": "admin"}
+    for i in range(counts["agents"]):
+        yield {"name": f"Agent {i}", "email": agent_email(i), "password": password_hash, "role": "travel_partner"}
+    for i in range(counts["users"] - counts["agents"] - 1):
+        yield {"name": f"Traveler {i}", "email": traveler_email(i), "password": password_hash, "role": "traveler"}
+
+
+def make_package(rng, i, counts, now):
+    tpl = TEMPLATES[i % len(TEMPLATES)]
+    location = tpl["location"]
+    price = round(tpl["price"] * rng.uniform(0.6, 1.4), -2)
+    pkg = {
+        "_id": ObjectId(),
+        "title": f"{tpl['title']} {rng.choice(THEMES)} {i}",
+        "description": tpl["description"],
+        "location": location,
+        "price": price,
+        "days": rng.randint(2, 12),
+        "category": tpl["category"],
+        "image": tpl["image"],
+        "offers": rng.sample(EXTRAS, 2),
+        "inclusions": rng.sample(EXTRAS, 3),
+        "highlights": rng.sample(EXTRAS, 3),
+        "itinerary": [f"Day {d}" for d in range(1, 4)],
+        "gallery": [],
+        "discount": rng.choice([0, 5, 10, 12, 15, 20, 25]),
+        "rating": round(rng.uniform(3.0, 5.0), 1),
+        "capacity_per_date": None,
+        "status": weighted(rng, STATUS_WEIGHTS),
+        "created_by": agent_email(rng.randrange(counts["agents"])),
+        "created_at": now - timedelta(days=rng.uniform(0, 730)),
+    }
+    geo = offline_lookup(normalize(location))
+    if geo is not None:
+        pkg["geo"] = geo
+    return pkg
+
+
+def make_booking(rng, pkg, counts, now):
+    persons = rng.randint(1, 5)
+    created_at = now - timedelta(days=rng.uniform(0, 365))
+    status = weighted(rng, PAYMENT_WEIGHTS)
+    booking = {
+        "package_id": str(pkg["_id"]),
+        "user_email": traveler_email(rng.randrange(counts["users"] - counts["agents"] - 1)),
+        "date": (created_at + timedelta(days=rng.randint(7, 120))).date().isoformat(),
+        "persons": persons,
+        "total": float(pkg["price"]) * persons,
+        "payment_id": f"bench-{ObjectId()}" if status == "success" else None,
+        "payment_status": status,
+        "seats_reserved": False,
+        "created_at": created_at,
+        "package_title": pkg["title"],
+        "package_location": pkg["location"],
+        "package_owner": pkg["created_by"],
+        "package_category": pkg["category"],
+    }
+    if status == "success":
+        booking["paid_at"] = created_at
+    return booking
+
+
+# --------------------------
+# Loading
+# --------------------------
+async def insert_batches(repo, docs, batch_size):
+    batch, total = [], 0
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            await repo.insert_many(batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        await repo.insert_many(batch)
+        total += len(batch)
+    return total
+
+
+async def drop_bench_data():
+    pattern = {"$regex": f"@{BENCH_DOMAIN}$"}
+    await bookings_repo.delete_many({"user_email": pattern})
+    await packages_repo.delete_many({"created_by": pattern})
+    await users_repo.delete_many({"email": pattern})
+
+
+async def generate(scale, seed=42, batch_size=5000, drop=False):
+    rng = random.Random(seed)
+    counts = scale_counts(scale)
+    now = datetime.utcnow()
+    timings = {}
+
+    if drop:
+        await drop_bench_data()
+
+    start = time.perf_counter()
+    password_hash = pwd_context.hash(BENCH_PASSWORD)   # one argon2 hash for everyone
+    await insert_batches(users_repo, make_users(counts, password_hash), batch_size)
+    timings["users"] = time.perf_counter() - start
+
+    # approved packages are kept (up to HOT_PACKAGES) as booking targets
+    hot = []
+
+    def packages():
+        for i in range(counts["packages"]):
+            pkg = make_package(rng, i, counts, now)
+            if pkg["status"] == "approved" and len(hot) < HOT_PACKAGES:
+                hot.append(pkg)
+            yield pkg
+
+    start = time.perf_counter()
+    await insert_batches(packages_repo, packages(), batch_size)
+    timings["packages"] = time.perf_counter() - start
+
+    # popularity is skewed: the k-th hot package gets ~1/k of the bookings
+    cum_weights, total = [], 0.0
+    for k in range(len(hot)):
+        total += 1 / (k + 1)
+        cum_weights.append(total)
+
+    def bookings():
+        for _ in range(counts["bookings"]):
+            pkg = rng.choices(hot, cum_weights=cum_weights)[0]
+            yield make_booking(rng, pkg, counts, now)
+
+    start = time.perf_counter()
+    await insert_batches(bookings_repo, bookings(), batch_size)
+    timings["bookings"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await rebuild_rollups()
+    timings["rollups"] = time.perf_counter() - start
+
+    return counts, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark data generator")
+    parser.add_argument("--scale", choices=list(SCALES), default="10k")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--drop", action="store_true", help="remove earlier benchmark data first")
+    args = parser.parse_args()
+
+    counts, timings = asyncio.run(generate(args.scale, args.seed, args.batch_size, args.drop))
+    for name, count in counts.items():
+        print(f"{name:>10}: {count:,}")
+    for name, seconds in timings.items():
+        print(f"{name + ' s':>10}: {seconds:.1f}")
+    print(f"login as {ADMIN_EMAIL} / {traveler_email(0)} with password '{BENCH_PASSWORD}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Simple asyncio load generator for the TripSync API.
+
+Usage (from backend/, with the API running):
+    python -m benchmarks.load_test --clients 500 --duration 30
+    python -m benchmarks.load_test --path /api/packages/ --path /api/bookings/my --token <jwt>
+
+Prints requests/sec and latency percentiles. Run it once against the
+old sync build and once against the async build to compare.
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    k = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+    return samples[k]
+
+
+async def client_loop(http, paths, deadline, latencies, errors):
+    i = 0
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            res = await http.get(path)
+            if res.status_code >= 500:
+                errors.append(res.status_code)
+        except httpx.HTTPError as exc:
+            errors.append(type(exc).__name__)
+            continue
+        latencies.append(time.perf_counter() - start)
+
+
+async def run(base_url, paths, clients, duration, token=None):
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    latencies, errors = [], []
+
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=30) as http:
+        deadline = time.perf_counter() + duration
+        started = time.perf_counter()
+        await asyncio.gather(*[
+            client_loop(http, paths, deadline, latencies, errors)
+            for _ in range(clients)
+        ])
+        elapsed = time.perf_counter() - started
+
+    return {
+        "clients": clients,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TripSync API load test")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--path", action="append", dest="paths")
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--token", default=None)
+    args = parser.parse_args()
+
+    paths = args.paths or ["/api/packages/"]
+    result = asyncio.run(run(args.base_url, paths, args.clients, args.duration, args.token))
+    for key, value in result.items():
+        print(f"{key:>10}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+Load scenarios for the TripSync API.
+
+Each scenario is one kind of user session, run by --clients concurrent
+asyncio clients for --duration seconds:
+
+    browse   catalog pages (sorted / filtered / faceted) + package detail
+    search   ranked search and autocomplete
+    login    password login (argon2 verify)
+    booking  authenticated booking creation
+    admin    dashboard stats and paged admin listings
+    mixed    90% browse/search, 5% login, 3% booking, 2% admin
+
+Expects a running server on a local Mongo loaded with
+benchmarks.datagen (same --scale), started with RATE_LIMIT=0 - every
+client shares one IP, so the auth/booking limits would answer 429. Results per scenario and per endpoint
+(rps, p50/p95/p99, errors) are printed and written as JSON; compare two
+runs with benchmarks.compare.
+
+Usage (from backend/):
+    python -m benchmarks.datagen --scale 100k --drop
+    RATE_LIMIT=0 python server.py &
+    python -m benchmarks.scenarios --scale 100k --clients 200 --duration 30
+    python -m benchmarks.scenarios --scenario browse --scenario search --out results/browse.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+import httpx
+
+from benchmarks.datagen import ADMIN_EMAIL, BENCH_PASSWORD, SCALES, scale_counts, traveler_email
+from benchmarks.load_test import percentile
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+SORTS = ["-rating", "price", "-price", "-discount", None]
+CATEGORIES = ["Luxury", "Family", "Adventure", "Honeymoon", "City Tour"]
+QUERIES = ["dubai", "bali", "paris", "luxury", "beach", "honeymoon", "adventure", "maldives spa", "si", "sw"]
+PREFIXES = ["du", "ba", "pa", "ma", "si", "th"]
+
+
+class Context:
+    def __init__(self, counts, package_ids, admin_token, traveler_tokens):
+        self.counts = counts
+        self.package_ids = package_ids
+        self.admin = {"Authorization": f"Bearer {admin_token}"}
+        self.travelers = [{"Authorization": f"Bearer {t}"} for t in traveler_tokens]
+
+
+# --------------------------
+# Scenarios
+# Each one issues its requests through `call`, which times them under
+# an endpoint label (route template, not the raw URL).
+# --------------------------
+async def browse(call, ctx, rng):
+    params = {"limit": 20}
+    sort = rng.choice(SORTS)
+    if sort:
+        params["sort"] = sort
+    roll = rng.random()
+    if roll < 0.3:
+        params["category"] = rng.choice(CATEGORIES)
+    elif roll < 0.45:
+        params.update(min_price=20000, max_price=80000, facets="true")
+    await call("GET", "/api/packages/", "GET /api/packages/", params=params)
+    await call("GET", f"/api/packages/{rng.choice(ctx.package_ids)}", "GET /api/packages/{id}")
+
+
+async def search(call, ctx, rng):
+    if rng.random() < 0.5:
+        await call("GET", "/api/packages/", "GET /api/packages/?q", params={"q": rng.choice(QUERIES), "limit": 20})
+    else:
+        await call("GET", "/api/packages/suggest", "GET /api/packages/suggest", params={"q": rng.choice(PREFIXES)})
+
+
+async def login(call, ctx, rng):
+    travelers = ctx.counts["users"] - ctx.counts["agents"] - 1
+    body = {"email": traveler_email(rng.randrange(travelers)), "password": BENCH_PASSWORD}
+    await call("POST", "/api/auth/login", "POST /api/auth/login", json=body)
+
+
+async def booking(call, ctx, rng):
+    body = {
+        "package_id": rng.choice(ctx.package_ids),
+        "date": (date.today() + timedelta(days=rng.randint(7, 120))).isoformat(),
+        "persons": rng.randint(1, 4),
+    }
+    await call("POST", "/api/bookings/", "POST /api/bookings/", json=body, headers=rng.choice(ctx.travelers))
+
+
+async def admin(call, ctx, rng):
+    path = rng.choice([
+        "/api/admin/stats/revenue",
+        "/api/admin/stats/packages",
+        "/api/admin/stats/categories",
+        "/api/admin/stats/agents",
+        "/api/admin/stats/moderation",
+        "/api/admin/packages?limit=50",
+        "/api/bookings/all?limit=50",
+        "/api/packages/pending/all?limit=50",
+    ])
+    await call("GET", path, "GET " + path.split("?")[0], headers=ctx.admin)
+
+
+async def mixed(call, ctx, rng):
+    roll = rng.random()
+    if roll < 0.60:
+        await browse(call, ctx, rng)
+    elif roll < 0.90:
+        await search(call, ctx, rng)
+    elif roll < 0.95:
+        await login(call, ctx, rng)
+    elif roll < 0.98:
+        await booking(call, ctx, rng)
+    else:
+        await admin(call, ctx, rng)
+
+
+SCENARIOS = {"browse": browse, "search": search, "login": login, "booking": booking, "admin": admin, "mixed": mixed}
+
+
+# --------------------------
+# Runner
+# --------------------------
+async def setup(http, counts, travelers=20):
+    async def token(email):
+        res = await http.post("/api/auth/login", json={"email": email, "password": BENCH_PASSWORD})
+        res.raise_for_status()
+        return res.json()["access_token"]
+
+    admin_token = await token(ADMIN_EMAIL)
+    population = counts["users"] - counts["agents"] - 1
+    traveler_tokens = [await token(traveler_email(i)) for i in range(min(travelers, population))]
+
+    res = await http.get("/api/packages/", params={"limit": 500, "fields": "title"})
+    res.raise_for_status()
+    package_ids = [p["id"] for p in res.json()["items"]]
+    if not package_ids:
+        raise SystemExit("no approved packages - run benchmarks.datagen first")
+    return Context(counts, package_ids, admin_token, traveler_tokens)
+
+
+async def run_scenario(http, name, ctx, clients, duration, seed):
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+
+    async def call(method, url, label, **kwargs):
+        start = time.perf_counter()
+        try:
+            res = await http.request(method, url, **kwargs)
+            if res.status_code >= 400:
+                errors[f"{label} {res.status_code}"] += 1
+        except httpx.HTTPError as exc:
+            errors[f"{label} {type(exc).__name__}"] += 1
+            return
+        latencies[label].append(time.perf_counter() - start)
+
+    async def client(i, deadline):
+        rng = random.Random(seed * 1000 + i)
+        while time.perf_counter() < deadline:
+            await SCENARIOS[name](call, ctx, rng)
+
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(client(i, deadline) for i in range(clients)))
+    elapsed = time.perf_counter() - start
+
+    every = [s for samples in latencies.values() for s in samples]
+    return {
+        **summarize(every, elapsed),
+        "errors": sum(errors.values()),
+        "error_detail": dict(errors),
+        "endpoints": {label: summarize(samples, elapsed) for label, samples in sorted(latencies.items())},
+    }
+
+
+def summarize(samples, elapsed):
+    return {
+        "requests": len(samples),
+        "rps": round(len(samples) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+        "p95_ms": round(percentile(samples, 95) * 1000, 2),
+        "p99_ms": round(percentile(samples, 99) * 1000, 2),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(base_url, names, scale, clients, duration, seed):
+    counts = scale_counts(scale)
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as http:
+        ctx = await setup(http, counts)
+        results = {}
+        for name in names:
+            results[name] = await run_scenario(http, name, ctx, clients, duration, seed)
+            print_result(name, results[name])
+
+    return {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "git": git_revision(),
+            "base_url": base_url,
+            "scale": scale,
+            "clients": clients,
+            "duration_s": duration,
+            "seed": seed,
+            "python": platform.python_version(),
+        },
+        "scenarios": results,
+    }
+
+
+def print_result(name, result):
+    print(f"{name:>8}: {result['rps']:>8} rps  p50 {result['p50_ms']} ms  p95 {result['p95_ms']} ms  "
+          f"p99 {result['p99_ms']} ms  errors {result['errors']}")
+    for label, stats in result["endpoints"].items():
+        print(f"          {label:<40} {stats['rps']:>8} rps  p99 {stats['p99_ms']} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TripSync load scenarios")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--scenario", action="append", dest="scenarios", choices=list(SCENARIOS))
+    parser.add_argument("--scale", choices=list(SCALES), default="10k")
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", default=None, help="JSON results path (default: benchmarks/results/load-<time>.json)")
+    args = parser.parse_args()
+
+    names = args.scenarios or list(SCENARIOS)
+    report = asyncio.run(run(args.base_url, names, args.scale, args.clients, args.duration, args.seed))
+
+    out = args.out or os.path.join(RESULTS_DIR, f"load-{datetime.utcnow():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {out}")
+
+
+if __name__ == "__main__":
+    main()
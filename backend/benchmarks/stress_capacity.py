@@ -0,0 +1,77 @@
+"""
+Concurrency stress test for booking capacity.
+
+Fires N parallel single-seat bookings at one package/date whose capacity
+is smaller than N and checks that exactly `capacity` of them succeed.
+mongomock serializes every operation, so the in-process mode cannot hit
+the first-insert race; tests/test_capacity.py emulates it for reserve().
+
+Usage (from backend/):
+    # against a running API + real Mongo
+    python -m benchmarks.stress_capacity --base-url http://127.0.0.1:8000 --requests 300 --capacity 20
+
+    # in-process against the mongomock stand-in
+    MONGO_URI=mongomock:// python -m benchmarks.stress_capacity --in-process
+"""
+import argparse
+import asyncio
+import collections
+import os
+import uuid
+
+import httpx
+
+
+async def login(http, email, role):
+    await http.post("/api/auth/register", json={"name": email, "email": email, "password": "pw", "role": role})
+    res = await http.post("/api/auth/login", json={"email": email, "password": "pw"})
+    return {"Authorization": f"Bearer {res.json()['access_token']}"}
+
+
+async def run(http, requests, capacity):
+    suffix = uuid.uuid4().hex[:8]
+    admin = await login(http, f"stress-admin-{suffix}@tripsync.com", "admin")
+    agent = await login(http, f"stress-agent-{suffix}@tripsync.com", "travel_partner")
+    traveler = await login(http, f"stress-traveler-{suffix}@tripsync.com", "traveler")
+
+    pkg = {
+        "title": "Last Seats", "description": "stress", "location": "Goa",
+        "price": 100, "days": 1, "capacity_per_date": capacity,
+    }
+    res = await http.post("/api/packages/", json=pkg, headers=agent)
+    package_id = res.json()["package"]["id"]
+    await http.patch(f"/api/packages/{package_id}/approve", headers=admin)
+
+    booking = {"package_id": package_id, "date": "2030-01-01", "persons": 1}
+    results = await asyncio.gather(*[
+        http.post("/api/bookings/", json=booking, headers=traveler) for _ in range(requests)
+    ])
+
+    codes = collections.Counter(r.status_code for r in results)
+    print(f"requests={requests} capacity={capacity} results={dict(codes)}")
+    assert codes[200] == capacity, "overbooked or underbooked!"
+    print("OK: no overbooking")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Booking capacity stress test")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--in-process", action="store_true")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--capacity", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.in_process:
+        os.environ.setdefault("RATE_LIMIT", "0")   # one client would hit the booking limit
+        from app import app
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://stress", timeout=60) as http:
+            await run(http, args.requests, args.capacity)
+    else:
+        limits = httpx.Limits(max_connections=args.requests)
+        async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as http:
+            await run(http, args.requests, args.capacity)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
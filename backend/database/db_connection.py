@@ -1,22 +1,99 @@
-from pymongo import MongoClient
+from motor.motor_asyncio import AsyncIOMotorClient
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://127.0.0.1:27017/tripsync")
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
 
-client = MongoClient(MONGO_URI)
+# --------------------------
+# Lazy client
+# The Mongo client is opened on first use, not at import time: a client
+# created before the server forks its workers would share sockets and
+# monitor threads with every child. The pid check makes a forked worker
+# open its own client even if the parent already used one.
+# --------------------------
+_client = None
+_client_pid = None
 
-# Get database (if name not provided, fallback)
-try:
-    db = client.get_default_database()
-    if db is None:
-        db = client["tripsync"]
-except:
-    db = client["tripsync"]
+
+def _new_client():
+    # "mongomock://" runs against an in-memory stand-in (local dev / tests;
+    # mongomock-motor comes from tests/requirements.txt)
+    if MONGO_URI.startswith("mongomock://"):
+        from mongomock_motor import AsyncMongoMockClient
+        return AsyncMongoMockClient()
+    return AsyncIOMotorClient(MONGO_URI, maxPoolSize=MONGO_MAX_POOL_SIZE)
+
+
+def get_client():
+    global _client, _client_pid
+    if _client is None or _client_pid != os.getpid():
+        _client = _new_client()
+        _client_pid = os.getpid()
+    return _client
+
+
+def get_db():
+    client = get_client()
+    # Get database (if name not provided, fallback)
+    try:
+        database = client.get_default_database()
+        if database is None:
+            database = client["tripsync"]
+    except:
+        database = client["tripsync"]
+    return database
+
+
+def close_client():
+    global _client, _client_pid
+    if _client is not None and _client_pid == os.getpid():
+        _client.close()
+    _client = None
+    _client_pid = None
+
+
+async def ping():
+    await get_db().command("ping")
+
+
+class LazyDatabase:
+    def __getitem__(self, name):
+        return get_db()[name]
+
+    def __getattr__(self, attr):
+        return getattr(get_db(), attr)
+
+
+class LazyCollection:
+    # stands in for a Motor collection; resolves it on first attribute access
+    def __init__(self, name):
+        self.name = name
+        self._col = None
+        self._client = None
+
+    def __getattr__(self, attr):
+        client = get_client()
+        if self._col is None or self._client is not client:
+            self._col = get_db()[self.name]
+            self._client = client
+        return getattr(self._col, attr)
+
+
+db = LazyDatabase()
 
 # Collections
-users_col = db["users"]
-packages_col = db["packages"]
-bookings_col = db["bookings"]
+users_col = LazyCollection("users")
+packages_col = LazyCollection("packages")
+bookings_col = LazyCollection("bookings")
+idempotency_col = LazyCollection("idempotency_keys")
+capacity_col = LazyCollection("capacity")
+geocodes_col = LazyCollection("geocodes")
+
+# Analytics rollups (maintained by database/rollups.py)
+daily_stats_col = LazyCollection("stats_daily")
+package_stats_col = LazyCollection("stats_packages")
+agent_stats_col = LazyCollection("stats_agents")
+moderation_stats_col = LazyCollection("stats_moderation")
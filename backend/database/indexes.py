@@ -0,0 +1,109 @@
+import logging
+import os
+from pymongo import ASCENDING, GEOSPHERE, IndexModel
+from pymongo.errors import OperationFailure
+from database.db_connection import db
+
+logger = logging.getLogger("tripsync.indexes")
+
+# Dev-mode: run explain() on route queries and warn on full collection scans
+QUERY_PLAN_CHECK = os.getenv("QUERY_PLAN_CHECK", "0") == "1"
+
+
+# --------------------------
+# Declared indexes
+# One entry per hot lookup in routes/*.py
+# --------------------------
+INDEXES = {
+    "users": [
+        # auth_routes.login / register
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+    "packages": [
+        # package_routes.get_packages / get_pending_packages
+        # (status, category) equality first, then the price sort/range
+        IndexModel(
+            [("status", ASCENDING), ("category", ASCENDING), ("price", ASCENDING), ("_id", ASCENDING)],
+            name="status_category_price",
+        ),
+        # catalog sorts/ranges without a category filter (walked backwards for "-field")
+        IndexModel([("status", ASCENDING), ("price", ASCENDING), ("_id", ASCENDING)], name="status_price"),
+        IndexModel([("status", ASCENDING), ("rating", ASCENDING), ("_id", ASCENDING)], name="status_rating"),
+        IndexModel([("status", ASCENDING), ("discount", ASCENDING), ("_id", ASCENDING)], name="status_discount"),
+        # ?location= filter
+        IndexModel([("status", ASCENDING), ("location", ASCENDING)], name="status_location"),
+        # package_routes.packages_near ($geoNear)
+        IndexModel([("geo", GEOSPHERE), ("status", ASCENDING)], name="geo_status"),
+        # booking_routes.agent_bookings, agent dashboards
+        IndexModel([("created_by", ASCENDING)], name="created_by"),
+        # utils.package_import upserts on the natural key
+        IndexModel(
+            [("created_by", ASCENDING), ("title", ASCENDING), ("location", ASCENDING)],
+            name="natural_key",
+        ),
+        # ...and import_key (set on imported packages only) keeps two
+        # concurrent imports of the same row from both inserting it. Sparse
+        # rather than a partialFilterExpression so mongomock honours it too.
+        IndexModel([("import_key", ASCENDING)], name="import_key_unique", unique=True, sparse=True),
+    ],
+    "bookings": [
+        # booking_routes.my_bookings
+        IndexModel([("user_email", ASCENDING)], name="user_email"),
+        # per-package lookups (owner backfill, analytics)
+        IndexModel([("package_id", ASCENDING)], name="package_id"),
+        # booking_routes.agent_bookings
+        IndexModel([("package_owner", ASCENDING), ("_id", ASCENDING)], name="package_owner"),
+        # utils.payment_worker.recover: pending bookings and expired claims
+        IndexModel([("payment_status", ASCENDING), ("claimed_at", ASCENDING)], name="payment_status_claimed_at"),
+    ],
+    "idempotency_keys": [
+        # keys are only replayable for a day
+        IndexModel([("created_at", ASCENDING)], name="created_at_ttl", expireAfterSeconds=24 * 3600),
+    ],
+}
+
+
+# --------------------------
+# Create all declared indexes (idempotent)
+# Called once on application startup
+# --------------------------
+async def ensure_indexes(database=None):
+    database = database if database is not None else db
+
+    for col_name, models in INDEXES.items():
+        try:
+            created = await database[col_name].create_indexes(models)
+            logger.info("indexes ready on %s: %s", col_name, created)
+        except OperationFailure as exc:
+            # e.g. duplicate emails already stored - keep the app booting
+            logger.error("could not build indexes on %s: %s", col_name, exc)
+
+
+# --------------------------
+# Query plan checker (dev only)
+# --------------------------
+def _has_collscan(plan):
+    if isinstance(plan, dict):
+        if plan.get("stage") == "COLLSCAN":
+            return True
+        return any(_has_collscan(v) for v in plan.values())
+    if isinstance(plan, list):
+        return any(_has_collscan(v) for v in plan)
+    return False
+
+
+async def check_query_plan(col, query, sort=None):
+    cursor = col.find(query or {})
+    if sort:
+        cursor = cursor.sort(sort)
+
+    try:
+        plan = await cursor.explain()
+    except (OperationFailure, NotImplementedError, AttributeError):
+        return None
+
+    winning = plan.get("queryPlanner", {}).get("winningPlan", {})
+    if _has_collscan(winning):
+        logger.warning("COLLSCAN on %s for query %r", col.name, query)
+        return False
+    return True
@@ -0,0 +1,94 @@
+"""
+One-off data migrations.
+
+Usage (from backend/):
+    python -m database.migrations backfill_package_owner
+    python -m database.migrations rebuild_rollups
+    python -m database.migrations backfill_package_geo
+"""
+import asyncio
+import sys
+from pymongo import UpdateMany
+from database.repositories import packages_repo, bookings_repo
+from database.rollups import rebuild_rollups
+from utils.geocoding import geocode
+from utils.http_client import UpstreamUnavailable
+from utils.cache import catalog_cache
+
+BATCH_SIZE = 1000
+
+
+# --------------------------
+# bookings.package_owner
+# Copies packages.created_by onto every booking that predates the field.
+# Safe to re-run: only touches bookings still missing package_owner.
+# --------------------------
+async def backfill_package_owner():
+    ops, updated = [], 0
+
+    async for pkg in packages_repo.stream({}, {"created_by": 1}):
+        ops.append(UpdateMany(
+            {"package_id": str(pkg["_id"]), "package_owner": {"$exists": False}},
+            {"$set": {"package_owner": pkg.get("created_by")}},
+        ))
+        if len(ops) >= BATCH_SIZE:
+            updated += (await bookings_repo.bulk_write(ops)).modified_count
+            ops = []
+
+    if ops:
+        updated += (await bookings_repo.bulk_write(ops)).modified_count
+
+    return updated
+
+
+# --------------------------
+# packages.geo
+# Geocodes each distinct location once and sets the point on every
+# package at that location that does not have one yet.
+# Returns (updated, unresolved locations).
+# --------------------------
+async def backfill_package_geo():
+    locations = await packages_repo.aggregate([
+        {"$match": {"geo": {"$exists": False}}},
+        {"$group": {"_id": "$location"}},
+    ])
+
+    ops, unresolved = [], []
+    for row in locations:
+        try:
+            geo = await geocode(row["_id"])
+        except UpstreamUnavailable:
+            geo = None      # left for the next run
+        if geo is None:
+            unresolved.append(row["_id"])
+            continue
+        ops.append(UpdateMany(
+            {"location": row["_id"], "geo": {"$exists": False}},
+            {"$set": {"geo": geo}},
+        ))
+
+    updated = 0
+    for i in range(0, len(ops), BATCH_SIZE):
+        updated += (await packages_repo.bulk_write(ops[i:i + BATCH_SIZE])).modified_count
+
+    # packages changed behind the API: drop cached pages and ETags (shared with
+    # the server only on the redis backend)
+    if updated:
+        await catalog_cache.invalidate()
+    return updated, unresolved
+
+
+MIGRATIONS = {
+    "backfill_package_owner": backfill_package_owner,
+    "rebuild_rollups": rebuild_rollups,
+    "backfill_package_geo": backfill_package_geo,
+}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2 or sys.argv[1] not in MIGRATIONS:
+        print(f"usage: python -m database.migrations [{'|'.join(MIGRATIONS)}]")
+        sys.exit(1)
+
+    result = asyncio.run(MIGRATIONS[sys.argv[1]]())
+    print(f"{sys.argv[1]}: {result}")
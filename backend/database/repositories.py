@@ -0,0 +1,138 @@
+from bson import ObjectId
+from pymongo import ReturnDocument
+from database.db_connection import (
+    users_col, packages_col, bookings_col, idempotency_col, capacity_col, geocodes_col,
+    daily_stats_col, package_stats_col, agent_stats_col, moderation_stats_col,
+)
+from database.indexes import QUERY_PLAN_CHECK, check_query_plan
+from utils.metrics import timed_db
+
+
+# --------------------------
+# Base repository
+# Thin async wrapper around a Motor collection.
+# Routes talk to these objects instead of the raw collections.
+# Every call is timed into db_operation_duration_seconds (utils/metrics.py).
+# --------------------------
+class Repository:
+    def __init__(self, collection):
+        self.col = collection
+        self.name = collection.name
+
+    async def check_plan(self, query, sort=None):
+        # QUERY_PLAN_CHECK=1: log reads that would scan the collection;
+        # unfiltered reads are expected to scan and are not checked
+        if QUERY_PLAN_CHECK and query:
+            await check_query_plan(self.col, query, sort)
+
+    @timed_db("find_one")
+    async def find_one(self, query, projection=None):
+        await self.check_plan(query)
+        return await self.col.find_one(query, projection)
+
+    @timed_db("get_by_id")
+    async def get_by_id(self, oid: ObjectId, projection=None):
+        return await self.col.find_one({"_id": oid}, projection)
+
+    @timed_db("find")
+    async def find(self, query=None, projection=None, sort=None, limit=0):
+        await self.check_plan(query, sort)
+
+        cursor = self.col.find(query or {}, projection)
+        if sort:
+            cursor = cursor.sort(sort)
+        if limit:
+            cursor = cursor.limit(limit)
+        return await cursor.to_list(length=None)
+
+    async def stream(self, query=None, projection=None, batch_size=500):
+        # iterates the cursor batch by batch - nothing is materialized
+        async for doc in self.col.find(query or {}, projection, batch_size=batch_size):
+            yield doc
+
+    @timed_db("insert_one")
+    async def insert_one(self, doc):
+        return await self.col.insert_one(doc)
+
+    @timed_db("update_one")
+    async def update_one(self, query, update, upsert=False):
+        return await self.col.update_one(query, update, upsert=upsert)
+
+    @timed_db("find_one_and_update")
+    async def find_one_and_update(self, query, update, return_after=True, projection=None, upsert=False):
+        # single round trip: write and get the document back
+        return await self.col.find_one_and_update(
+            query, update, projection=projection, upsert=upsert,
+            return_document=ReturnDocument.AFTER if return_after else ReturnDocument.BEFORE,
+        )
+
+    @timed_db("delete_one")
+    async def delete_one(self, query):
+        return await self.col.delete_one(query)
+
+    @timed_db("delete_many")
+    async def delete_many(self, query):
+        return await self.col.delete_many(query)
+
+    @timed_db("insert_many")
+    async def insert_many(self, docs):
+        return await self.col.insert_many(docs)
+
+    @timed_db("bulk_write")
+    async def bulk_write(self, requests, ordered=False):
+        return await self.col.bulk_write(requests, ordered=ordered)
+
+    @timed_db("update_many")
+    async def update_many(self, query, update):
+        return await self.col.update_many(query, update)
+
+    @timed_db("count")
+    async def count(self, query=None):
+        await self.check_plan(query)
+        return await self.col.count_documents(query or {})
+
+    @timed_db("aggregate")
+    async def aggregate(self, pipeline):
+        # the leading $match decides whether the pipeline can use an index
+        if pipeline and "$match" in pipeline[0]:
+            await self.check_plan(pipeline[0]["$match"])
+        return await self.col.aggregate(pipeline).to_list(length=None)
+
+
+# --------------------------
+# USERS
+# --------------------------
+class UserRepository(Repository):
+    @timed_db("get_by_email")
+    async def get_by_email(self, email: str):
+        # login / register: the first hot query an unindexed plan would hurt
+        await self.check_plan({"email": email})
+        return await self.col.find_one({"email": email})
+
+
+# --------------------------
+# PACKAGES
+# --------------------------
+class PackageRepository(Repository):
+    pass
+
+
+# --------------------------
+# BOOKINGS
+# --------------------------
+class BookingRepository(Repository):
+    pass
+
+
+users_repo = UserRepository(users_col)
+packages_repo = PackageRepository(packages_col)
+bookings_repo = BookingRepository(bookings_col)
+idempotency_repo = Repository(idempotency_col)
+capacity_repo = Repository(capacity_col)
+geocodes_repo = Repository(geocodes_col)
+
+# Analytics rollups
+daily_stats_repo = Repository(daily_stats_col)
+package_stats_repo = Repository(package_stats_col)
+agent_stats_repo = Repository(agent_stats_col)
+moderation_stats_repo = Repository(moderation_stats_col)
@@ -0,0 +1,156 @@
+import asyncio
+from database.repositories import (
+    bookings_repo, packages_repo,
+    daily_stats_repo, package_stats_repo, agent_stats_repo, moderation_stats_repo,
+)
+
+# --------------------------
+# Analytics rollups
+# Small pre-aggregated collections updated incrementally on every
+# paid booking and moderation decision, so dashboards never scan bookings.
+#   stats_daily       _id = "YYYY-MM-DD"  -> bookings, revenue, persons
+#   stats_packages    _id = package_id    -> bookings, revenue, persons + labels
+#   stats_agents      _id = owner email   -> bookings, revenue
+#   stats_moderation  _id = "packages"    -> submitted, approved, rejected
+# --------------------------
+
+MODERATION_ID = "packages"
+
+# the moderation funnel covers packages someone submitted; ownerless ones
+# (seed data, admin imports) never entered the queue
+SUBMITTED = {"created_by": {"$ne": None}}
+
+
+# --------------------------
+# Incremental updates
+# --------------------------
+async def record_booking(booking):
+    inc = {"bookings": 1, "revenue": booking["total"], "persons": booking["persons"]}
+    day = booking["created_at"].strftime("%Y-%m-%d")
+
+    updates = [
+        daily_stats_repo.update_one({"_id": day}, {"$inc": inc}, upsert=True),
+        package_stats_repo.update_one(
+            {"_id": booking["package_id"]},
+            {
+                "$inc": inc,
+                "$set": {
+                    "title": booking.get("package_title"),
+                    "location": booking.get("package_location"),
+                    "category": booking.get("package_category"),
+                    "owner": booking.get("package_owner"),
+                },
+            },
+            upsert=True,
+        ),
+    ]
+    if booking.get("package_owner"):
+        updates.append(agent_stats_repo.update_one(
+            {"_id": booking["package_owner"]},
+            {"$inc": {"bookings": 1, "revenue": booking["total"]}},
+            upsert=True,
+        ))
+
+    await asyncio.gather(*updates)
+
+
+def is_submission(pkg):
+    return pkg.get("status") == "pending" and pkg.get("created_by") is not None
+
+
+async def record_submission(pkg):
+    if is_submission(pkg):
+        await moderation_stats_repo.update_one(
+            {"_id": MODERATION_ID}, {"$inc": {"submitted": 1}}, upsert=True
+        )
+
+
+async def record_submissions(pkgs):
+    # bulk imports report their new packages in one update per batch
+    count = sum(1 for pkg in pkgs if is_submission(pkg))
+    if count:
+        await moderation_stats_repo.update_one(
+            {"_id": MODERATION_ID}, {"$inc": {"submitted": count}}, upsert=True
+        )
+
+
+async def record_moderation(old_status, new_status, count=1):
+    # only count real pending -> approved/rejected transitions
+    if old_status != "pending" or new_status not in ("approved", "rejected") or not count:
+        return
+    await moderation_stats_repo.update_one(
+        {"_id": MODERATION_ID}, {"$inc": {new_status: count}}, upsert=True
+    )
+
+
+# --------------------------
+# Full rebuild from source collections
+# Used after deploying rollups on existing data or to repair drift.
+# Only paid bookings count, matching the incremental path.
+# Each collection is replaced with $out (built aside, then swapped in
+# atomically), so readers and concurrent $inc upserts never meet a
+# half-empty collection. Increments landing while a pipeline runs are
+# overwritten by the swap - run it again if bookings were in flight.
+# --------------------------
+PAID = {"$match": {"payment_status": "success"}}
+
+DAILY_PIPELINE = [
+    PAID,
+    {"$group": {
+        "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}},
+        "bookings": {"$sum": 1},
+        "revenue": {"$sum": "$total"},
+        "persons": {"$sum": "$persons"},
+    }},
+]
+
+PACKAGE_PIPELINE = [
+    PAID,
+    {"$group": {
+        "_id": "$package_id",
+        "bookings": {"$sum": 1},
+        "revenue": {"$sum": "$total"},
+        "persons": {"$sum": "$persons"},
+        "title": {"$first": "$package_title"},
+        "location": {"$first": "$package_location"},
+        "category": {"$first": "$package_category"},
+        "owner": {"$first": "$package_owner"},
+    }},
+]
+
+AGENT_PIPELINE = [
+    PAID,
+    {"$match": {"package_owner": {"$ne": None}}},
+    {"$group": {
+        "_id": "$package_owner",
+        "bookings": {"$sum": 1},
+        "revenue": {"$sum": "$total"},
+    }},
+]
+
+
+async def _replace(repo, pipeline):
+    await bookings_repo.aggregate(pipeline + [{"$out": repo.name}])
+    return await repo.count()
+
+
+async def rebuild_rollups():
+    days, packages, agents = await asyncio.gather(
+        _replace(daily_stats_repo, DAILY_PIPELINE),
+        _replace(package_stats_repo, PACKAGE_PIPELINE),
+        _replace(agent_stats_repo, AGENT_PIPELINE),
+    )
+
+    # transition history is not stored, so seed from current statuses
+    approved, rejected, pending = await asyncio.gather(
+        packages_repo.count({"status": "approved", **SUBMITTED}),
+        packages_repo.count({"status": "rejected", **SUBMITTED}),
+        packages_repo.count({"status": "pending", **SUBMITTED}),
+    )
+    await moderation_stats_repo.update_one(
+        {"_id": MODERATION_ID},
+        {"$set": {"submitted": approved + rejected + pending, "approved": approved, "rejected": rejected}},
+        upsert=True,
+    )
+
+    return {"days": days, "packages": packages, "agents": agents}
@@ -0,0 +1,56 @@
+"""
+Bulk import / upsert packages from an NDJSON or CSV file.
+
+Usage (from backend/):
+    python import_packages.py catalog.ndjson
+    python import_packages.py catalog.csv --owner agent@example.com --status pending
+    cat catalog.ndjson | python import_packages.py - --format ndjson
+
+Rows are validated against PackageCreate and upserted on
+(created_by, title, location). A running API picks up the new packages
+in search on its next restart.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from utils.package_import import FORMATS, IMPORT_BATCH_SIZE, detect_format, parse_rows, import_packages
+
+CHUNK_SIZE = 1 << 20
+
+
+async def file_chunks(f):
+    while True:
+        chunk = await asyncio.to_thread(f.read, CHUNK_SIZE)
+        if not chunk:
+            break
+        yield chunk
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Bulk import packages")
+    parser.add_argument("path", help="NDJSON/CSV file, or - for stdin")
+    parser.add_argument("--format", choices=FORMATS)
+    parser.add_argument("--owner", help="set created_by on every row")
+    parser.add_argument("--status", help="set status on every row")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    fmt = args.format or detect_format(None, args.path)
+    f = sys.stdin.buffer if args.path == "-" else open(args.path, "rb")
+    with f:
+        report = await import_packages(
+            parse_rows(file_chunks(f), fmt), owner=args.owner, status=args.status,
+            batch_size=args.batch_size,
+        )
+
+    errors = report.pop("errors")
+    for err in errors:
+        print(f"row {err['row']}: {err['error']}", file=sys.stderr)
+    print(json.dumps(report))
+    if report["received"]:
+        print(f"{report['received'] / max(report['seconds'], 1e-9):.0f} rows/sec", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
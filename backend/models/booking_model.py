@@ -1,12 +1,21 @@
-from pydantic import BaseModel
-from typing import Optional
-from datetime import datetime
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from typing import List, Optional
+from datetime import date, datetime
 
 class BookingCreate(BaseModel):
     package_id: str
     date: str
-    persons: int
-    total: float
+    persons: int = Field(..., ge=1)
+    total: Optional[float] = None   # ignored - computed server side from the package
+
+    @field_validator("date")
+    @classmethod
+    def iso_date(cls, value):
+        # one spelling per day: the seat counter is keyed on this string
+        try:
+            return date.fromisoformat(value.strip()).isoformat()
+        except ValueError:
+            raise ValueError("date must be an ISO date (YYYY-MM-DD)")
 
 class BookingInDB(BaseModel):
     id: Optional[str]
@@ -16,3 +25,28 @@ class BookingInDB(BaseModel):
     persons: int
     total: float
     created_at: datetime
+
+# --------------------------
+# Response models (fields optional because of ?fields= projections)
+# --------------------------
+class BookingOut(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    id: str
+    package_id: Optional[str] = None
+    user_email: Optional[str] = None
+    date: Optional[str] = None
+    persons: Optional[int] = None
+    total: Optional[float] = None
+    payment_id: Optional[str] = None
+    payment_status: Optional[str] = None
+    paid_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    package_title: Optional[str] = None
+    package_location: Optional[str] = None
+    package_owner: Optional[str] = None
+    package_category: Optional[str] = None
+
+class BookingPage(BaseModel):
+    items: List[BookingOut]
+    next_cursor: Optional[str] = None
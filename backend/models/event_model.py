@@ -0,0 +1,62 @@
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Dict, List, Literal, Optional
+from datetime import datetime
+
+# --------------------------
+# Domain events (utils/event_bus.py)
+# Emitted after a write has succeeded; documents are the stored Mongo
+# shape (_id, not id). Events from a change stream lack what Mongo does
+# not report (previous status / role), so those fields are optional.
+# --------------------------
+class Event(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    occurred_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class PackageCreated(Event):
+    package: dict
+
+
+class PackagesCreated(Event):
+    # one event per bulk import batch
+    packages: List[dict]
+
+
+class PackageUpdated(Event):
+    package: dict                        # document after the update
+    previous_status: Optional[str] = None
+
+
+class PackagesModerated(Event):
+    # one event per request, however many packages a bulk moderation hit
+    package_ids: List[str]
+    status: str
+    previous: Dict[Optional[str], int] = {}   # previous status -> count
+
+
+class PackageApproved(PackagesModerated):
+    status: Literal["approved"] = "approved"
+
+
+class PackageRejected(PackagesModerated):
+    status: Literal["rejected"] = "rejected"
+
+
+class PackageDeleted(Event):
+    package_id: str
+    status: Optional[str] = None
+
+
+class BookingCreated(Event):
+    booking: dict
+
+
+class UserRoleChanged(Event):
+    user_id: str
+    email: Optional[str] = None
+    role: str
+    previous_role: Optional[str] = None
+
+
+MODERATION_EVENTS = {"approved": PackageApproved, "rejected": PackageRejected}
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional
 
 class PackageBase(BaseModel):
@@ -9,11 +9,14 @@ class PackageBase(BaseModel):
     days: int
     category: str = "packages"
     image: Optional[str] = None
-    offers: List[str] = []
-    inclusions: List[str] = []
-    highlights: List[str] = []
-    itinerary: List[str] = []
-    gallery: List[str] = []
+    offers: List[str] = Field(default_factory=list)
+    inclusions: List[str] = Field(default_factory=list)
+    highlights: List[str] = Field(default_factory=list)
+    itinerary: List[str] = Field(default_factory=list)
+    gallery: List[str] = Field(default_factory=list)
+    discount: Optional[float] = None          # percent off, shown on package cards
+    rating: Optional[float] = None
+    capacity_per_date: Optional[int] = None   # max persons per travel date (None = unlimited)
     status: str = "approved"  # approved, pending, rejected
 
 class PackageCreate(PackageBase):
@@ -22,3 +25,43 @@ class PackageCreate(PackageBase):
 
 class PackageUpdate(PackageBase):
     pass
+
+class PackageBulkModeration(BaseModel):
+    # either explicit ids, or a filter over the pending queue
+    ids: Optional[List[str]] = None
+    created_by: Optional[str] = None
+    category: Optional[str] = None
+
+# --------------------------
+# Response models
+# Everything but id is optional: ?fields= projections return partial
+# documents, and stored packages may carry extra fields.
+# --------------------------
+class PackageOut(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    id: str
+    title: Optional[str] = None
+    description: Optional[str] = None
+    location: Optional[str] = None
+    price: Optional[float] = None
+    days: Optional[int] = None
+    category: Optional[str] = None
+    image: Optional[str] = None
+    offers: Optional[List[str]] = None
+    inclusions: Optional[List[str]] = None
+    highlights: Optional[List[str]] = None
+    itinerary: Optional[List[str]] = None
+    gallery: Optional[List[str]] = None
+    discount: Optional[float] = None
+    rating: Optional[float] = None
+    capacity_per_date: Optional[int] = None
+    status: Optional[str] = None
+    created_by: Optional[str] = None
+    geo: Optional[dict] = None
+    distance_km: Optional[float] = None    # /near only
+
+class PackagePage(BaseModel):
+    items: List[PackageOut]
+    next_cursor: Optional[str] = None
+    facets: Optional[dict] = None          # ?facets=true only
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
+from typing import List, Optional
 
 class UserCreate(BaseModel):
     name: str = Field(...)
@@ -12,3 +12,16 @@ class UserInDB(BaseModel):
     name: str
     email: EmailStr
     role: str
+
+# --------------------------
+# Response models (never carry the password hash)
+# --------------------------
+class UserOut(BaseModel):
+    id: str
+    name: Optional[str] = None
+    email: Optional[str] = None
+    role: Optional[str] = None
+
+class UserPage(BaseModel):
+    items: List[UserOut]
+    next_cursor: Optional[str] = None
@@ -1,26 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from bson import ObjectId
-from database.db_connection import users_col, packages_col, bookings_col
+from datetime import datetime
+from database.repositories import users_repo, packages_repo, bookings_repo
+from models.user_model import UserOut, UserPage
+from models.package_model import PackageOut, PackagePage
+from models.booking_model import BookingOut, BookingPage
 from utils.role_checker import RoleChecker
 from utils.auth_bearer import AuthBearer
+from utils.search_index import search_index
+from utils.cache import catalog_cache, etag_matches
+from utils.pagination import MAX_LIMIT, paginate, page_response
+from utils.export import export_response, id_range
+from utils.serialization import serialize_doc, json_response
+from utils.event_bus import event_bus
+from models.event_model import PackageDeleted, UserRoleChanged
 
 router = APIRouter()
 
+USER_SORTS = ("_id", "email", "name")
+PACKAGE_SORTS = ("_id", "price", "title")
+BOOKING_SORTS = ("_id", "created_at", "date")
+
+USER_EXPORT_COLUMNS = ["id", "name", "email", "role"]
+PACKAGE_EXPORT_COLUMNS = [
+    "id", "title", "location", "category", "price", "days", "status", "created_by",
+]
+BOOKING_EXPORT_COLUMNS = [
+    "id", "package_id", "package_title", "package_location", "user_email", "date",
+    "persons", "total", "payment_id", "payment_status", "created_at",
+]
+
 
 # --------------------------
 # Utility: Convert Mongo Docs
 # --------------------------
 def serialize_user(u):
-    u["id"] = str(u["_id"])
-    del u["_id"]
-    del u["password"]   # never expose password
-    return u
+    return serialize_doc(u, hidden=("password",))   # never expose password
 
 def serialize_item(i):
-    i["id"] = str(i["_1"]) if "_1" in i else str(i["_id"])
-    if "_id" in i:
-        del i["_id"]
-    return i
+    return serialize_doc(i)
 
 
 # ==========================
@@ -31,10 +50,16 @@ def serialize_item(i):
 # --------------------------
 # GET ALL USERS
 # --------------------------
-@router.get("/users", dependencies=[Depends(RoleChecker(["admin"]))])
-def get_users():
-    users = list(users_col.find())
-    return [serialize_user(u) for u in users]
+@router.get("/users", dependencies=[Depends(RoleChecker(["admin"]))],
+            response_model=Union[List[UserOut], UserPage])
+async def get_users(
+    limit: int = Query(None, ge=1, le=MAX_LIMIT),
+    after: str = Query(None),
+    fields: str = Query(None),
+    sort: str = Query(None)
+):
+    users, next_cursor = await paginate(users_repo, {}, limit, after, fields, sort, USER_SORTS)
+    return json_response(page_response([serialize_user(u) for u in users], next_cursor, limit))
 
 
 # --------------------------
@@ -42,7 +67,7 @@ def get_users():
 # (e.g., promote to agent)
 # --------------------------
 @router.put("/users/{user_id}/role", dependencies=[Depends(RoleChecker(["admin"]))])
-def change_role(user_id: str, role: str):
+async def change_role(user_id: str, role: str):
     if role not in ["traveler", "travel_partner", "admin"]:
         raise HTTPException(400, "Invalid role")
 
@@ -51,11 +76,14 @@ def change_role(user_id: str, role: str):
     except:
         raise HTTPException(400, "Invalid ID")
 
-    user = users_col.find_one({"_id": oid})
+    user = await users_repo.get_by_id(oid)
     if not user:
         raise HTTPException(404, "User not found")
 
-    users_col.update_one({"_id": oid}, {"$set": {"role": role}})
+    await users_repo.update_one({"_id": oid}, {"$set": {"role": role}})
+    event_bus.publish(UserRoleChanged(
+        user_id=user_id, email=user.get("email"), role=role, previous_role=user.get("role")
+    ))
 
     return {"message": "Role updated successfully"}
 
@@ -64,13 +92,13 @@ def change_role(user_id: str, role: str):
 # DELETE USER
 # --------------------------
 @router.delete("/users/{user_id}", dependencies=[Depends(RoleChecker(["admin"]))])
-def delete_user(user_id: str):
+async def delete_user(user_id: str):
     try:
         oid = ObjectId(user_id)
     except:
         raise HTTPException(400, "Invalid ID")
 
-    result = users_col.delete_one({"_id": oid})
+    result = await users_repo.delete_one({"_id": oid})
 
     if result.deleted_count == 0:
         raise HTTPException(404, "User not found")
@@ -80,35 +108,116 @@ def delete_user(user_id: str):
 
 # --------------------------
 # GET ALL PACKAGES
+# ETag follows the package write counter (304 without a query)
 # --------------------------
-@router.get("/packages", dependencies=[Depends(RoleChecker(["admin"]))])
-def admin_packages():
-    items = list(packages_col.find())
-    return [serialize_item(i) for i in items]
+@router.get("/packages", dependencies=[Depends(RoleChecker(["admin"]))],
+            response_model=Union[List[PackageOut], PackagePage])
+async def admin_packages(
+    request: Request,
+    limit: int = Query(None, ge=1, le=MAX_LIMIT),
+    after: str = Query(None),
+    fields: str = Query(None),
+    sort: str = Query(None)
+):
+    etag = await catalog_cache.packages_etag(request)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    items, next_cursor = await paginate(packages_repo, {}, limit, after, fields, sort, PACKAGE_SORTS)
+    return json_response(page_response([serialize_item(i) for i in items], next_cursor, limit), headers={"ETag": etag})
 
 
 # --------------------------
 # GET ALL BOOKINGS
 # --------------------------
-@router.get("/bookings", dependencies=[Depends(RoleChecker(["admin"]))])
-def admin_bookings():
-    bookings = list(bookings_col.find())
-    return [serialize_item(b) for b in bookings]
+@router.get("/bookings", dependencies=[Depends(RoleChecker(["admin"]))],
+            response_model=Union[List[BookingOut], BookingPage])
+async def admin_bookings(
+    limit: int = Query(None, ge=1, le=MAX_LIMIT),
+    after: str = Query(None),
+    fields: str = Query(None),
+    sort: str = Query(None)
+):
+    bookings, next_cursor = await paginate(bookings_repo, {}, limit, after, fields, sort, BOOKING_SORTS)
+    return json_response(page_response([serialize_item(b) for b in bookings], next_cursor, limit))
 
 
 # --------------------------
 # DELETE PACKAGE
 # --------------------------
 @router.delete("/packages/{package_id}", dependencies=[Depends(RoleChecker(["admin"]))])
-def admin_delete_package(package_id: str):
+async def admin_delete_package(package_id: str):
     try:
         oid = ObjectId(package_id)
     except:
         raise HTTPException(400, "Invalid ID")
 
-    result = packages_col.delete_one({"_id": oid})
+    result = await packages_repo.delete_one({"_id": oid})
 
     if result.deleted_count == 0:
         raise HTTPException(404, "Package not found")
 
+    search_index.remove(package_id)
+    await catalog_cache.invalidate(oid)
+    event_bus.publish(PackageDeleted(package_id=package_id))
     return {"message": "Package deleted"}
+
+
+# ==========================
+#   STREAMING EXPORTS
+#   ?format=ndjson|csv&date_from=&date_to=&status=
+# ==========================
+
+
+# --------------------------
+# EXPORT USERS (status = role)
+# --------------------------
+@router.get("/users/export", dependencies=[Depends(RoleChecker(["admin"]))])
+async def export_users(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    date_from: datetime = Query(None),
+    date_to: datetime = Query(None),
+    status: str = Query(None)
+):
+    query = id_range(date_from, date_to)
+    if status:
+        query["role"] = status
+
+    docs = users_repo.stream(query, {"password": 0})
+    return export_response(docs, "users", format, serialize_user, USER_EXPORT_COLUMNS)
+
+
+# --------------------------
+# EXPORT PACKAGES
+# --------------------------
+@router.get("/packages/export", dependencies=[Depends(RoleChecker(["admin"]))])
+async def export_packages(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    date_from: datetime = Query(None),
+    date_to: datetime = Query(None),
+    status: str = Query(None)
+):
+    query = id_range(date_from, date_to)
+    if status:
+        query["status"] = status
+
+    docs = packages_repo.stream(query)
+    return export_response(docs, "packages", format, serialize_item, PACKAGE_EXPORT_COLUMNS)
+
+
+# --------------------------
+# EXPORT BOOKINGS (status = payment_status)
+# --------------------------
+@router.get("/bookings/export", dependencies=[Depends(RoleChecker(["admin"]))])
+async def export_bookings(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    date_from: datetime = Query(None),
+    date_to: datetime = Query(None),
+    status: str = Query(None)
+):
+    query = id_range(date_from, date_to)
+    if status:
+        query["payment_status"] = status
+
+    docs = bookings_repo.stream(query)
+    return export_response(docs, "bookings", format, serialize_item, BOOKING_EXPORT_COLUMNS)
@@ -1,16 +1,12 @@
 from fastapi import APIRouter, HTTPException, status
 from pydantic import BaseModel
-from database.db_connection import users_col
-from passlib.context import CryptContext
+from database.repositories import users_repo
+from pymongo.errors import DuplicateKeyError
 from utils.jwt_helper import create_access_token
+from utils.hashing import hashing_pool, HashingOverloaded
 
 router = APIRouter()
 
-pwd_context = CryptContext(
-    schemes=["argon2"],
-    deprecated="auto"
-)
-
 # --------------------------
 # SCHEMAS
 # --------------------------
@@ -27,28 +23,43 @@ class LoginSchema(BaseModel):
 # --------------------------
 # HELPERS
 # --------------------------
-def get_password_hash(password):
-    return pwd_context.hash(password)
+# argon2 runs on the bounded hashing pool; when it is saturated we shed
+# load with 503 + Retry-After instead of queueing without limit
+async def get_password_hash(password):
+    try:
+        return await hashing_pool.hash(password)
+    except HashingOverloaded:
+        raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
+
+async def verify_password(plain_password, hashed):
+    try:
+        return await hashing_pool.verify_and_update(plain_password, hashed)
+    except HashingOverloaded:
+        raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
 
-def verify_password(plain_password, hashed):
-    return pwd_context.verify(plain_password, hashed)
 # --------------------------
 # REGISTER
 # --------------------------
 @router.post("/register")
-def register(payload: RegisterSchema):
-    existing = users_col.find_one({"email": payload.email})
+async def register(payload: RegisterSchema):
+    existing = await users_repo.get_by_email(payload.email)
     if existing:
         raise HTTPException(status_code=400, detail="Email already exists")
 
+    hashed = await get_password_hash(payload.password)
+
     user_doc = {
         "name": payload.name,
         "email": payload.email,
-        "password": get_password_hash(payload.password),
+        "password": hashed,
         "role": payload.role
     }
 
-    users_col.insert_one(user_doc)
+    # unique email index catches concurrent registrations of the same email
+    try:
+        await users_repo.insert_one(user_doc)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Email already exists")
 
     return {"message": "User registered successfully"}
 
@@ -56,15 +67,20 @@ def register(payload: RegisterSchema):
 # LOGIN
 # --------------------------
 @router.post("/login")
-def login(payload: LoginSchema):
-    user = users_col.find_one({"email": payload.email})
+async def login(payload: LoginSchema):
+    user = await users_repo.get_by_email(payload.email)
 
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    if not verify_password(payload.password, user["password"]):
+    valid, new_hash = await verify_password(payload.password, user["password"])
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
+    # transparently upgrade hashes made with old CryptContext parameters
+    if new_hash:
+        await users_repo.update_one({"_id": user["_id"]}, {"$set": {"password": new_hash}})
+
     token = create_access_token({
         "email": user["email"],
         "role": user["role"],
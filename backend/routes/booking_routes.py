@@ -1,90 +1,190 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, Header
 from bson import ObjectId
 from datetime import datetime
 
-from database.db_connection import bookings_col, packages_col, users_col
-from models.booking_model import BookingCreate
+from database.repositories import bookings_repo, packages_repo
+from models.booking_model import BookingCreate, BookingOut, BookingPage
 from utils.auth_bearer import AuthBearer
 from utils.role_checker import RoleChecker
-from utils.payment_mock import process_dummy_payment
+from utils.payment_worker import payment_worker
+from utils.pagination import MAX_LIMIT, paginate, page_response
+from utils.capacity import reserve, release
+from utils import idempotency
+from utils.serialization import serialize_doc, json_response
+from utils.event_bus import event_bus
+from models.event_model import BookingCreated
 
 router = APIRouter()
 
+BOOKING_SORTS = ("_id", "created_at", "date")
+
 # --------------------------
 # Utility: Convert Mongo docs
 # --------------------------
 def serialize_booking(b):
-    b["id"] = str(b["_id"])
-    del b["_id"]
-    return b
+    return serialize_doc(b)
 
 
 # --------------------------
 # CREATE BOOKING (User)
+# Optional "Idempotency-Key" header makes client retries safe:
+# a repeated key replays the first response instead of booking twice.
 # --------------------------
 @router.post("/")
-def create_booking(payload: BookingCreate, user=Depends(AuthBearer())):
+async def create_booking(
+    payload: BookingCreate,
+    user=Depends(AuthBearer()),
+    idempotency_key: str = Header(None, alias="Idempotency-Key")
+):
+    if not idempotency_key:
+        return await place_booking(payload, user)
+
+    # fingerprint only the fields that affect the booking
+    replay = await idempotency.begin(user["email"], idempotency_key, payload.dict(exclude={"total"}))
+    if replay is not None:
+        return replay
+
+    try:
+        response = await place_booking(payload, user)
+    except BaseException:
+        await idempotency.abort(user["email"], idempotency_key)
+        raise
+
+    await idempotency.complete(user["email"], idempotency_key, response)
+    return response
+
+async def place_booking(payload: BookingCreate, user):
     # Check package exists
     try:
-        pkg = packages_col.find_one({"_id": ObjectId(payload.package_id)})
+        oid = ObjectId(payload.package_id)
     except:
         raise HTTPException(400, "Invalid package ID")
 
+    pkg = await packages_repo.get_by_id(oid)
+
     if not pkg:
         raise HTTPException(404, "Package not found")
 
-    # Dummy payment simulation
-    payment = process_dummy_payment(payload.total)
+    # Price is computed from the package - the client total is not trusted
+    total = float(pkg["price"]) * payload.persons
+
+    # Take the seats atomically before charging
+    capacity = pkg.get("capacity_per_date")
+    if not await reserve(payload.package_id, payload.date, payload.persons, capacity):
+        raise HTTPException(409, "Not enough seats left for this date")
 
+    # Payment runs in the background worker; the booking starts as pending
     booking_doc = {
         "package_id": payload.package_id,
         "user_email": user["email"],
         "date": payload.date,
         "persons": payload.persons,
-        "total": payload.total,
-        "payment_id": payment["payment_id"],
-        "payment_status": payment["status"],
+        "total": total,
+        "payment_id": None,
+        "payment_status": "pending",
+        "seats_reserved": capacity is not None,
         "created_at": datetime.utcnow(),
         "package_title": pkg["title"],
-        "package_location": pkg["location"]
+        "package_location": pkg["location"],
+        # denormalized so the agent view is a single indexed query
+        "package_owner": pkg.get("created_by"),
+        "package_category": pkg.get("category")
+    }
+
+    try:
+        # insert_one sets booking_doc["_id"]; no need to read it back
+        await bookings_repo.insert_one(booking_doc)
+    except BaseException:
+        if capacity is not None:
+            await release(payload.package_id, payload.date, payload.persons)
+        raise
+
+    payment_worker.enqueue(booking_doc["_id"])
+    event_bus.publish(BookingCreated(booking=booking_doc))
+
+    return {
+        "message": "Booking received, payment processing",
+        "booking": serialize_booking(booking_doc)
     }
 
-    result = bookings_col.insert_one(booking_doc)
-    new_booking = bookings_col.find_one({"_id": result.inserted_id})
+
+# --------------------------
+# PAYMENT STATUS (poll after booking)
+# --------------------------
+@router.get("/{booking_id}/payment")
+async def payment_status(booking_id: str, user=Depends(AuthBearer())):
+    try:
+        oid = ObjectId(booking_id)
+    except:
+        raise HTTPException(400, "Invalid booking ID")
+
+    booking = await bookings_repo.get_by_id(
+        oid, {"user_email": 1, "payment_status": 1, "payment_id": 1, "total": 1, "paid_at": 1}
+    )
+
+    # travelers only see their own bookings
+    if not booking or (booking["user_email"] != user["email"] and user.get("role") != "admin"):
+        raise HTTPException(404, "Booking not found")
 
     return {
-        "message": "Booking successful",
-        "booking": serialize_booking(new_booking)
+        "booking_id": booking_id,
+        "payment_status": booking["payment_status"],
+        "payment_id": booking.get("payment_id"),
+        "total": booking.get("total"),
+        "paid_at": booking.get("paid_at"),
     }
 
 
 # --------------------------
 # GET MY BOOKINGS (User)
 # --------------------------
-@router.get("/my")
-def my_bookings(user=Depends(AuthBearer())):
-    bookings = list(bookings_col.find({ "user_email": user["email"] }))
-    return [serialize_booking(b) for b in bookings]
+@router.get("/my", response_model=Union[List[BookingOut], BookingPage])
+async def my_bookings(
+    user=Depends(AuthBearer()),
+    limit: int = Query(None, ge=1, le=MAX_LIMIT),
+    after: str = Query(None),
+    fields: str = Query(None),
+    sort: str = Query(None)
+):
+    bookings, next_cursor = await paginate(
+        bookings_repo, {"user_email": user["email"]}, limit, after, fields, sort, BOOKING_SORTS
+    )
+    return json_response(page_response([serialize_booking(b) for b in bookings], next_cursor, limit))
 
 
 # --------------------------
 # GET ALL BOOKINGS (Admin)
 # --------------------------
-@router.get("/all", dependencies=[Depends(RoleChecker(["admin"]))])
-def all_bookings():
-    bookings = list(bookings_col.find())
-    return [serialize_booking(b) for b in bookings]
+@router.get("/all", dependencies=[Depends(RoleChecker(["admin"]))],
+            response_model=Union[List[BookingOut], BookingPage])
+async def all_bookings(
+    limit: int = Query(None, ge=1, le=MAX_LIMIT),
+    after: str = Query(None),
+    fields: str = Query(None),
+    sort: str = Query(None)
+):
+    bookings, next_cursor = await paginate(
+        bookings_repo, {}, limit, after, fields, sort, BOOKING_SORTS
+    )
+    return json_response(page_response([serialize_booking(b) for b in bookings], next_cursor, limit))
 
 
 # --------------------------
 # AGENT: GET BOOKINGS FOR MY PACKAGES
 # --------------------------
-@router.get("/agent", dependencies=[Depends(RoleChecker(["travel_partner"]))])
-def agent_bookings(user=Depends(AuthBearer())):
-    # find packages created by the agent
-    my_packages = list(packages_col.find({ "created_by": user["email"] }))
-    my_package_ids = [str(p["_id"]) for p in my_packages]
-
-    # all bookings for those packages
-    bookings = list(bookings_col.find({ "package_id": { "$in": my_package_ids } }))
-    return [serialize_booking(b) for b in bookings]
+@router.get("/agent", dependencies=[Depends(RoleChecker(["travel_partner"]))],
+            response_model=Union[List[BookingOut], BookingPage])
+async def agent_bookings(
+    user=Depends(AuthBearer()),
+    limit: int = Query(None, ge=1, le=MAX_LIMIT),
+    after: str = Query(None),
+    fields: str = Query(None),
+    sort: str = Query(None)
+):
+    # bookings carry the package owner (see database/migrations.py for
+    # the backfill of older documents)
+    bookings, next_cursor = await paginate(
+        bookings_repo, {"package_owner": user["email"]}, limit, after, fields, sort, BOOKING_SORTS
+    )
+    return json_response(page_response([serialize_booking(b) for b in bookings], next_cursor, limit))
@@ -1,31 +1,45 @@
 from fastapi import APIRouter, HTTPException
 import os
-import requests
+from utils.http_client import external_client, UpstreamUnavailable
+from utils.geocoding import geocode
 
 router = APIRouter()
 
 OPENWEATHER_KEY = os.getenv("OPENWEATHER_KEY", "")
 OPENTRIPMAP_KEY = os.getenv("OPENTRIPMAP_KEY", "")
 
+# Base URLs are overridable so a local stub server can stand in
+OPENWEATHER_URL = os.getenv("OPENWEATHER_URL", "https://api.openweathermap.org")
+OPENTRIPMAP_URL = os.getenv("OPENTRIPMAP_URL", "https://api.opentripmap.com")
+
+# Cache lifetimes (seconds)
+WEATHER_TTL = 10 * 60
+PLACES_TTL = 24 * 3600
+
+
+async def fetch(url, params, cache_key, ttl):
+    try:
+        return await external_client.get_json(url, params, cache_key=cache_key, ttl=ttl)
+    except UpstreamUnavailable:
+        raise HTTPException(503, "External service unavailable")
+
+
 # --------------------------
 # WEATHER API (OpenWeather)
 # --------------------------
 @router.get("/weather/{city}")
-def weather(city: str):
+async def weather(city: str):
     if not OPENWEATHER_KEY:
         raise HTTPException(500, "OpenWeather API key missing")
 
-    url = (
-        f"https://api.openweathermap.org/data/2.5/weather?q={city}"
-        f"&appid={OPENWEATHER_KEY}&units=metric"
+    status, data = await fetch(
+        f"{OPENWEATHER_URL}/data/2.5/weather",
+        {"q": city, "appid": OPENWEATHER_KEY, "units": "metric"},
+        f"weather:{city.lower()}", WEATHER_TTL,
     )
-
-    res = requests.get(url)
-    if res.status_code != 200:
+    if status != 200:
         raise HTTPException(404, "Weather data not found")
 
-    data = res.json()
-
     return {
         "city": data["name"],
         "temperature": data["main"]["temp"],
@@ -40,33 +54,29 @@ def weather(city: str):
 # SEARCH PLACES (OpenTripMap)
 # --------------------------
 @router.get("/places/search")
-def search_places(city: str):
+async def search_places(city: str):
     if not OPENTRIPMAP_KEY:
         raise HTTPException(500, "OpenTripMap API key missing")
 
-    # get geolocation of city
-    geo_url = (
-        f"https://api.opentripmap.com/0.1/en/places/geoname?"
-        f"name={city}&apikey={OPENTRIPMAP_KEY}"
-    )
-
-    geo = requests.get(geo_url).json()
-
-    if "lat" not in geo:
+    # geocode cache -> offline gazetteer -> OpenTripMap (written back once)
+    try:
+        geo = await geocode(city)
+    except UpstreamUnavailable:
+        raise HTTPException(503, "External service unavailable")
+    if geo is None:
         raise HTTPException(404, "City not found")
 
-    lat, lon = geo["lat"], geo["lon"]
+    lon, lat = geo["coordinates"]
 
     # get places nearby
-    places_url = (
-        f"https://api.opentripmap.com/0.1/en/places/radius?"
-        f"radius=3000&lon={lon}&lat={lat}&rate=3&limit=15&apikey={OPENTRIPMAP_KEY}"
+    _, res = await fetch(
+        f"{OPENTRIPMAP_URL}/0.1/en/places/radius",
+        {"radius": 3000, "lon": lon, "lat": lat, "rate": 3, "limit": 15, "apikey": OPENTRIPMAP_KEY},
+        f"radius:{lat}:{lon}", PLACES_TTL,
     )
 
-    res = requests.get(places_url).json()
-
     attractions = []
-    for p in res.get("features", []):
+    for p in (res or {}).get("features", []):
         props = p["properties"]
         attractions.append({
             "name": props.get("name"),
@@ -82,18 +92,17 @@ def search_places(city: str):
 # GET PLACE DETAILS BY XID
 # --------------------------
 @router.get("/places/details/{xid}")
-def place_details(xid: str):
+async def place_details(xid: str):
     if not OPENTRIPMAP_KEY:
         raise HTTPException(500, "OpenTripMap API key missing")
 
-    url = (
-        f"https://api.opentripmap.com/0.1/en/places/xid/{xid}"
-        f"?apikey={OPENTRIPMAP_KEY}"
+    status, data = await fetch(
+        f"{OPENTRIPMAP_URL}/0.1/en/places/xid/{xid}",
+        {"apikey": OPENTRIPMAP_KEY},
+        f"xid:{xid}", PLACES_TTL,
     )
 
-    res = requests.get(url)
-
-    if res.status_code != 200:
+    if status != 200:
         raise HTTPException(404, "Place not found")
 
-    return res.json()
+    return data
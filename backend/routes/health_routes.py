@@ -0,0 +1,29 @@
+import asyncio
+import os
+from fastapi import APIRouter, HTTPException
+from database.db_connection import ping
+
+router = APIRouter()
+
+READY_TIMEOUT = float(os.getenv("READY_TIMEOUT", "2"))
+
+# --------------------------
+# Probes for the orchestrator / load balancer
+#   /health/live   -> process is up and serving (no dependencies touched)
+#   /health/ready  -> MongoDB answers a ping; 503 otherwise so the
+#                     instance is taken out of rotation
+# --------------------------
+
+
+@router.get("/live")
+def live():
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+async def ready():
+    try:
+        await asyncio.wait_for(ping(), READY_TIMEOUT)
+    except Exception:
+        raise HTTPException(503, "Database unavailable")
+    return {"status": "ok", "database": "ok"}
@@ -1,82 +1,291 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
+import asyncio
+from collections import Counter, defaultdict
+from typing import List, Union
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
 from bson import ObjectId
-from database.db_connection import packages_col
-from models.package_model import PackageCreate, PackageUpdate
+from database.repositories import packages_repo
+from models.package_model import PackageCreate, PackageUpdate, PackageBulkModeration, PackageOut, PackagePage
 from utils.auth_bearer import AuthBearer
 from utils.role_checker import RoleChecker
+from utils.search_index import search_index
+from utils.pagination import MAX_LIMIT, paginate, page_response, parse_fields, encode_cursor, decode_cursor
+from utils.cache import catalog_cache, etag_matches
+from utils.geocoding import locate, point
+from utils.facets import build_filters, facet_counts
+from utils.package_import import FORMATS, detect_format, parse_rows, import_packages
+from utils.serialization import serialize_doc, json_response
+from utils.event_bus import event_bus
+from models.event_model import (
+    MODERATION_EVENTS, PackageCreated, PackagesCreated, PackageUpdated, PackageApproved, PackageRejected, PackageDeleted,
+)
 
 router = APIRouter()
 
+PACKAGE_SORTS = ("_id", "price", "title", "rating", "discount", "days")
+MAX_BULK_MODERATION = 10_000
+MAX_NEAR_RADIUS_KM = 2000
+
 # --------------------------
 # Utility: convert Mongo docs
 # --------------------------
 def serialize_package(pkg):
-    pkg["id"] = str(pkg["_id"])
-    pkg.pop("_0", None)
-    del pkg["_id"]
-    return pkg
+    if "import_key" in pkg:
+        pkg = {k: v for k, v in pkg.items() if k != "import_key"}   # internal (utils/package_import.py)
+    return serialize_doc(pkg)
+
+def is_public(pkg):
+    return pkg is not None and pkg.get("status") == "approved"
 
 # --------------------------
 # CREATE PACKAGE (Agents/Admin)
 # --------------------------
 @router.post("/", dependencies=[Depends(RoleChecker(["travel_partner", "admin"]))])
-def create_package(payload: PackageCreate, user=Depends(AuthBearer())):
+async def create_package(payload: PackageCreate, user=Depends(AuthBearer())):
     data = payload.dict()
 
     # Add creator's email automatically
     data["created_by"] = user["email"]
+    await locate(data)
+
+    # insert_one sets data["_id"], so the stored document is known locally
+    await packages_repo.insert_one(data)
+    new_pkg = data
+    search_index.add(new_pkg)
+    await catalog_cache.invalidate(new_pkg["_id"], catalog=is_public(new_pkg))
+    event_bus.publish(PackageCreated(package=new_pkg))
 
-    result = packages_col.insert_one(data)
-    new_pkg = packages_col.find_one({"_id": result.inserted_id})
-    
     return {"message": "Package created successfully", "package": serialize_package(new_pkg)}
 
+# --------------------------
+# BULK IMPORT / UPSERT (Agents/Admin)
+# Body is an NDJSON or CSV stream (Content-Type or ?format=).
+# Rows are upserted on (created_by, title, location); the response
+# reports counts plus per-row errors.
+# Agents always import their own packages as pending; admins may set
+# ?status= for the whole file.
+# --------------------------
+@router.post("/import", dependencies=[Depends(RoleChecker(["travel_partner", "admin"]))])
+async def import_packages_route(
+    request: Request,
+    format: str = Query(None),
+    status: str = Query(None),
+    user=Depends(AuthBearer())
+):
+    fmt = format or detect_format(request.headers.get("content-type"))
+    if fmt not in FORMATS:
+        raise HTTPException(400, f"Unsupported format '{fmt}'")
+
+    if user["role"] == "travel_partner":
+        owner, status = user["email"], "pending"
+    else:
+        owner = None
+
+    async def index_batch(inserted, updated):
+        for pkg in inserted + updated:
+            search_index.add(pkg)
+        for pkg in updated:
+            await catalog_cache.invalidate(pkg["_id"], catalog=False)
+        if inserted:
+            event_bus.publish(PackagesCreated(packages=inserted))
+
+    report = await import_packages(
+        parse_rows(request.stream(), fmt), owner=owner, status=status, on_batch=index_batch
+    )
+
+    # one catalog invalidation for the whole file
+    if report["inserted"] or report["updated"]:
+        await catalog_cache.invalidate()
+    return report
+
 # --------------------------
 # GET PENDING PACKAGES (Admin only)
 # Must come before /{package_id} route
+# ETag follows the package write counter (304 without a query)
 # --------------------------
-@router.get("/pending/all", dependencies=[Depends(RoleChecker(["admin"]))])
-def get_pending_packages():
-    packages = list(packages_col.find({"status": "pending"}))
-    return [serialize_package(pkg) for pkg in packages]
+@router.get("/pending/all", dependencies=[Depends(RoleChecker(["admin"]))],
+            response_model=Union[List[PackageOut], PackagePage])
+async def get_pending_packages(
+    request: Request,
+    limit: int = Query(None, ge=1, le=MAX_LIMIT),
+    after: str = Query(None),
+    fields: str = Query(None),
+    sort: str = Query(None)
+):
+    etag = await catalog_cache.packages_etag(request)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    packages, next_cursor = await paginate(
+        packages_repo, {"status": "pending"}, limit, after, fields, sort, PACKAGE_SORTS
+    )
+    return json_response(
+        page_response([serialize_package(pkg) for pkg in packages], next_cursor, limit), headers={"ETag": etag}
+    )
 
 # --------------------------
 # GET ALL PACKAGES
 # Supports:
-#   - ?category=hotels
-#   - ?q=goa   (search)
+#   - ?category=hotels&category=Luxury   (any of)
+#   - ?location=Goa, India               (any of, repeatable)
+#   - ?min_price= &max_price= &min_days= &max_days= &min_rating= &max_rating=
+#   - ?q=goa   (search, ranked by relevance)
+#   - ?limit=20&after=<cursor>&fields=title,price&sort=-price
+#   - ?facets=true   (adds facet counts; response is {items, next_cursor, facets})
 # Returns only approved packages for public users
+# Served through the catalog cache (ETag / If-None-Match aware; the
+# ETag follows the catalog version, so a repeat fetch costs no lookup)
 # --------------------------
-@router.get("/")
-def get_packages(
-    category: str = Query(None),
-    q: str = Query(None)
+@router.get("/", response_model=Union[List[PackageOut], PackagePage])
+async def get_packages(
+    request: Request,
+    category: List[str] = Query(None),
+    location: List[str] = Query(None),
+    min_price: float = Query(None, ge=0),
+    max_price: float = Query(None, ge=0),
+    min_days: int = Query(None, ge=0),
+    max_days: int = Query(None, ge=0),
+    min_rating: float = Query(None, ge=0),
+    max_rating: float = Query(None, ge=0),
+    q: str = Query(None),
+    limit: int = Query(None, ge=1, le=MAX_LIMIT),
+    after: str = Query(None),
+    fields: str = Query(None),
+    sort: str = Query(None),
+    facets: bool = Query(False)
 ):
-    query = {"status": "approved"}  # Only show approved packages
+    filters = build_filters(category, location, {
+        "price": (min_price, max_price),
+        "days": (min_days, max_days),
+        "rating": (min_rating, max_rating),
+    })
+    key = await catalog_cache.list_key(
+        category=category, location=location,
+        min_price=min_price, max_price=max_price, min_days=min_days, max_days=max_days,
+        min_rating=min_rating, max_rating=max_rating,
+        q=q, limit=limit, after=after, fields=fields, sort=sort, facets=facets or None,
+        # ranked results come from this process's index: key them by its state
+        index=search_index.state() if q else None
+    )
+    return await catalog_cache.respond(
+        request, key, lambda: load_packages(filters, q, limit, after, fields, sort, facets),
+        etag=catalog_cache.list_etag(key)
+    )
+
+async def load_packages(filters, q, limit, after, fields, sort, facets=False):
+    base = {"status": "approved"}  # Only show approved packages
+    query = {**base, **filters}
 
+    if q:
+        # search index gives ranked ids; Mongo only fetches those documents
+        # relevance order has no sort key, so the cursor is a rank offset
+        offset = decode_cursor(after) if after else 0
+        if not isinstance(offset, int) or isinstance(offset, bool) or offset < 0:
+            raise HTTPException(400, "Invalid cursor")
+
+        # the index handles a single category itself; other filters (and
+        # facet counts) narrow the ranked ids with one Mongo query
+        category = filters.get("category")
+        indexed = category if isinstance(category, str) and not facets else None
+        ranked = search_index.search(q, category=indexed)
+
+        rest = {k: v for k, v in filters.items() if not (k == "category" and indexed)}
+        if rest or facets:
+            base["_id"] = {"$in": [ObjectId(i) for i in ranked]}
+        if rest:
+            keep = {str(p["_id"]) for p in await packages_repo.find({**base, **rest}, {"_id": 1})}
+            ranked = [i for i in ranked if i in keep]
+
+        end = offset + (limit or MAX_LIMIT)
+        page = ranked[offset:end]
+        next_cursor = encode_cursor(end) if end < len(ranked) else None
+
+        items = []
+        if page:
+            page_query = {"status": "approved", "_id": {"$in": [ObjectId(i) for i in page]}}
+            found = {str(p["_id"]): p for p in await packages_repo.find(page_query, parse_fields(fields))}
+            items = [serialize_package(found[i]) for i in page if i in found]
+        counts = await facet_counts(packages_repo, base, filters) if facets else None
+        return page_response(items, next_cursor, limit, counts)
+
+    if not facets:
+        packages, next_cursor = await paginate(
+            packages_repo, query, limit, after, fields, sort, PACKAGE_SORTS
+        )
+        return page_response([serialize_package(pkg) for pkg in packages], next_cursor, limit)
+
+    # page and facet counts run concurrently: the page uses the indexes,
+    # the counts come from a single $facet aggregation
+    (packages, next_cursor), counts = await asyncio.gather(
+        paginate(packages_repo, query, limit, after, fields, sort, PACKAGE_SORTS),
+        facet_counts(packages_repo, base, filters),
+    )
+    return page_response([serialize_package(pkg) for pkg in packages], next_cursor, limit, counts)
+
+# --------------------------
+# PACKAGES NEAR A POINT
+#   ?lat=15.5&lon=73.8&radius=50   (radius in km)
+# Sorted by distance; each package carries distance_km.
+# Must come before /{package_id} route
+# --------------------------
+@router.get("/near", response_model=List[PackageOut])
+async def packages_near(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius: float = Query(50, gt=0, le=MAX_NEAR_RADIUS_KM),
+    category: str = Query(None),
+    limit: int = Query(20, ge=1, le=MAX_LIMIT)
+):
+    query = {"status": "approved"}
     if category:
         query["category"] = category
 
-    if q:
-        query["$or"] = [
-            {"title": {"$regex": q, "$options": "i"}},
-            {"location": {"$regex": q, "$options": "i"}},
-        ]
+    packages = await packages_repo.aggregate([
+        {"$geoNear": {
+            "near": point(lon, lat),
+            "key": "geo",
+            "distanceField": "distance_km",
+            "distanceMultiplier": 0.001,
+            "maxDistance": radius * 1000,
+            "query": query,
+            "spherical": True,
+        }},
+        {"$limit": limit},
+    ])
+    return json_response([serialize_package(pkg) for pkg in packages])
 
-    packages = list(packages_col.find(query))
+# --------------------------
+# AUTOCOMPLETE
+#   - ?q=go  -> matching approved package titles
+# Must come before /{package_id} route
+# --------------------------
+@router.get("/suggest")
+async def suggest_packages(q: str = Query(..., min_length=1), limit: int = Query(10, ge=1, le=50)):
+    return search_index.suggest(q, limit=limit)
 
-    return [serialize_package(pkg) for pkg in packages]
+# --------------------------
+# CATALOG CACHE COUNTERS (Admin only)
+# --------------------------
+@router.get("/cache/stats", dependencies=[Depends(RoleChecker(["admin"]))])
+async def cache_stats():
+    return catalog_cache.stats()
 
 # --------------------------
 # GET SINGLE PACKAGE BY ID
 # --------------------------
-@router.get("/{package_id}")
-def get_package(package_id: str):
+@router.get("/{package_id}", response_model=PackageOut)
+async def get_package(package_id: str, request: Request):
     try:
-        pkg = packages_col.find_one({"_id": ObjectId(package_id)})
+        oid = ObjectId(package_id)
     except:
         raise HTTPException(400, "Invalid package ID")
 
+    return await catalog_cache.respond(
+        request, catalog_cache.item_key(oid), lambda: load_package(oid)
+    )
+
+async def load_package(oid):
+    pkg = await packages_repo.get_by_id(oid)
+
     if not pkg:
         raise HTTPException(404, "Package not found")
 
@@ -87,24 +296,38 @@ def get_package(package_id: str):
 # Agent/Admin only
 # --------------------------
 @router.put("/{package_id}", dependencies=[Depends(RoleChecker(["travel_partner", "admin"]))])
-def update_package(package_id: str, payload: PackageUpdate, user=Depends(AuthBearer())):
+async def update_package(package_id: str, payload: PackageUpdate, user=Depends(AuthBearer())):
     try:
         oid = ObjectId(package_id)
     except:
         raise HTTPException(400, "Invalid ID")
 
-    existing = packages_col.find_one({"_id": oid})
-    if not existing:
-        raise HTTPException(404, "Package not found")
-
-    # Agents can only edit their own packages
-    if user["role"] == "travel_partner" and existing.get("created_by") != user["email"]:
-        raise HTTPException(403, "You cannot edit this package")
+    # Agents can only edit their own packages - enforced in the filter so
+    # the check and the write are one atomic round trip
+    query = {"_id": oid}
+    if user["role"] == "travel_partner":
+        query["created_by"] = user["email"]
 
     update_data = payload.dict()
-    packages_col.update_one({"_id": oid}, {"$set": update_data})
+    # an edit may change the natural key; the next import re-sets import_key
+    update = {"$set": update_data, "$unset": {"import_key": ""}}
+    if await locate(update_data) is None:
+        update["$unset"]["geo"] = ""
+    existing = await packages_repo.find_one_and_update(query, update, return_after=False)
+
+    if not existing:
+        # failure path only: find out why nothing matched
+        if await packages_repo.get_by_id(oid, {"_id": 1}):
+            raise HTTPException(403, "You cannot edit this package")
+        raise HTTPException(404, "Package not found")
 
-    updated = packages_col.find_one({"_id": oid})
+    updated = {**existing, **update_data}
+    updated.pop("import_key", None)
+    if "geo" not in update_data:
+        updated.pop("geo", None)
+    search_index.add(updated)
+    await catalog_cache.invalidate(oid, catalog=is_public(existing) or is_public(updated))
+    event_bus.publish(PackageUpdated(package=updated, previous_status=existing.get("status")))
     return {"message": "Updated successfully", "package": serialize_package(updated)}
 
 # --------------------------
@@ -113,13 +336,13 @@ def update_package(package_id: str, payload: PackageUpdate, user=Depends(AuthBea
 # Agents can only delete their own pending packages
 # --------------------------
 @router.delete("/{package_id}", dependencies=[Depends(RoleChecker(["admin", "travel_partner"]))])
-def delete_package(package_id: str, user=Depends(AuthBearer())):
+async def delete_package(package_id: str, user=Depends(AuthBearer())):
     try:
         oid = ObjectId(package_id)
     except:
         raise HTTPException(400, "Invalid ID")
 
-    existing = packages_col.find_one({"_id": oid})
+    existing = await packages_repo.get_by_id(oid)
     if not existing:
         raise HTTPException(404, "Package not found")
 
@@ -130,11 +353,14 @@ def delete_package(package_id: str, user=Depends(AuthBearer())):
         if existing.get("status") != "pending":
             raise HTTPException(403, "You can only delete pending packages")
 
-    res = packages_col.delete_one({"_id": oid})
+    res = await packages_repo.delete_one({"_id": oid})
 
     if res.deleted_count == 0:
         raise HTTPException(404, "Package not found")
 
+    search_index.remove(package_id)
+    await catalog_cache.invalidate(oid, catalog=is_public(existing))
+    event_bus.publish(PackageDeleted(package_id=package_id, status=existing.get("status")))
     return {"message": "Package deleted"}
 
 # --------------------------
@@ -142,31 +368,137 @@ def delete_package(package_id: str, user=Depends(AuthBearer())):
 # Admin only
 # --------------------------
 @router.patch("/{package_id}/approve", dependencies=[Depends(RoleChecker(["admin"]))])
-def approve_package(package_id: str):
+async def approve_package(package_id: str):
     try:
         oid = ObjectId(package_id)
     except:
         raise HTTPException(400, "Invalid ID")
 
-    packages_col.update_one({"_id": oid}, {"$set": {"status": "approved"}})
-    updated = packages_col.find_one({"_id": oid})
-    
-    if not updated:
+    # BEFORE image tells us the previous status; the new one is known
+    previous = await packages_repo.find_one_and_update(
+        {"_id": oid}, {"$set": {"status": "approved"}}, return_after=False
+    )
+
+    if not previous:
         raise HTTPException(404, "Package not found")
-    
+
+    updated = {**previous, "status": "approved"}
+    search_index.set_status(oid, "approved")
+    await catalog_cache.invalidate(oid, catalog=is_public(previous) or is_public(updated))
+    event_bus.publish(PackageApproved(package_ids=[package_id], previous={previous.get("status"): 1}))
     return {"message": "Package approved", "package": serialize_package(updated)}
 
 @router.patch("/{package_id}/reject", dependencies=[Depends(RoleChecker(["admin"]))])
-def reject_package(package_id: str):
+async def reject_package(package_id: str):
     try:
         oid = ObjectId(package_id)
     except:
         raise HTTPException(400, "Invalid ID")
 
-    packages_col.update_one({"_id": oid}, {"$set": {"status": "rejected"}})
-    updated = packages_col.find_one({"_id": oid})
-    
-    if not updated:
+    # BEFORE image tells us the previous status; the new one is known
+    previous = await packages_repo.find_one_and_update(
+        {"_id": oid}, {"$set": {"status": "rejected"}}, return_after=False
+    )
+
+    if not previous:
         raise HTTPException(404, "Package not found")
-    
+
+    updated = {**previous, "status": "rejected"}
+    search_index.set_status(oid, "rejected")
+    await catalog_cache.invalidate(oid, catalog=is_public(previous) or is_public(updated))
+    event_bus.publish(PackageRejected(package_ids=[package_id], previous={previous.get("status"): 1}))
     return {"message": "Package rejected", "package": serialize_package(updated)}
+
+# --------------------------
+# BULK APPROVE/REJECT
+# Admin only
+# Body: {"ids": [...]} or a filter over the pending queue
+# ({"created_by": ..., "category": ...}, both optional).
+# One read for the previous statuses, one update_many per previous
+# status (filtered on it), and the cache/search/rollup hooks run once for
+# the whole batch. Per-id results: approved/rejected, "unchanged",
+# "conflict" (moderated differently meanwhile), "not_found", "invalid_id".
+# --------------------------
+@router.post("/bulk/approve", dependencies=[Depends(RoleChecker(["admin"]))])
+async def bulk_approve_packages(payload: PackageBulkModeration):
+    return await moderate_many(payload, "approved")
+
+@router.post("/bulk/reject", dependencies=[Depends(RoleChecker(["admin"]))])
+async def bulk_reject_packages(payload: PackageBulkModeration):
+    return await moderate_many(payload, "rejected")
+
+async def moderate_many(payload, new_status):
+    results = {}
+
+    if payload.ids is not None:
+        if len(payload.ids) > MAX_BULK_MODERATION:
+            raise HTTPException(400, f"At most {MAX_BULK_MODERATION} ids per request")
+        for package_id in payload.ids:
+            try:
+                ObjectId(package_id)
+            except:
+                results[package_id] = "invalid_id"
+        oids = [ObjectId(i) for i in payload.ids if i not in results]
+        query = {"_id": {"$in": oids}}
+    else:
+        query = {"status": "pending"}
+        if payload.created_by:
+            query["created_by"] = payload.created_by
+        if payload.category:
+            query["category"] = payload.category
+
+    # one extra document tells us whether the filter matched more than a batch
+    found = await packages_repo.find(query, {"status": 1}, limit=MAX_BULK_MODERATION + 1)
+    more = len(found) > MAX_BULK_MODERATION
+    found = found[:MAX_BULK_MODERATION]
+
+    previous = {p["_id"]: p.get("status") for p in found}
+    groups = defaultdict(list)   # previous status -> ids to move
+    for oid, status in previous.items():
+        if status != new_status:
+            groups[status].append(oid)
+
+    # each update only matches rows still in the status we read, so a
+    # concurrent change is never overwritten; modified_count is exact
+    changed, counts, current = [], Counter(), {}
+    for old_status, oids in groups.items():
+        res = await packages_repo.update_many(
+            {"_id": {"$in": oids}, "status": old_status}, {"$set": {"status": new_status}}
+        )
+        if res.modified_count:
+            counts[old_status] = res.modified_count
+        if res.modified_count == len(oids):
+            changed += oids
+        else:
+            # some rows changed or vanished between the read and the write
+            rows = await packages_repo.find({"_id": {"$in": oids}}, {"status": 1})
+            current.update({p["_id"]: p.get("status") for p in rows})
+            changed += [oid for oid in oids if current.get(oid) == new_status]
+
+    if changed:
+        for oid in changed:
+            search_index.set_status(oid, new_status)
+        touches_catalog = new_status == "approved" or "approved" in counts
+        await catalog_cache.invalidate_many(changed, catalog=touches_catalog)
+        event_bus.publish(MODERATION_EVENTS[new_status](
+            package_ids=[str(oid) for oid in changed], previous=dict(counts),
+        ))
+
+    changed = set(changed)
+    for oid, status in previous.items():
+        if status == new_status:
+            results[str(oid)] = "unchanged"
+        elif oid in changed:
+            results[str(oid)] = new_status
+        elif oid in current:
+            results[str(oid)] = "conflict"   # moderated to another status meanwhile
+    if payload.ids is not None:
+        results = {i: results.get(i, "not_found") for i in payload.ids}
+
+    return {
+        "status": new_status,
+        "matched": len(found),
+        "modified": sum(counts.values()),
+        "more": more,
+        "results": results,
+    }
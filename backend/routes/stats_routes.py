@@ -0,0 +1,112 @@
+from fastapi import APIRouter, Depends, Query
+from datetime import date
+from database.repositories import (
+    daily_stats_repo, package_stats_repo, agent_stats_repo, moderation_stats_repo, packages_repo,
+)
+from database.rollups import MODERATION_ID, rebuild_rollups
+from utils.role_checker import RoleChecker
+
+router = APIRouter(dependencies=[Depends(RoleChecker(["admin"]))])
+
+# All reads below hit the small rollup collections maintained by
+# database/rollups.py - cost does not grow with the number of bookings.
+
+
+def serialize_stat(s, key="id"):
+    s[key] = s.pop("_id")
+    return s
+
+
+# --------------------------
+# REVENUE PER DAY
+#   ?date_from=2025-01-01&date_to=2025-01-31
+# --------------------------
+@router.get("/revenue")
+async def revenue_per_day(date_from: date = Query(None), date_to: date = Query(None)):
+    query = {}
+    if date_from:
+        query.setdefault("_id", {})["$gte"] = date_from.isoformat()
+    if date_to:
+        query.setdefault("_id", {})["$lte"] = date_to.isoformat()
+
+    days = await daily_stats_repo.find(query, sort=[("_id", 1)])
+    return [serialize_stat(d, "date") for d in days]
+
+
+# --------------------------
+# BOOKINGS PER PACKAGE
+#   ?sort=bookings|revenue&limit=10
+# --------------------------
+@router.get("/packages")
+async def bookings_per_package(
+    sort: str = Query("bookings", pattern="^(bookings|revenue)$"),
+    limit: int = Query(10, ge=1, le=100)
+):
+    rows = await package_stats_repo.find({}, sort=[(sort, -1)], limit=limit)
+    return [serialize_stat(r, "package_id") for r in rows]
+
+
+# --------------------------
+# BOOKINGS PER LOCATION / CATEGORY
+# --------------------------
+def group_pipeline(field):
+    return [
+        {"$group": {
+            "_id": f"${field}",
+            "bookings": {"$sum": "$bookings"},
+            "revenue": {"$sum": "$revenue"},
+        }},
+        {"$sort": {"bookings": -1}},
+    ]
+
+
+@router.get("/locations")
+async def bookings_per_location():
+    rows = await package_stats_repo.aggregate(group_pipeline("location"))
+    return [serialize_stat(r, "location") for r in rows]
+
+
+@router.get("/categories")
+async def bookings_per_category():
+    rows = await package_stats_repo.aggregate(group_pipeline("category"))
+    return [serialize_stat(r, "category") for r in rows]
+
+
+# --------------------------
+# MODERATION FUNNEL (pending -> approved)
+# --------------------------
+@router.get("/moderation")
+async def moderation_funnel():
+    stats = await moderation_stats_repo.find_one({"_id": MODERATION_ID}) or {}
+    approved = stats.get("approved", 0)
+    rejected = stats.get("rejected", 0)
+    decided = approved + rejected
+
+    return {
+        "submitted": stats.get("submitted", 0),
+        "approved": approved,
+        "rejected": rejected,
+        "pending": await packages_repo.count({"status": "pending"}),
+        "approval_rate": round(approved / decided, 4) if decided else 0.0,
+    }
+
+
+# --------------------------
+# TOP AGENTS
+#   ?sort=bookings|revenue&limit=10
+# --------------------------
+@router.get("/agents")
+async def top_agents(
+    sort: str = Query("revenue", pattern="^(bookings|revenue)$"),
+    limit: int = Query(10, ge=1, le=100)
+):
+    rows = await agent_stats_repo.find({}, sort=[(sort, -1)], limit=limit)
+    return [serialize_stat(r, "agent") for r in rows]
+
+
+# --------------------------
+# REBUILD ROLLUPS FROM SOURCE DATA
+# --------------------------
+@router.post("/rebuild")
+async def rebuild():
+    return {"message": "Rollups rebuilt", **await rebuild_rollups()}
@@ -1,9 +1,7 @@
-from database.db_connection import packages_col
+import asyncio
+from database.repositories import packages_repo
 from datetime import datetime
-
-# Clear existing packages
-packages_col.delete_many({})
-print("Cleared existing packages.")
+from utils.package_import import import_packages
 
 packages = [
     {
@@ -328,10 +326,25 @@ packages = [
     }
 ]
 
-# Add status approved to all packages
+# Seed rows predate the required "days" field
 for pkg in packages:
-    if "status" not in pkg:
-        pkg["status"] = "approved"
+    pkg.setdefault("days", 5)
+
+
+async def seed_rows():
+    for row_no, pkg in enumerate(packages, 1):
+        yield row_no, dict(pkg), None
+
+
+async def seed():
+    # Clear existing packages
+    await packages_repo.delete_many({})
+    print("Cleared existing packages.")
+
+    # Same validation + upsert path as import_packages.py
+    report = await import_packages(seed_rows(), status="approved")
+    print(f"Inserted premium packages: {report}")
+
 
-packages_col.insert_many(packages)
-print("Inserted premium packages successfully!")
+if __name__ == "__main__":
+    asyncio.run(seed())
@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import os
+import uvicorn
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger("tripsync.server")
+
+# --------------------------
+# Production entrypoint
+#   python server.py
+#
+#   WEB_CONCURRENCY         worker processes (default: 1, or the CPU count
+#                           when worker state is shared - see below)
+#   HOST / PORT             bind address (0.0.0.0:8000)
+#   GRACEFUL_TIMEOUT        seconds to drain in-flight requests on SIGTERM (30)
+#   KEEPALIVE_TIMEOUT       idle keep-alive seconds (5)
+#   FORWARDED_ALLOW_IPS     proxies trusted for X-Forwarded-* ("127.0.0.1")
+#   ACCESS_LOG=0            disable per-request access log lines
+#
+# Workers are uvicorn processes; uvloop and httptools are used when
+# installed (uvicorn[standard]), asyncio/h11 otherwise.
+# Indexes are built once here, before the workers start, instead of by
+# every worker on boot. Each worker opens its own Mongo client on first
+# use (database/db_connection.py).
+#
+# The search index and the memory catalog cache live in each process.
+# Several workers only stay consistent with EVENT_SOURCE=change_stream
+# (every worker sees every write) and CATALOG_CACHE_BACKEND=redis; without
+# both, the server runs one worker and refuses WEB_CONCURRENCY > 1.
+#
+# On SIGTERM the workers stop accepting connections, wait up to
+# GRACEFUL_TIMEOUT for in-flight requests, then run the app's shutdown
+# hook (payment queue drain, client cleanup).
+# --------------------------
+
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "8000"))
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "0"))
+GRACEFUL_TIMEOUT = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+KEEPALIVE_TIMEOUT = int(os.getenv("KEEPALIVE_TIMEOUT", "5"))
+FORWARDED_ALLOW_IPS = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+ACCESS_LOG = os.getenv("ACCESS_LOG", "1") == "1"
+
+
+def _available(module):
+    try:
+        __import__(module)
+        return True
+    except ImportError:
+        return False
+
+
+async def _build_indexes():
+    from database.db_connection import close_client
+    from database.indexes import ensure_indexes
+    try:
+        await ensure_indexes()
+    finally:
+        close_client()
+
+
+def shared_state():
+    return (
+        os.getenv("EVENT_SOURCE", "local") == "change_stream"
+        and os.getenv("CATALOG_CACHE_BACKEND", "memory") == "redis"
+    )
+
+
+def worker_count():
+    if shared_state():
+        return WEB_CONCURRENCY or os.cpu_count() or 1
+    if WEB_CONCURRENCY > 1:
+        raise SystemExit(
+            "WEB_CONCURRENCY > 1 needs EVENT_SOURCE=change_stream and CATALOG_CACHE_BACKEND=redis: "
+            "the search index and catalog cache are per process"
+        )
+    return 1
+
+
+def prepare():
+    # the in-memory stand-in is per process, so workers keep building their own
+    if os.getenv("MONGO_URI", "").startswith("mongomock://"):
+        return
+    try:
+        asyncio.run(_build_indexes())
+    except Exception:
+        logger.exception("index build failed, workers will retry on startup")
+        return
+    os.environ["ENSURE_INDEXES"] = "0"
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    workers = worker_count()
+    prepare()
+
+    loop = "uvloop" if _available("uvloop") else "asyncio"
+    http = "httptools" if _available("httptools") else "h11"
+    logger.info("starting %s workers on %s:%s (loop=%s, http=%s)", workers, HOST, PORT, loop, http)
+
+    uvicorn.run(
+        "app:app",
+        host=HOST,
+        port=PORT,
+        workers=workers,
+        loop=loop,
+        http=http,
+        proxy_headers=True,
+        forwarded_allow_ips=FORWARDED_ALLOW_IPS,
+        timeout_keep_alive=KEEPALIVE_TIMEOUT,
+        timeout_graceful_shutdown=GRACEFUL_TIMEOUT,
+        access_log=ACCESS_LOG,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import asyncio
+from database.repositories import packages_repo
+from models.package_model import PackageBulkModeration
+from routes import package_routes
+from utils.event_bus import event_bus
+
+
+def run(scenario):
+    async def main():
+        try:
+            return await scenario()
+        finally:
+            await event_bus.stop()
+    return asyncio.run(main())
+
+
+async def insert(*statuses):
+    res = await packages_repo.insert_many([{"title": f"t{n}", "status": s} for n, s in enumerate(statuses)])
+    return res.inserted_ids
+
+
+def test_reports_outcome_per_id():
+    async def scenario():
+        ids = await insert("pending", "approved", "rejected")
+        payload = PackageBulkModeration(ids=[str(i) for i in ids] + ["000000000000000000000000", "nope"])
+        return ids, await package_routes.moderate_many(payload, "approved")
+
+    ids, res = run(scenario)
+    assert res["modified"] == 2
+    assert res["results"] == {
+        str(ids[0]): "approved", str(ids[1]): "unchanged", str(ids[2]): "approved",
+        "000000000000000000000000": "not_found", "nope": "invalid_id",
+    }
+
+
+def test_concurrent_changes_are_not_overwritten(monkeypatch):
+    update_many = packages_repo.update_many
+
+    async def racing_update_many(query, update):
+        # another admin rejects one package and deletes another between
+        # our read and our write
+        await packages_repo.col.update_one({"_id": ids[1]}, {"$set": {"status": "rejected"}})
+        await packages_repo.col.delete_one({"_id": ids[2]})
+        return await update_many(query, update)
+
+    async def scenario():
+        ids[:] = await insert("pending", "pending", "pending")
+        monkeypatch.setattr(packages_repo, "update_many", racing_update_many)
+        payload = PackageBulkModeration(ids=[str(i) for i in ids])
+        res = await package_routes.moderate_many(payload, "approved")
+        return res, await packages_repo.find({"_id": {"$in": ids}}, {"status": 1})
+
+    ids = []
+    res, rows = run(scenario)
+    assert res["modified"] == 1
+    assert res["results"] == {str(ids[0]): "approved", str(ids[1]): "conflict", str(ids[2]): "not_found"}
+    assert {r["_id"]: r["status"] for r in rows} == {ids[0]: "approved", ids[1]: "rejected"}
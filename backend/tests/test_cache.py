@@ -0,0 +1,27 @@
+import asyncio
+from utils.cache import MemoryBackend, CatalogCache, VERSION_KEY
+
+
+def test_version_counter_survives_eviction():
+    async def scenario():
+        backend = MemoryBackend(maxsize=8)
+        cache = CatalogCache(backend, ttl=60, enabled=True)
+        for _ in range(3):
+            await backend.incr(VERSION_KEY)
+        for n in range(20):
+            await backend.set(f"packages:list:{n}", b"x")
+        return await cache.version(), len(backend.data)
+
+    assert asyncio.run(scenario()) == (3, 8)
+
+
+def test_lru_evicts_oldest_entry():
+    async def scenario():
+        backend = MemoryBackend(maxsize=2)
+        await backend.set("a", 1)
+        await backend.set("b", 2)
+        await backend.get("a")          # a is now the most recent
+        await backend.set("c", 3)
+        return [await backend.get(k) for k in ("a", "b", "c")]
+
+    assert asyncio.run(scenario()) == [1, None, 3]
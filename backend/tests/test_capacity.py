@@ -0,0 +1,72 @@
+"""
+Seat counters under concurrent reserve() calls, including the first
+bookings for a date racing to create the counter.
+"""
+import asyncio
+import uuid
+import pytest
+from pydantic import ValidationError
+from pymongo.errors import DuplicateKeyError
+from database.repositories import capacity_repo
+from models.booking_model import BookingCreate
+from utils.capacity import capacity_key, remaining, reserve
+
+
+@pytest.fixture
+def racing_upserts(monkeypatch):
+    # mongomock runs each operation atomically; emulate a real server where
+    # concurrent upserts that all matched nothing all try to insert, and
+    # every insert but the first fails with a duplicate key
+    find_one_and_update = capacity_repo.find_one_and_update
+
+    async def racing(query, update, upsert=False, **kwargs):
+        if upsert and await capacity_repo.get_by_id(query["_id"]) is None:
+            await asyncio.sleep(0)   # let the other first bookings get here too
+            if await capacity_repo.get_by_id(query["_id"]) is not None:
+                raise DuplicateKeyError("E11000 duplicate key error")
+        return await find_one_and_update(query, update, upsert=upsert, **kwargs)
+
+    monkeypatch.setattr(capacity_repo, "find_one_and_update", racing)
+
+
+def book_concurrently(package_id, requests, capacity, persons=1, existing=0):
+    async def scenario():
+        if existing:
+            await capacity_repo.insert_one({"_id": capacity_key(package_id, "2030-01-01"), "booked": existing})
+        results = await asyncio.gather(*[
+            reserve(package_id, "2030-01-01", persons, capacity) for _ in range(requests)
+        ])
+        return results, await remaining(package_id, "2030-01-01", capacity)
+    return asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("existing", [0, 5])
+def test_never_exceeds_capacity(racing_upserts, existing):
+    results, left = book_concurrently(uuid.uuid4().hex, requests=50, capacity=20, existing=existing)
+    assert results.count(True) == 20 - existing
+    assert left == 0
+
+
+def test_first_bookings_are_not_falsely_rejected(racing_upserts):
+    results, left = book_concurrently(uuid.uuid4().hex, requests=30, capacity=100, persons=2)
+    assert all(results)
+    assert left == 40
+
+
+def test_multi_seat_bookings_fill_exactly(racing_upserts):
+    results, left = book_concurrently(uuid.uuid4().hex, requests=10, capacity=9, persons=3)
+    assert results.count(True) == 3
+    assert left == 0
+
+
+def test_no_capacity_means_unlimited():
+    assert asyncio.run(reserve("p", "2030-01-01", 1000, None)) is True
+
+
+def test_booking_date_is_normalized():
+    booking = {"package_id": "p", "persons": 1}
+    assert BookingCreate(date=" 2026-12-01 ", **booking).date == "2026-12-01"
+    assert BookingCreate(date="20261201", **booking).date == "2026-12-01"
+    for bad in ("2026-12-1", "01/12/2026", "tomorrow"):
+        with pytest.raises(ValidationError):
+            BookingCreate(date=bad, **booking)
@@ -0,0 +1,79 @@
+import gzip
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+from utils.compression import CompressionMiddleware, negotiate, supported_encodings
+
+BODY = b'{"items": "' + b"tripsync " * 500 + b'"}'
+
+
+async def big(request):
+    return Response(BODY, media_type="application/json", headers={"ETag": '"abc"'})
+
+
+async def small(request):
+    return Response(b"{}", media_type="application/json")
+
+
+async def stream(request):
+    async def chunks():
+        for n in range(3):
+            yield b"line %d " % n * 200 + b"\n"
+    return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+
+async def encoded(request):
+    return Response(gzip.compress(BODY), media_type="application/json", headers={"Content-Encoding": "gzip"})
+
+
+async def image(request):
+    return Response(BODY, media_type="image/png")
+
+
+@pytest.fixture(scope="module")
+def client():
+    app = Starlette(routes=[Route(f"/{f.__name__}", f) for f in (big, small, stream, encoded, image)])
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+    return TestClient(app)
+
+
+def test_negotiate():
+    assert negotiate("gzip, br") == supported_encodings()[0]
+    assert negotiate("br;q=0, gzip") == "gzip"
+    assert negotiate("identity") is None
+    assert negotiate(None) is None
+
+
+@pytest.mark.parametrize("encoding", supported_encodings())
+def test_large_body_is_compressed_and_retagged(client, encoding):
+    res = client.get("/big", headers={"Accept-Encoding": encoding})
+    assert res.headers["content-encoding"] == encoding
+    assert res.headers["etag"] == f'"abc-{encoding}"'
+    assert res.headers["vary"] == "Accept-Encoding"
+    assert int(res.headers["content-length"]) < len(BODY)
+    assert res.content == BODY      # decoded by the client
+
+
+def test_identity_keeps_body_and_adds_vary(client):
+    res = client.get("/big", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in res.headers
+    assert res.headers["etag"] == '"abc"'
+    assert res.headers["vary"] == "Accept-Encoding"
+    assert res.content == BODY
+
+
+@pytest.mark.parametrize("encoding", supported_encodings())
+def test_streamed_body_is_compressed(client, encoding):
+    res = client.get("/stream", headers={"Accept-Encoding": encoding})
+    assert res.headers["content-encoding"] == encoding
+    assert "content-length" not in res.headers
+    assert res.text.splitlines()[2].startswith("line 2")
+
+
+@pytest.mark.parametrize("path", ["/small", "/encoded", "/image"])
+def test_left_untouched(client, path):
+    res = client.get(path, headers={"Accept-Encoding": "gzip"})
+    assert res.headers.get("content-encoding") == ("gzip" if path == "/encoded" else None)
+    assert "vary" not in res.headers
@@ -0,0 +1,204 @@
+"""
+EventBus delivery: publish order, failure isolation, once vs per_worker
+subscribers, and the change_stream source fed by an in-process stream.
+"""
+import asyncio
+import contextlib
+from bson import ObjectId
+from models.event_model import (
+    PackageCreated, PackageUpdated, PackageApproved, PackagesModerated, PackageDeleted,
+    BookingCreated, UserRoleChanged,
+)
+from utils.event_bus import EventBus, ChangeStreamSource, change_events
+
+
+def recorder(bus, *event_types, per_worker=False, name="handler"):
+    seen = []
+
+    async def handler(event):
+        seen.append((name, event))
+    handler.__name__ = name
+    bus.subscribe(*event_types, per_worker=per_worker)(handler)
+    return seen
+
+
+def run(scenario):
+    async def main():
+        bus = EventBus(source="local")
+        try:
+            return await scenario(bus)
+        finally:
+            await bus.stop()
+    return asyncio.run(main())
+
+
+async def wait_for(condition, timeout=2.0):
+    async def poll():
+        while not condition():
+            await asyncio.sleep(0.01)
+    await asyncio.wait_for(poll(), timeout)
+
+
+def package(title):
+    return {"_id": ObjectId(), "title": title, "status": "pending"}
+
+
+# --------------------------
+# Ordering and isolation
+# --------------------------
+def test_events_are_handled_in_publish_order():
+    async def scenario(bus):
+        seen = []
+        for name in ("first", "second"):
+            async def handler(event, name=name):
+                await asyncio.sleep(0)
+                seen.append((name, event.package["title"]))
+            bus.subscribe(PackageCreated)(handler)
+        for title in ("a", "b", "c"):
+            bus.publish(PackageCreated(package=package(title)))
+        await bus.join()
+        return seen
+
+    assert run(scenario) == [
+        ("first", "a"), ("second", "a"), ("first", "b"), ("second", "b"), ("first", "c"), ("second", "c"),
+    ]
+
+
+def test_base_class_subscribers_receive_subclasses():
+    async def scenario(bus):
+        seen = recorder(bus, PackagesModerated)
+        bus.publish(PackageApproved(package_ids=["x"], previous={"pending": 1}))
+        await bus.join()
+        return [type(event) for _, event in seen]
+
+    assert run(scenario) == [PackageApproved]
+
+
+def test_failing_subscriber_does_not_stop_the_others():
+    async def scenario(bus):
+        @bus.subscribe(BookingCreated)
+        async def broken(event):
+            raise RuntimeError("boom")
+        seen = recorder(bus, BookingCreated)
+
+        bus.publish(BookingCreated(booking={"n": 1}))
+        bus.publish(BookingCreated(booking={"n": 2}))
+        await bus.join()
+        return [event.booking["n"] for _, event in seen], bus.failures, bus.published
+
+    assert run(scenario) == ([1, 2], 2, 2)
+
+
+def test_stop_drains_queued_events():
+    async def scenario(bus):
+        seen = recorder(bus, PackageDeleted)
+        for n in range(5):
+            bus.publish(PackageDeleted(package_id=str(n)))
+        await bus.stop(drain_timeout=1)
+        return len(seen)
+
+    assert run(scenario) == 5
+
+
+# --------------------------
+# Sources
+# --------------------------
+def test_local_source_publish_reaches_once_subscribers_only():
+    async def scenario(bus):
+        once = recorder(bus, PackageCreated, name="once")
+        per_worker = recorder(bus, PackageCreated, per_worker=True, name="per_worker")
+        bus.publish(PackageCreated(package=package("local")))
+        await bus.join()
+        bus.deliver(PackageCreated(package=package("other worker")))
+        await bus.join()
+        return [e.package["title"] for _, e in once], [e.package["title"] for _, e in per_worker]
+
+    assert run(scenario) == (["local"], ["other worker"])
+
+
+def fake_watch(*attempts):
+    # each call opens the next scripted stream; an exception fails that attempt
+    attempts = list(attempts)
+    calls = []
+
+    @contextlib.asynccontextmanager
+    async def watch():
+        calls.append(1)
+        changes = attempts.pop(0) if attempts else []
+        if isinstance(changes, Exception):
+            raise changes
+
+        async def stream():
+            for change in changes:
+                yield change
+            await asyncio.Event().wait()   # stays open, like a real stream
+        yield stream()
+    watch.calls = calls
+    return watch
+
+
+def package_change(op, doc, fields=None):
+    change = {"operationType": op, "ns": {"coll": "packages"}, "documentKey": {"_id": doc["_id"]}}
+    if op != "delete":
+        change["fullDocument"] = doc
+    if fields:
+        change["updateDescription"] = {"updatedFields": fields}
+    return change
+
+
+def test_change_stream_feeds_per_worker_subscribers():
+    doc = package("streamed")
+    approved = {**doc, "status": "approved"}
+    watch = fake_watch(ConnectionError("no primary"), [
+        package_change("insert", doc),
+        package_change("update", approved, {"status": "approved"}),
+        package_change("delete", doc),
+    ])
+
+    async def main():
+        bus = EventBus(source="change_stream")
+        once = recorder(bus, PackageCreated, PackagesModerated, PackageDeleted, name="once")
+        per_worker = recorder(bus, PackageCreated, PackageUpdated, PackagesModerated, PackageDeleted,
+                              per_worker=True, name="per_worker")
+        bus.start(stream_source=ChangeStreamSource(watch=watch, retry_delay=0.01))
+        try:
+            await wait_for(lambda: len(per_worker) == 4)
+            await bus.join()
+        finally:
+            await bus.stop()
+        return once, per_worker
+
+    once, per_worker = asyncio.run(main())
+    assert once == []
+    assert [type(e) for _, e in per_worker] == [PackageCreated, PackageUpdated, PackageApproved, PackageDeleted]
+    assert per_worker[2][1].package_ids == [str(doc["_id"])]
+    assert len(watch.calls) == 2   # reconnected after the failed attempt
+
+
+def test_change_events_mapping():
+    oid = ObjectId()
+    booking = {"_id": oid, "package_id": "p"}
+    assert [type(e) for e in change_events(
+        {"operationType": "insert", "ns": {"coll": "bookings"}, "documentKey": {"_id": oid}, "fullDocument": booking}
+    )] == [BookingCreated]
+
+    role = change_events({
+        "operationType": "update", "ns": {"coll": "users"}, "documentKey": {"_id": oid},
+        "fullDocument": {"_id": oid, "email": "a@x"}, "updateDescription": {"updatedFields": {"role": "agent"}},
+    })
+    assert role == [UserRoleChanged(user_id=str(oid), email="a@x", role="agent", occurred_at=role[0].occurred_at)]
+
+    # updated, then deleted before the full-document lookup: the delete follows
+    assert change_events(package_change("update", {"_id": oid}, {"title": "x"}) | {"fullDocument": None}) == []
+
+
+def test_change_stream_without_replica_set_stays_local():
+    async def main():
+        bus = EventBus(source="change_stream")
+        bus.start()
+        try:
+            return bus.stream_task
+        finally:
+            await bus.stop()
+
+    assert asyncio.run(main()) is None
@@ -0,0 +1,243 @@
+"""
+ExternalClient against a local stub server: timeouts, retries, the
+circuit breaker (open and half-open) and the 503 the routes map
+UpstreamUnavailable to.
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from routes import external_routes
+from utils.http_client import ExternalClient, UpstreamUnavailable
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        status, delay, body = self.server.next_response(path)
+        if delay:
+            time.sleep(delay)
+        payload = json.dumps(body).encode()
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            pass   # the client timed out and hung up
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    # path -> [(status, delay, body)]; the last response repeats
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.url = f"http://127.0.0.1:{self.server_address[1]}"
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.scripts = {}
+        self.hits = Counter()
+
+    def script(self, path, *responses):
+        self.scripts[path] = [r if len(r) == 3 else (*r, {"ok": True}) for r in responses]
+
+    def next_response(self, path):
+        with self.lock:
+            self.hits[path] += 1
+            responses = self.scripts.get(path) or [(200, 0, {"ok": True})]
+            return responses.pop(0) if len(responses) > 1 else responses[0]
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = StubServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def stub(server):
+    server.reset()
+    return server
+
+
+def run(coro_fn, **options):
+    options = {"timeout": 1.0, "retries": 0, "retry_backoff": 0, **options}
+
+    async def main():
+        client = ExternalClient(**options)
+        try:
+            return await coro_fn(client)
+        finally:
+            await client.aclose()
+    return asyncio.run(main())
+
+
+# --------------------------
+# Timeouts and retries
+# --------------------------
+def test_timeout_raises_unavailable(stub):
+    stub.script("/slow", (200, 0.5))
+
+    async def scenario(client):
+        with pytest.raises(UpstreamUnavailable):
+            await client.get_json(f"{stub.url}/slow")
+        return client.breaker(stub.url).failures
+
+    assert run(scenario, timeout=0.1) == 1
+    assert stub.hits["/slow"] == 1
+
+
+def test_retry_recovers_from_transient_5xx(stub):
+    stub.script("/flaky", (503, 0), (200, 0))
+
+    async def scenario(client):
+        return await client.get_json(f"{stub.url}/flaky"), client.breaker(stub.url).failures
+
+    assert run(scenario, retries=1) == ((200, {"ok": True}), 0)
+    assert stub.hits["/flaky"] == 2
+
+
+def test_retry_recovers_from_timeout(stub):
+    stub.script("/flaky", (200, 0.5), (200, 0))
+
+    async def scenario(client):
+        return await client.get_json(f"{stub.url}/flaky")
+
+    assert run(scenario, timeout=0.1, retries=1) == (200, {"ok": True})
+    assert stub.hits["/flaky"] == 2
+
+
+def test_exhausted_retries_count_one_breaker_failure(stub):
+    stub.script("/error", (500, 0))
+
+    async def scenario(client):
+        with pytest.raises(UpstreamUnavailable):
+            await client.get_json(f"{stub.url}/error")
+        return client.breaker(stub.url).failures
+
+    assert run(scenario, retries=2) == 1
+    assert stub.hits["/error"] == 3
+
+
+def test_4xx_is_returned_not_retried(stub):
+    stub.script("/missing", (404, 0, {"message": "not found"}))
+
+    async def scenario(client):
+        return await client.get_json(f"{stub.url}/missing", cache_key="missing", ttl=60)
+
+    assert run(scenario, retries=2) == (404, {"message": "not found"})
+    assert stub.hits["/missing"] == 1
+
+
+# --------------------------
+# Circuit breaker
+# --------------------------
+def test_breaker_opens_after_threshold(stub):
+    stub.script("/error", (500, 0))
+
+    async def scenario(client):
+        for _ in range(3):
+            with pytest.raises(UpstreamUnavailable):
+                await client.get_json(f"{stub.url}/error")
+        # open: rejected without reaching the upstream
+        with pytest.raises(UpstreamUnavailable, match="circuit open"):
+            await client.get_json(f"{stub.url}/ok")
+
+    run(scenario, breaker_threshold=3, breaker_reset=60)
+    assert stub.hits["/error"] == 3
+    assert stub.hits["/ok"] == 0
+
+
+def test_half_open_lets_one_probe_through(stub):
+    stub.script("/error", (500, 0))
+    stub.script("/probe", (200, 0.2))
+
+    async def scenario(client):
+        with pytest.raises(UpstreamUnavailable):
+            await client.get_json(f"{stub.url}/error")
+        await asyncio.sleep(0.1)   # past the cool-down
+
+        calls = [client.get_json(f"{stub.url}/probe", {"n": n}) for n in range(5)]
+        results = await asyncio.gather(*calls, return_exceptions=True)
+        # closed again: everyone gets through
+        after = await client.get_json(f"{stub.url}/probe", {"n": "after"})
+        return results, after
+
+    results, after = run(scenario, breaker_threshold=1, breaker_reset=0.05)
+    assert [r for r in results if not isinstance(r, Exception)] == [(200, {"ok": True})]
+    assert sum(isinstance(r, UpstreamUnavailable) for r in results) == 4
+    assert after == (200, {"ok": True})
+    assert stub.hits["/probe"] == 2
+
+
+def test_failed_probe_reopens(stub):
+    stub.script("/error", (500, 0))
+
+    async def scenario(client):
+        with pytest.raises(UpstreamUnavailable):
+            await client.get_json(f"{stub.url}/error")
+        await asyncio.sleep(0.1)
+        with pytest.raises(UpstreamUnavailable, match="500"):
+            await client.get_json(f"{stub.url}/error")    # the probe
+        with pytest.raises(UpstreamUnavailable, match="circuit open"):
+            await client.get_json(f"{stub.url}/ok")
+
+    run(scenario, breaker_threshold=1, breaker_reset=0.05)
+    assert stub.hits["/error"] == 2
+    assert stub.hits["/ok"] == 0
+
+
+# --------------------------
+# Routes: UpstreamUnavailable -> 503
+# --------------------------
+@pytest.fixture
+def weather_api(stub, monkeypatch):
+    monkeypatch.setattr(external_routes, "OPENWEATHER_KEY", "test")
+    monkeypatch.setattr(external_routes, "OPENWEATHER_URL", stub.url)
+    monkeypatch.setattr(external_routes, "external_client", ExternalClient(timeout=0.2, retries=0))
+    app = FastAPI()
+    app.include_router(external_routes.router, prefix="/api/external")
+    with TestClient(app) as client:
+        yield client
+
+
+WEATHER = {
+    "name": "Paris", "main": {"temp": 18.5, "humidity": 60}, "wind": {"speed": 3.1},
+    "weather": [{"description": "clear sky", "icon": "01d"}],
+}
+
+
+def test_weather_ok(stub, weather_api):
+    stub.script("/data/2.5/weather", (200, 0, WEATHER))
+    res = weather_api.get("/api/external/weather/paris")
+    assert res.status_code == 200
+    assert res.json()["city"] == "Paris"
+
+
+def test_weather_upstream_error_is_503(stub, weather_api):
+    stub.script("/data/2.5/weather", (502, 0))
+    res = weather_api.get("/api/external/weather/paris")
+    assert res.status_code == 503
+
+
+def test_weather_timeout_is_503(stub, weather_api):
+    stub.script("/data/2.5/weather", (200, 0.5, WEATHER))
+    res = weather_api.get("/api/external/weather/paris")
+    assert res.status_code == 503
@@ -0,0 +1,39 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+import pytest
+from fastapi import HTTPException
+from database.repositories import idempotency_repo
+from utils import idempotency
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_replay_and_conflicts():
+    key, body = uuid.uuid4().hex, {"package_id": "p", "persons": 1}
+    assert run(idempotency.begin("a@x", key, body)) is None
+    with pytest.raises(HTTPException) as busy:
+        run(idempotency.begin("a@x", key, body))
+    assert busy.value.status_code == 409
+    with pytest.raises(HTTPException) as other:
+        run(idempotency.begin("a@x", key, {**body, "persons": 2}))
+    assert other.value.status_code == 422
+
+    run(idempotency.complete("a@x", key, {"booking": "b1"}))
+    assert run(idempotency.begin("a@x", key, body)) == {"booking": "b1"}
+
+
+def test_abandoned_claim_is_taken_over():
+    key, body = uuid.uuid4().hex, {"package_id": "p"}
+    run(idempotency.begin("a@x", key, body))
+    # the worker holding the claim died long ago
+    stale = datetime.utcnow() - timedelta(seconds=idempotency.IDEMPOTENCY_LEASE_SECONDS + 1)
+    run(idempotency_repo.update_one({"_id": idempotency.scoped_key("a@x", key)}, {"$set": {"claimed_at": stale}}))
+
+    assert run(idempotency.begin("a@x", key, body)) is None
+    # the new claim is live again
+    with pytest.raises(HTTPException) as busy:
+        run(idempotency.begin("a@x", key, body))
+    assert busy.value.status_code == 409
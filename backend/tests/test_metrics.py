@@ -0,0 +1,41 @@
+from types import SimpleNamespace
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from starlette.routing import Route
+from utils.metrics import MetricsMiddleware, registry, route_template
+
+
+def scope(path, **extra):
+    return {"type": "http", "method": "GET", "path": path, "root_path": "", "query_string": b"", "headers": [], **extra}
+
+
+@pytest.fixture(scope="module")
+def client():
+    router = APIRouter()
+
+    @router.get("/{item_id}")
+    async def item(item_id: str):
+        return {"id": item_id}
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api/items")
+    app.add_middleware(MetricsMiddleware)
+    return TestClient(app)
+
+
+def test_included_routes_are_labelled_with_their_template(client):
+    for n in range(3):
+        client.get(f"/api/items/raw-{n}")
+    client.get("/no/such/path")
+    rendered = registry.render()
+    assert 'route="/api/items/{item_id}"' in rendered
+    assert 'route="unmatched"' in rendered
+    assert "raw-" not in rendered and "/no/such/path" not in rendered
+
+
+def test_fallback_without_fastapi_route_context():
+    app = SimpleNamespace(routes=[Route("/metrics", lambda request: None), SimpleNamespace(matches=None)])
+    assert route_template(scope("/metrics", app=app)) == "/metrics"
+    assert route_template(scope("/api/items/raw-1", app=app)) == "unmatched"
+    assert route_template(scope("/api/items/raw-1")) == "unmatched"
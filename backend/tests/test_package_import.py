@@ -0,0 +1,101 @@
+import asyncio
+import json
+from database.repositories import packages_repo
+from utils import geocoding
+from utils.package_import import import_key, import_packages, parse_rows
+
+
+def ndjson(*rows):
+    async def chunks():
+        yield "\n".join(json.dumps(r) for r in rows).encode()
+    return parse_rows(chunks(), "ndjson")
+
+
+def row(title, location="Goa", **extra):
+    return {"title": title, "description": "d", "location": location, "price": 10, "days": 2, **extra}
+
+
+def test_locations_are_geocoded_once_per_batch_concurrently(monkeypatch):
+    calls, active, peak = [], [0], [0]
+
+    async def slow_geocode(location):
+        calls.append(location)
+        active[0] += 1
+        peak[0] = max(peak[0], active[0])
+        await asyncio.sleep(0.05)
+        active[0] -= 1
+        return geocoding.point(1.0, 2.0) if location != "nowhere" else None
+
+    monkeypatch.setattr(geocoding, "geocode", slow_geocode)
+    rows = [row(f"geo {n}", location=loc) for n, loc in enumerate(["Goa", "goa ", "Leh", "Goa", "nowhere"])]
+
+    async def scenario():
+        await packages_repo.delete_many({})
+        report = await import_packages(ndjson(*rows), owner="agent@x")
+        return report, await packages_repo.find({}, {"title": 1, "geo": 1})
+
+    report, docs = asyncio.run(scenario())
+    assert report["inserted"] == 5
+    assert sorted(calls) == ["goa", "leh", "nowhere"]
+    assert peak[0] == 3
+    assert sum("geo" in d for d in docs) == 4
+
+
+def test_reimport_updates_in_place():
+    async def scenario():
+        await packages_repo.delete_many({})
+        first = await import_packages(ndjson(row("Same"), row("Other")), owner="agent@x")
+        second = await import_packages(ndjson(row("Same", price=20)), owner="agent@x")
+        return first, second, await packages_repo.find({"title": "Same"})
+
+    first, second, docs = asyncio.run(scenario())
+    assert (first["inserted"], second["inserted"], second["updated"]) == (2, 0, 1)
+    assert [d["price"] for d in docs] == [20]
+
+
+def test_row_inserted_by_a_concurrent_import_is_skipped():
+    async def scenario():
+        await packages_repo.delete_many({})
+        from database.indexes import INDEXES
+        await packages_repo.col.create_indexes(INDEXES["packages"][-1:])
+        # the other import won the insert between our upsert's match and insert
+        doc = {**row("Race"), "created_by": "agent@x"}
+        await packages_repo.insert_one({"title": "Race (other writer)", "import_key": import_key(doc)})
+        report = await import_packages(ndjson(row("Race"), row("Fine")), owner="agent@x")
+        return report, await packages_repo.count({"title": {"$in": ["Race", "Fine"]}})
+
+    report, count = asyncio.run(scenario())
+    assert (report["inserted"], report["skipped"], report["failed"], report["errors"]) == (1, 1, 0, [])
+    assert count == 1
+
+
+def test_import_route_publishes_one_event_per_batch(monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from models.event_model import PackagesCreated
+    from routes import package_routes
+    from utils.jwt_helper import create_access_token
+    from utils.package_import import IMPORT_BATCH_SIZE
+
+    async def no_geocode(location):
+        return None
+
+    published = []
+    monkeypatch.setattr(geocoding, "geocode", no_geocode)
+    monkeypatch.setattr(package_routes.event_bus, "publish", published.append)
+    asyncio.run(packages_repo.delete_many({}))
+
+    app = FastAPI()
+    app.include_router(package_routes.router, prefix="/api/packages")
+    token = create_access_token({"email": "agent@x", "role": "travel_partner"})
+    body = "\n".join(json.dumps(row(f"evt {n}")) for n in range(IMPORT_BATCH_SIZE + 1))
+    response = TestClient(app).post(
+        "/api/packages/import", content=body,
+        headers={"Authorization": f"Bearer {token}", "Content-Type": "application/x-ndjson"},
+    )
+
+    assert response.json()["inserted"] == IMPORT_BATCH_SIZE + 1
+    assert [type(e) for e in published] == [PackagesCreated, PackagesCreated]
+    assert [len(e.packages) for e in published] == [IMPORT_BATCH_SIZE, 1]
+    assert all(p["created_by"] == "agent@x" and p["status"] == "pending" for e in published for p in e.packages)
+    asyncio.run(packages_repo.delete_many({}))
@@ -0,0 +1,132 @@
+import asyncio
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+from pymongo import ASCENDING
+from database.db_connection import LazyCollection
+from database.repositories import Repository
+from utils.facets import build_filters, facet_counts
+from utils.pagination import MAX_LIMIT, encode_cursor, decode_cursor, keyset_filter, paginate, page_response
+
+
+def make_repo(name, docs):
+    repo = Repository(LazyCollection(name))
+
+    async def fill():
+        await repo.delete_many({})
+        if docs:
+            await repo.insert_many(docs)
+    asyncio.run(fill())
+    return repo
+
+
+# --------------------------
+# Cursors
+# --------------------------
+def test_cursor_round_trip():
+    oid = ObjectId()
+    assert decode_cursor(encode_cursor([12.5, oid])) == [12.5, oid]
+
+
+@pytest.mark.parametrize("value", [{"$ne": None}, {"$where": "sleep(1000)"}, ["a"], {"nested": {"$gt": 1}}])
+def test_operator_cursor_values_are_rejected(value):
+    for cursor in ([value, ObjectId()], [1, value]):
+        with pytest.raises(HTTPException) as err:
+            keyset_filter("price", ASCENDING, decode_cursor(encode_cursor(cursor)))
+        assert err.value.status_code == 400
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!!", encode_cursor({"a": 1}), encode_cursor([1, 2, 3])])
+def test_malformed_cursors_are_rejected(cursor):
+    repo = make_repo("test_pages", [])
+    with pytest.raises(HTTPException) as err:
+        asyncio.run(paginate(repo, {}, limit=10, after=cursor, sort="price", allowed_sorts=("_id", "price")))
+    assert err.value.status_code == 400
+
+
+# --------------------------
+# Keyset ordering
+# --------------------------
+def walk(repo, sort, limit):
+    async def pages():
+        seen, after = [], None
+        while True:
+            docs, after = await paginate(repo, {}, limit=limit, after=after, sort=sort,
+                                         allowed_sorts=("_id", "price"))
+            seen.extend(docs)
+            if after is None:
+                return seen
+    return [doc["n"] for doc in asyncio.run(pages())]
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 10])
+def test_pages_follow_sort_order_with_null_values(limit):
+    # n is insertion order, so _id breaks ties in n order
+    prices = [3, None, 1, None, 2, 1, "missing", 3]
+    docs = [{"n": n, "price": p} if p != "missing" else {"n": n} for n, p in enumerate(prices)]
+    repo = make_repo("test_pages", docs)
+
+    # missing and null sort first ascending, last descending
+    assert walk(repo, "price", limit) == [1, 3, 6, 2, 5, 4, 0, 7]
+    assert walk(repo, "-price", limit) == [7, 0, 4, 5, 2, 6, 3, 1]
+
+
+# --------------------------
+# Facets
+# --------------------------
+def facet_docs():
+    return [
+        {"category": "beach", "location": "Goa", "price": 5000, "days": 3, "rating": 4.6},
+        {"category": "beach", "location": "Goa", "price": 30000, "days": 5, "rating": 3.5},
+        {"category": "beach", "location": "Kerala", "price": 12000, "days": 3},
+        {"category": "mountain", "location": "Leh", "price": 60000, "days": 7, "rating": 4.2},
+        {"category": "mountain", "location": "Leh", "price": 8000, "days": 5, "rating": 4.9},
+        {"category": "heritage", "location": "Jaipur", "days": 2, "rating": 4.0},
+        {"category": "beach", "location": "Goa", "price": 1000, "days": 1, "status": "pending"},
+    ]
+
+
+def counts(rows):
+    return {row.get("value", row.get("min")): row["count"] for row in rows}
+
+
+def test_facet_counts_ignore_their_own_filter():
+    repo = make_repo("test_facets", facet_docs())
+    filters = build_filters(category=["beach"], ranges={"price": (None, 20000)})
+    facets = asyncio.run(facet_counts(repo, {"status": {"$ne": "pending"}}, filters))
+
+    assert facets["total"] == 2
+    # category facet: every category under the price filter
+    assert counts(facets["category"]) == {"beach": 2, "mountain": 1}
+    # price facet: every beach package, bucketed
+    assert counts(facets["price"]) == {0: 1, 10000: 1, 25000: 1}
+    assert counts(facets["location"]) == {"Goa": 1, "Kerala": 1}
+    assert counts(facets["days"]) == {3: 2}
+    # rating buckets only count packages that have a rating
+    assert counts(facets["rating"]) == {4.5: 1}
+
+
+def test_multi_value_and_range_filters():
+    filters = build_filters(category=["beach", "mountain"], location=["Goa"], ranges={"days": (3, None)})
+    assert filters == {"category": {"$in": ["beach", "mountain"]}, "location": "Goa", "days": {"$gte": 3}}
+    repo = make_repo("test_facets", facet_docs())
+    facets = asyncio.run(facet_counts(repo, {"status": {"$ne": "pending"}}, filters))
+    assert facets["total"] == 2
+    assert counts(facets["location"]) == {"Goa": 2, "Leh": 2, "Kerala": 1}
+
+    with pytest.raises(HTTPException) as err:
+        build_filters(ranges={"price": (500, 100)})
+    assert err.value.status_code == 400
+
+
+# --------------------------
+# Limits
+# --------------------------
+def test_unlimited_request_is_capped():
+    repo = make_repo("test_pages", [{"n": n} for n in range(MAX_LIMIT + 5)])
+    docs, next_cursor = asyncio.run(paginate(repo, {}))
+    assert len(docs) == MAX_LIMIT
+    assert next_cursor is not None
+    # the legacy plain-list shape is kept without ?limit=
+    assert page_response(docs, next_cursor, None) == docs
+    assert page_response(docs, next_cursor, 10) == {"items": docs, "next_cursor": next_cursor}
@@ -0,0 +1,67 @@
+import asyncio
+from datetime import datetime
+import pytest
+from bson import ObjectId
+from database.repositories import bookings_repo
+from utils import payment_worker as worker_module
+from utils.capacity import remaining, reserve
+from utils.payment_gateway import PaymentGateway
+from utils.payment_worker import PaymentWorker
+
+
+class ScriptedGateway(PaymentGateway):
+    def __init__(self, status="success", delay=0, error=None, during=None):
+        self.status, self.delay, self.error, self.during = status, delay, error, during
+
+    async def charge(self, amount, reference):
+        if self.during:
+            await self.during(reference)
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return {"payment_id": f"pay-{reference}", "status": self.status, "amount": amount}
+
+
+def process(gateway, package_id):
+    async def scenario():
+        await reserve(package_id, "2030-01-01", 2, 10)
+        res = await bookings_repo.insert_one({
+            "package_id": package_id, "date": "2030-01-01", "persons": 2, "total": 50,
+            "payment_status": "pending", "seats_reserved": True, "created_at": datetime(2029, 12, 1),
+        })
+        await PaymentWorker(workers=1, gateway=gateway).process(res.inserted_id)
+        booking = await bookings_repo.get_by_id(res.inserted_id)
+        return booking, await remaining(package_id, "2030-01-01", 10)
+    return asyncio.run(scenario())
+
+
+def test_gateway_is_abstract():
+    with pytest.raises(TypeError):
+        PaymentGateway()
+
+
+def test_success_keeps_seats():
+    booking, left = process(ScriptedGateway("success"), "pay-ok")
+    assert (booking["payment_status"], booking["payment_id"], left) == ("success", f"pay-{booking['_id']}", 8)
+    assert "claimed_by" not in booking
+
+
+def test_decline_releases_seats():
+    booking, left = process(ScriptedGateway("failed"), "pay-declined")
+    assert (booking["payment_status"], left) == ("failed", 10)
+
+
+@pytest.mark.parametrize("gateway", [ScriptedGateway(delay=1), ScriptedGateway(error=ConnectionError("reset"))])
+def test_unanswered_charge_is_unknown_and_keeps_seats(monkeypatch, gateway):
+    monkeypatch.setattr(worker_module, "PAYMENT_CHARGE_TIMEOUT", 0.05)
+    booking, left = process(gateway, f"pay-unknown-{id(gateway)}")
+    assert (booking["payment_status"], left) == ("unknown", 8)
+
+
+def test_expired_lease_does_not_overwrite_the_new_claim():
+    async def reclaimed(reference):
+        # our lease expired and another worker re-claimed the booking
+        await bookings_repo.update_one({"_id": ObjectId(reference)}, {"$set": {"claimed_by": "other:1"}})
+
+    booking, left = process(ScriptedGateway("failed", during=reclaimed), "pay-lease")
+    assert (booking["payment_status"], booking["claimed_by"], left) == ("processing", "other:1", 8)
@@ -0,0 +1,156 @@
+"""
+Token buckets (memory and a fakeredis store) and the 429 / Retry-After
+answer of RateLimitMiddleware.
+"""
+import asyncio
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+from utils.jwt_helper import create_access_token
+from utils.rate_limit import MemoryBuckets, RedisBuckets, RateLimitMiddleware, Rule, parse_rate
+
+
+def test_parse_rate():
+    assert parse_rate("10/60") == (10, 10 / 60)
+    assert parse_rate("5") == (5, 5.0)
+    assert parse_rate("0") is None
+
+
+# --------------------------
+# Memory buckets
+# --------------------------
+def test_memory_burst_then_empty():
+    buckets = MemoryBuckets()
+    assert [buckets.take_one("k", 3, 1.0, now=100.0) for _ in range(3)] == [0, 0, 0]
+    assert buckets.take_one("k", 3, 1.0, now=100.0) == pytest.approx(1.0)
+
+
+def test_memory_refill():
+    buckets = MemoryBuckets()
+    for _ in range(2):
+        buckets.take_one("k", 2, 0.5, now=0.0)
+    assert buckets.take_one("k", 2, 0.5, now=1.0) == pytest.approx(1.0)   # half a token back
+    assert buckets.take_one("k", 2, 0.5, now=3.0) == 0                       # one more token
+    # refill never goes above the burst
+    assert [buckets.take_one("k", 2, 0.5, now=1000.0) for _ in range(3)][-1] > 0
+
+
+def test_memory_take_reports_slowest_bucket():
+    buckets = MemoryBuckets()
+    checks = [("ip", 1, 1.0), ("user", 1, 0.25)]
+    assert asyncio.run(buckets.take(checks)) == 0
+    assert asyncio.run(buckets.take(checks)) == pytest.approx(4.0, abs=0.1)
+
+
+def test_memory_sweep_drops_full_buckets():
+    buckets = MemoryBuckets(maxsize=2)
+    buckets.take_one("a", 1, 1.0, now=0.0)
+    buckets.take_one("b", 1, 1.0, now=0.0)
+    buckets.take_one("c", 1, 1.0, now=5.0)   # a and b are full again by now
+    assert set(buckets.buckets) == {"c"}
+
+
+def test_memory_full_table_evicts_least_recent_not_everyone():
+    buckets = MemoryBuckets(maxsize=10)
+    buckets.take_one("abuser", 1, 0.001, now=0.0)          # throttled for ~1000s
+    retries = []
+    for n in range(50):
+        buckets.take_one(f"ip-{n}", 1, 0.001, now=1.0 + n)  # fresh source IPs fill the table
+        retries.append(buckets.take_one("abuser", 1, 0.001, now=1.0 + n))
+    assert len(buckets.buckets) <= 10
+    assert all(r > 0 for r in retries)                      # never reset by the flood
+
+
+# --------------------------
+# Redis buckets (fakeredis runs the Lua script)
+# --------------------------
+def redis_buckets():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    return RedisBuckets(fakeredis.FakeAsyncRedis())
+
+
+def test_redis_burst_and_refill():
+    buckets = redis_buckets()
+
+    async def scenario():
+        burst = [await buckets.take([("k", 2, 20.0)]) for _ in range(3)]
+        await asyncio.sleep(0.1)   # 2 tokens at 20/s
+        return burst, await buckets.take([("k", 2, 20.0)])
+
+    burst, after = asyncio.run(scenario())
+    assert burst[:2] == [0, 0]
+    assert 0 < burst[2] <= 0.05 + 1e-6
+    assert after == 0
+
+
+def test_redis_keys_are_independent():
+    buckets = redis_buckets()
+
+    async def scenario():
+        await buckets.take([("a", 1, 0.1)])
+        return await buckets.take([("a", 1, 0.1)]), await buckets.take([("b", 1, 0.1)])
+
+    blocked, other = asyncio.run(scenario())
+    assert blocked == pytest.approx(10.0, abs=0.1)
+    assert other == 0
+
+
+# --------------------------
+# Middleware
+# --------------------------
+async def ok(request):
+    return PlainTextResponse("ok")
+
+
+def make_client(backend=None, limits=None):
+    app = Starlette(routes=[Route("/limited", ok), Route("/free", ok)])
+    app.add_middleware(
+        RateLimitMiddleware, backend=backend or MemoryBuckets(), rules=[Rule("test", "GET", "/limited")],
+        limits=limits or {"test": ((2, 2 / 60), None)},
+    )
+    return TestClient(app)
+
+
+def test_429_with_retry_after():
+    client = make_client()
+    assert [client.get("/limited").status_code for _ in range(2)] == [200, 200]
+    res = client.get("/limited")
+    assert res.status_code == 429
+    assert res.headers["retry-after"] == "30"
+    assert res.json() == {"detail": "Too many requests"}
+
+
+def test_unmatched_routes_are_not_limited():
+    client = make_client()
+    assert {client.get("/free").status_code for _ in range(5)} == {200}
+
+
+def test_per_user_buckets():
+    client = make_client(limits={"test": (None, (1, 1 / 60))})
+    alice = {"Authorization": f"Bearer {create_access_token({'email': 'alice@x', 'role': 'traveler'})}"}
+    bob = {"Authorization": f"Bearer {create_access_token({'email': 'bob@x', 'role': 'traveler'})}"}
+    assert client.get("/limited", headers=alice).status_code == 200
+    assert client.get("/limited", headers=alice).status_code == 429
+    assert client.get("/limited", headers=bob).status_code == 200
+    # anonymous requests carry no user key
+    assert client.get("/limited").status_code == 200
+
+
+def test_broken_backend_allows_requests():
+    class Broken:
+        async def take(self, checks):
+            raise ConnectionError("store down")
+
+    client = make_client(backend=Broken())
+    assert {client.get("/limited").status_code for _ in range(3)} == {200}
+
+
+def test_shared_store_limits_across_instances():
+    buckets = redis_buckets()
+    first, second = make_client(backend=buckets), make_client(backend=buckets)
+    assert first.get("/limited").status_code == 200
+    assert second.get("/limited").status_code == 200
+    assert first.get("/limited").status_code == 429
@@ -0,0 +1,28 @@
+import asyncio
+from database import repositories
+from database.repositories import users_repo, bookings_repo
+
+
+def test_hot_reads_are_plan_checked(monkeypatch):
+    checked = []
+
+    async def check_query_plan(col, query, sort=None):
+        checked.append((col.name, query))
+
+    monkeypatch.setattr(repositories, "QUERY_PLAN_CHECK", True)
+    monkeypatch.setattr(repositories, "check_query_plan", check_query_plan)
+
+    async def scenario():
+        await users_repo.get_by_email("a@x")
+        await bookings_repo.count({"payment_status": "pending"})
+        await bookings_repo.aggregate([{"$match": {"payment_status": "success"}}, {"$count": "n"}])
+        # unfiltered reads are expected to scan
+        await bookings_repo.count()
+        await bookings_repo.find()
+    asyncio.run(scenario())
+
+    assert checked == [
+        ("users", {"email": "a@x"}),
+        ("bookings", {"payment_status": "pending"}),
+        ("bookings", {"payment_status": "success"}),
+    ]
@@ -0,0 +1,85 @@
+import asyncio
+from datetime import datetime
+from database.repositories import bookings_repo, packages_repo, daily_stats_repo, moderation_stats_repo
+from database.rollups import MODERATION_ID, record_moderation, record_submission, rebuild_rollups
+
+
+def moderation_counts():
+    async def read():
+        return await moderation_stats_repo.find_one({"_id": MODERATION_ID}, {"_id": 0}) or {}
+    return asyncio.run(read())
+
+
+def test_only_pending_decisions_count():
+    asyncio.run(moderation_stats_repo.delete_many({}))
+    for old, new in [("pending", "approved"), ("pending", "rejected"), ("rejected", "approved"),
+                     ("approved", "rejected"), ("approved", "approved"), (None, "approved"), ("pending", "pending")]:
+        asyncio.run(record_moderation(old, new))
+    assert moderation_counts() == {"approved": 1, "rejected": 1}
+
+
+def test_rebuild_replaces_rollups():
+    async def scenario():
+        await bookings_repo.delete_many({})
+        await packages_repo.delete_many({})
+        await daily_stats_repo.delete_many({})
+        await daily_stats_repo.insert_one({"_id": "1999-01-01", "bookings": 7})   # drift
+        await bookings_repo.insert_many([
+            {"payment_status": "success", "total": 100, "persons": 2, "package_id": "p1",
+             "package_owner": "agent@x", "created_at": datetime(2025, 5, 1, 10)},
+            {"payment_status": "success", "total": 50, "persons": 1, "package_id": "p1",
+             "package_owner": "agent@x", "created_at": datetime(2025, 5, 1, 12)},
+            {"payment_status": "failed", "total": 80, "persons": 1, "package_id": "p2",
+             "created_at": datetime(2025, 5, 2)},
+        ])
+        await packages_repo.insert_many([
+            {"status": "pending", "created_by": "agent@x"},
+            {"status": "approved", "created_by": "agent@x"},
+        ])
+        return await rebuild_rollups(), await daily_stats_repo.find()
+
+    result, daily = asyncio.run(scenario())
+    assert result == {"days": 1, "packages": 1, "agents": 1}
+    assert daily == [{"_id": "2025-05-01", "bookings": 2, "revenue": 150, "persons": 3}]
+    assert moderation_counts() == {"submitted": 2, "approved": 1, "rejected": 0}
+
+
+def test_rebuild_matches_incremental_totals():
+    async def scenario():
+        await packages_repo.delete_many({})
+        await moderation_stats_repo.delete_many({})
+        # seed data: approved without an owner, never moderated
+        await packages_repo.insert_many([{"status": "approved", "created_by": None} for _ in range(3)])
+        await packages_repo.insert_one({"status": "rejected", "created_by": None})
+
+        # agents submit five packages; two get approved, one rejected and
+        # two stay in the queue
+        ids = []
+        for n in range(5):
+            pkg = {"title": f"p{n}", "status": "pending", "created_by": "agent@x"}
+            await packages_repo.insert_one(pkg)
+            await record_submission(pkg)
+            ids.append(pkg["_id"])
+        for oid, new in zip(ids, ["approved", "approved", "rejected"]):
+            await packages_repo.update_one({"_id": oid}, {"$set": {"status": new}})
+            await record_moderation("pending", new)
+
+        incremental = await moderation_stats_repo.find_one({"_id": MODERATION_ID}, {"_id": 0})
+        await rebuild_rollups()
+        rebuilt = await moderation_stats_repo.find_one({"_id": MODERATION_ID}, {"_id": 0})
+        return incremental, rebuilt
+
+    incremental, rebuilt = asyncio.run(scenario())
+    assert incremental == {"submitted": 5, "approved": 2, "rejected": 1}
+    assert rebuilt == incremental
+
+
+def test_batched_submissions_count_like_single_ones():
+    from models.event_model import PackagesCreated
+    from utils.event_handlers import count_submissions
+
+    asyncio.run(moderation_stats_repo.delete_many({}))
+    packages = [{"status": "pending", "created_by": "agent@x"}, {"status": "pending", "created_by": None},
+                {"status": "approved", "created_by": "agent@x"}, {"status": "pending", "created_by": "agent@y"}]
+    asyncio.run(count_submissions(PackagesCreated(packages=packages)))
+    assert moderation_counts() == {"submitted": 2}
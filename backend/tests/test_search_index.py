@@ -0,0 +1,118 @@
+"""
+PackageSearchIndex: tokenization, prefix expansion, AND semantics across
+terms, ranking and its tie-break, and the status/category filters.
+"""
+import pytest
+from bson import ObjectId
+from utils import search_index as search_module
+from utils.search_index import PackageSearchIndex, tokenize
+
+
+def package(title, status="approved", category=None, **fields):
+    return {"_id": ObjectId(), "title": title, "status": status, "category": category, **fields}
+
+
+def make_index(*pkgs):
+    index = PackageSearchIndex()
+    for pkg in pkgs:
+        index.add(pkg)
+    return index
+
+
+def ids(*pkgs):
+    return [str(pkg["_id"]) for pkg in pkgs]
+
+
+# --------------------------
+# Tokenization
+# --------------------------
+def test_tokenize():
+    assert tokenize("Goa, Beach-Paradise!") == ["goa", "beach", "paradise"]
+    assert tokenize(["Fort", "Street food"]) == ["fort", "street", "food"]
+    assert tokenize("Café Zürich") == ["café", "zürich"]
+    assert tokenize(None) == [] and tokenize("") == []
+
+
+def test_query_is_never_a_regex():
+    index = make_index(package("Goa beach"))
+    assert index.search(".*") == []
+    assert index.search("(goa") == index.search("goa")
+
+
+# --------------------------
+# Prefix expansion
+# --------------------------
+def test_prefix_matches_score_below_exact_terms():
+    goa, goan = package("Goa"), package("Goan food")
+    index = make_index(goan, goa)
+    assert index.search("goa") == ids(goa, goan)
+    assert index.search("go") == ids(goan, goa)       # both prefix matches, newest first
+    assert index.search("g") == []                    # below MIN_PREFIX_LEN, exact only
+
+
+def test_prefix_expansion_is_capped(monkeypatch):
+    monkeypatch.setattr(search_module, "MAX_PREFIX_EXPANSION", 3)
+    pkgs = [package(f"trek{n}") for n in range(5)]
+    index = make_index(*pkgs)
+    assert index.search("trek") == ids(*pkgs[:3])[::-1]   # trek0..trek2 in vocabulary order
+
+
+def test_removed_terms_leave_the_vocabulary():
+    pkg = package("Ladakh")
+    index = make_index(pkg)
+    index.remove(pkg["_id"])
+    assert index.vocab == [] and index.search("lad") == []
+
+
+# --------------------------
+# AND semantics and ranking
+# --------------------------
+def test_every_term_must_match():
+    both, beach, fort = package("Goa beach"), package("Kerala beach"), package("Goa fort")
+    index = make_index(both, beach, fort)
+    assert index.search("goa beach") == ids(both)
+    assert index.search("goa bea") == ids(both)       # the last term may be a prefix
+    assert index.search("goa desert") == []
+
+
+def test_field_weights_rank_results():
+    in_title = package("Houseboat")
+    in_description = package("Backwaters", description="a houseboat night")
+    index = make_index(in_title, in_description)
+    assert index.search("houseboat") == ids(in_title, in_description)
+    assert index.search("houseboat", limit=1) == ids(in_title)
+
+
+@pytest.mark.parametrize("q", ["beach", "goa beach"])
+def test_ties_go_to_the_newest_package(q):
+    pkgs = [package("Goa beach") for _ in range(4)]
+    index = make_index(*pkgs)
+    assert index.search(q) == ids(*pkgs)[::-1]
+    assert index.search(q, limit=2) == ids(*pkgs)[::-1][:2]
+
+
+# --------------------------
+# Filters
+# --------------------------
+def test_status_and_category_filters():
+    live = package("Goa beach", category="beach")
+    pending = package("Goa beach", status="pending", category="beach")
+    other = package("Goa fort", category="heritage")
+    index = make_index(live, pending, other)
+
+    assert index.search("goa") == ids(other, live)                 # approved by default
+    assert index.search("goa", status="pending") == ids(pending)
+    assert index.search("goa", status=None) == ids(other, pending, live)
+    assert index.search("goa", category="beach") == ids(live)
+    assert index.search("goa", category="beach", limit=5) == ids(live)
+    assert index.search("goa", category="spa") == []
+
+
+def test_moderation_moves_the_package_between_statuses():
+    pkg = package("Spiti valley", status="pending")
+    index = make_index(pkg)
+    before = index.state()
+    index.set_status(pkg["_id"], "approved")
+    assert index.search("spiti") == ids(pkg)
+    assert index.search("spiti", status="pending") == []
+    assert index.state() != before
@@ -1,12 +1,21 @@
 from fastapi import Request, HTTPException
 from fastapi.security import HTTPBearer
-from utils.jwt_helper import decode_token
+from utils.jwt_helper import verify_token
 
 class AuthBearer(HTTPBearer):
     async def __call__(self, request: Request):
         credentials = await super().__call__(request)
         token = credentials.credentials
-        decoded = decode_token(token)
+
+        # RoleChecker and the route may both depend on AuthBearer; decode
+        # once per request and reuse the claims
+        memo = getattr(request.state, "jwt_claims", None)
+        if memo is not None and memo[0] == token:
+            return memo[1]
+
+        decoded = verify_token(token)
         if not decoded:
             raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+        request.state.jwt_claims = (token, decoded)
         return decoded
@@ -0,0 +1,265 @@
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+from fastapi import Request, Response
+from utils.compression import COMPRESS, COMPRESS_MIN_SIZE, compress_async, encoded_etag, negotiate
+from utils.serialization import dumps
+
+# --------------------------
+# Read-through cache for the public package catalog
+#   CATALOG_CACHE=0          -> disabled
+#   CATALOG_CACHE_BACKEND    -> memory (default) | redis
+#   CATALOG_CACHE_TTL        -> seconds (default 60)
+#   CATALOG_CACHE_SIZE       -> max entries for the memory backend
+#   REDIS_URL                -> used by the redis backend
+#
+# List entries are keyed by a catalog version; every write that touches
+# the approved catalog bumps the version, so stale lists are never read.
+# Single-package entries are deleted by writes to that package.
+#
+# List ETags are derived from the same version, so a matching
+# If-None-Match is answered 304 before the cache or Mongo is touched.
+# Admin package listings use a second counter bumped by every package
+# write, approved or not. Compressed variants (br/gzip) of each entry are
+# cached next to it, so hits never compress again.
+# --------------------------
+
+CATALOG_CACHE = os.getenv("CATALOG_CACHE", "1") == "1"
+CATALOG_CACHE_BACKEND = os.getenv("CATALOG_CACHE_BACKEND", "memory")
+CATALOG_CACHE_TTL = int(os.getenv("CATALOG_CACHE_TTL", "60"))
+CATALOG_CACHE_SIZE = int(os.getenv("CATALOG_CACHE_SIZE", "1024"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://127.0.0.1:6379/0")
+
+VERSION_KEY = "catalog:version"
+PACKAGES_VERSION_KEY = "packages:version"
+
+
+# --------------------------
+# Backends
+# Both expose the same async get/set/delete/incr surface as redis.asyncio
+# --------------------------
+class MemoryBackend:
+    def __init__(self, maxsize=CATALOG_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.data = OrderedDict()   # key -> (expires_at, value)
+        self.counters = {}          # incr() keys (versions); never evicted
+
+    async def get(self, key):
+        if key in self.counters:
+            return self.counters[key]
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at and expires_at < time.monotonic():
+            del self.data[key]
+            return None
+        self.data.move_to_end(key)
+        return value
+
+    async def set(self, key, value, ex=None):
+        self.counters.pop(key, None)
+        expires_at = time.monotonic() + ex if ex else None
+        self.data[key] = (expires_at, value)
+        self.data.move_to_end(key)
+        while len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+            self.counters.pop(key, None)
+
+    async def incr(self, key):
+        value = int(await self.get(key) or 0) + 1
+        self.data.pop(key, None)
+        self.counters[key] = value
+        return value
+
+
+class RedisBackend:
+    # works with redis.asyncio.Redis or any compatible fake (e.g. fakeredis)
+    def __init__(self, client):
+        self.client = client
+
+    async def get(self, key):
+        return await self.client.get(key)
+
+    async def set(self, key, value, ex=None):
+        await self.client.set(key, value, ex=ex)
+
+    async def delete(self, *keys):
+        if keys:
+            await self.client.delete(*keys)
+
+    async def incr(self, key):
+        return await self.client.incr(key)
+
+
+def make_backend(name=CATALOG_CACHE_BACKEND):
+    if name == "redis":
+        import redis.asyncio as redis   # optional dependency
+        return RedisBackend(redis.from_url(REDIS_URL))
+    return MemoryBackend()
+
+
+# --------------------------
+# Catalog cache
+# Values are stored as b'<etag>\n<json body>'; the br/gzip variant of
+# <key> lives at <key>|<encoding> with a '"<hash>-<encoding>"' ETag (or is a
+# copy of the plain entry when the body is too small to compress).
+# --------------------------
+class CatalogCache:
+    def __init__(self, backend, ttl=CATALOG_CACHE_TTL, enabled=CATALOG_CACHE):
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+        # versions in the memory backend are per process and restart at 0,
+        # so version-derived ETags also carry a per-process token
+        self.epoch = "" if isinstance(backend, RedisBackend) else os.urandom(4).hex()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.invalidations = 0
+
+    async def version(self):
+        return int(await self.backend.get(VERSION_KEY) or 0)
+
+    async def list_key(self, **params):
+        params = [
+            (k, sorted(v) if isinstance(v, list) else v)
+            for k, v in sorted(params.items()) if v is not None
+        ]
+        return f"catalog:list:{await self.version()}:{urlencode(params, doseq=True)}"
+
+    def item_key(self, package_id):
+        return f"catalog:item:{package_id}"
+
+    def item_keys(self, package_id):
+        # the entry plus its compressed variants
+        key = self.item_key(package_id)
+        return [key, f"{key}|br", f"{key}|gzip"]
+
+    def make_etag(self, key):
+        epoch = self.epoch
+        if not isinstance(self.backend, RedisBackend):
+            # a worker only sees its own writes: roll over once per ttl so it
+            # stops answering 304 for lists another worker changed
+            epoch += ":%d" % (time.monotonic() // max(self.ttl, 1))
+        return '"%s"' % hashlib.sha1(f"{epoch}:{key}".encode()).hexdigest()
+
+    def list_etag(self, key):
+        # list keys already embed the catalog version
+        return self.make_etag(key)
+
+    async def packages_etag(self, request: Request):
+        # admin listings (any status): valid until the next package write
+        version = int(await self.backend.get(PACKAGES_VERSION_KEY) or 0)
+        return self.make_etag(f"packages:{version}:{request.url.path}?{request.url.query}")
+
+    async def invalidate(self, package_id=None, catalog=True):
+        self.invalidations += 1
+        if package_id is not None:
+            await self.backend.delete(*self.item_keys(package_id))
+        await self.backend.incr(PACKAGES_VERSION_KEY)
+        if catalog:
+            await self.backend.incr(VERSION_KEY)
+
+    async def invalidate_many(self, package_ids, catalog=True):
+        # one backend call for all item keys + at most two version bumps
+        self.invalidations += 1
+        await self.backend.delete(*[k for i in package_ids for k in self.item_keys(i)])
+        await self.backend.incr(PACKAGES_VERSION_KEY)
+        if catalog:
+            await self.backend.incr(VERSION_KEY)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            "not_modified": self.not_modified,
+            "invalidations": self.invalidations,
+        }
+
+    async def respond(self, request: Request, key, build, etag=None):
+        # etag: validator known before the body (list pages), so a repeat
+        # fetch is answered without a cache lookup
+        if_none_match = request.headers.get("if-none-match")
+        if etag is not None and etag_matches(if_none_match, etag):
+            self.not_modified += 1
+            return Response(status_code=304, headers={"ETag": etag, "Vary": "Accept-Encoding"})
+
+        encoding = negotiate(request.headers.get("accept-encoding")) if COMPRESS else None
+        entry = await self.lookup(key, build, etag, encoding)
+
+        etag, body = entry.split(b"\n", 1)
+        etag = etag.decode()
+        headers = {"ETag": etag}
+
+        if etag_matches(if_none_match, etag):
+            self.not_modified += 1
+            headers["Vary"] = "Accept-Encoding"
+            return Response(status_code=304, headers=headers)
+        if encoding and etag.endswith(f'-{encoding}"'):
+            # plain bodies get their Vary from CompressionMiddleware
+            headers["Content-Encoding"] = encoding
+            headers["Vary"] = "Accept-Encoding"
+        return Response(body, media_type="application/json", headers=headers)
+
+    async def lookup(self, key, build, etag, encoding):
+        # read-through: compressed variant, then plain entry, then build
+        variant = f"{key}|{encoding}" if encoding else None
+        if variant and self.enabled:
+            entry = await self.backend.get(variant)
+            if entry is not None:
+                self.hits += 1
+                return entry
+
+        entry = await self.backend.get(key) if self.enabled else None
+        if entry is None:
+            self.misses += 1
+            body = dumps(await build())
+            etag = etag or '"%s"' % hashlib.sha1(body).hexdigest()
+            entry = etag.encode() + b"\n" + body
+            if self.enabled:
+                await self.backend.set(key, entry, ex=self.ttl)
+        else:
+            self.hits += 1
+
+        if variant is None:
+            return entry
+        etag, body = entry.split(b"\n", 1)
+        if len(body) >= COMPRESS_MIN_SIZE:
+            etag = encoded_etag(etag.decode(), encoding).encode()
+            entry = etag + b"\n" + await compress_async(body, encoding)
+        if self.enabled:
+            await self.backend.set(variant, entry, ex=self.ttl)
+        return entry
+
+
+def opaque_tag(etag):
+    # weak comparison: ignore W/ and the content-coding suffix
+    if etag.startswith("W/"):
+        etag = etag[2:]
+    for encoding in ("br", "gzip"):
+        if etag.endswith(f'-{encoding}"'):
+            return etag[:-len(encoding) - 2] + '"'
+    return etag
+
+
+def etag_matches(header, etag):
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    etag = opaque_tag(etag)
+    return any(opaque_tag(c.strip()) == etag for c in header.split(","))
+
+
+catalog_cache = CatalogCache(make_backend())
@@ -0,0 +1,44 @@
+from pymongo.errors import DuplicateKeyError
+from database.repositories import capacity_repo
+
+# --------------------------
+# Per-package, per-date seat counters
+# One document per (package, date): {_id: "<package_id>:<date>", booked: n}
+# The reservation is a single conditional $inc, so concurrent bookings
+# can never push `booked` past the package capacity.
+# --------------------------
+
+
+def capacity_key(package_id, date):
+    return f"{package_id}:{date}"
+
+
+async def reserve(package_id, date, persons, capacity):
+    # returns True when the seats were taken, False when sold out
+    if capacity is None:
+        return True
+    if persons > capacity:
+        return False
+
+    query = {"_id": capacity_key(package_id, date), "booked": {"$lte": capacity - persons}}
+    try:
+        doc = await capacity_repo.find_one_and_update(query, {"$inc": {"booked": persons}}, upsert=True)
+    except DuplicateKeyError:
+        # the counter exists: it is too full, or a concurrent first booking
+        # inserted it after we matched nothing. Mongo does not retry upserts
+        # whose filter is not equality-only, so try once more without upsert.
+        doc = await capacity_repo.find_one_and_update(query, {"$inc": {"booked": persons}})
+    return doc is not None
+
+
+async def release(package_id, date, persons):
+    await capacity_repo.update_one(
+        {"_id": capacity_key(package_id, date)}, {"$inc": {"booked": -persons}}
+    )
+
+
+async def remaining(package_id, date, capacity):
+    if capacity is None:
+        return None
+    doc = await capacity_repo.get_by_id(capacity_key(package_id, date))
+    return capacity - (doc or {}).get("booked", 0)
@@ -0,0 +1,192 @@
+import asyncio
+import gzip
+import os
+import zlib
+from starlette.datastructures import Headers, MutableHeaders
+
+# --------------------------
+# Response compression
+#   COMPRESS=0               -> disabled
+#   COMPRESS_MIN_SIZE        -> bodies smaller than this (bytes) go out as-is
+#   COMPRESS_GZIP_LEVEL      -> 1-9 (default 6)
+#   COMPRESS_BROTLI_QUALITY  -> 0-11 (default 5)
+#
+# Brotli is preferred when the client accepts it and the `brotli` package
+# is installed, gzip otherwise. Responses that already carry a
+# Content-Encoding (the pre-compressed catalog cache entries) pass through
+# untouched. A compressed response's strong ETag gets a "-<encoding>"
+# suffix so each representation has its own validator; etag_matches in
+# utils/cache.py ignores the suffix when comparing If-None-Match.
+#
+# A plain ASGI middleware on Starlette's public Headers API only - no
+# Starlette responder internals, so framework upgrades cannot change how
+# bodies are encoded. Partial (206) responses, file sends and already
+# compressed media types go out untouched.
+# --------------------------
+
+try:
+    import brotli   # optional; gzip is the fallback
+except ImportError:
+    brotli = None
+
+COMPRESS = os.getenv("COMPRESS", "1") == "1"
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+COMPRESS_GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", "6"))
+COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", "5"))
+
+# larger bodies are compressed in a worker thread so the event loop keeps serving
+THREAD_MIN_SIZE = 128 * 1024
+
+# compressing these again only costs CPU
+EXCLUDED_TYPES = (
+    "text/event-stream", "application/grpc", "application/zip", "application/gzip", "application/x-gzip",
+    "image/", "audio/", "video/", "font/woff",
+)
+
+
+def supported_encodings():
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate(accept_encoding):
+    # best encoding the client accepts (q > 0), in server preference order
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip()] = q
+
+    for encoding in supported_encodings():
+        if accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return None
+
+
+def compress(body, encoding):
+    # one-shot compression; gzip with mtime=0 so equal bodies give equal bytes
+    if encoding == "br":
+        return brotli.compress(body, quality=COMPRESS_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=COMPRESS_GZIP_LEVEL, mtime=0)
+
+
+async def compress_async(body, encoding):
+    if len(body) >= THREAD_MIN_SIZE:
+        return await asyncio.to_thread(compress, body, encoding)
+    return compress(body, encoding)
+
+
+def encoded_etag(etag, encoding):
+    # '"abc"' -> '"abc-br"'; weak validators are left alone
+    if not etag or etag.startswith("W/") or not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+class StreamCompressor:
+    # one response body, chunk by chunk; every chunk but the last is
+    # flushed so streamed exports keep flowing to the client
+    def __init__(self, encoding):
+        self.encoding = encoding
+        if encoding == "br":
+            self.obj = brotli.Compressor(quality=COMPRESS_BROTLI_QUALITY)
+        else:
+            self.obj = zlib.compressobj(COMPRESS_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def process(self, body, more_body):
+        if self.encoding == "br":
+            out = self.obj.process(body)
+            return out + (self.obj.flush() if more_body else self.obj.finish())
+        return self.obj.compress(body) + self.obj.flush(zlib.Z_SYNC_FLUSH if more_body else zlib.Z_FINISH)
+
+    async def process_async(self, body, more_body):
+        if len(body) >= THREAD_MIN_SIZE:
+            return await asyncio.to_thread(self.process, body, more_body)
+        return self.process(body, more_body)
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size=COMPRESS_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding"))
+        await self.app(scope, receive, CompressingSend(send, encoding, self.minimum_size))
+
+
+class CompressingSend:
+    # wraps `send` for one response; encoding None still adds Vary
+    def __init__(self, send, encoding, minimum_size):
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start = None           # held until the first body chunk decides
+        self.passthrough = False
+        self.compressor = None
+
+    async def __call__(self, message):
+        kind = message["type"]
+        if kind == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            media_type = headers.get("content-type", "").partition(";")[0].strip().lower()
+            self.passthrough = (
+                "content-encoding" in headers or message["status"] == 206 or media_type.startswith(EXCLUDED_TYPES)
+            )
+            if self.passthrough:
+                await self.send(message)
+            else:
+                self.start = message
+            return
+
+        if self.passthrough or kind not in ("http.response.body", "http.response.pathsend"):
+            return await self.send(message)
+        if self.start is None:
+            # later chunk of a streamed body
+            if self.compressor is not None:
+                message["body"] = await self.compressor.process_async(
+                    message.get("body", b""), message.get("more_body", False)
+                )
+            return await self.send(message)
+
+        start, self.start = self.start, None
+        body, more_body = message.get("body", b""), message.get("more_body", False)
+        if kind == "http.response.pathsend" or (len(body) < self.minimum_size and not more_body):
+            await self.send(start)
+            return await self.send(message)
+
+        headers = MutableHeaders(raw=start["headers"])
+        headers.add_vary_header("Accept-Encoding")
+        if self.encoding:
+            self.compressor = StreamCompressor(self.encoding)
+            message["body"] = await self.compressor.process_async(body, more_body)
+            headers["Content-Encoding"] = self.encoding
+            if more_body or start.get("trailers", False):
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(message["body"]))
+            retag(start, self.encoding)
+        await self.send(start)
+        await self.send(message)
+
+
+def retag(message, encoding):
+    # the responder compressed the body: give a strong ETag its own suffix
+    headers = message["headers"]
+    if not any(n == b"content-encoding" and v == encoding.encode() for n, v in headers):
+        return
+    for i, (name, value) in enumerate(headers):
+        if name == b"etag":
+            etag = value.decode("latin-1")
+            if not etag.endswith(f'-{encoding}"'):
+                headers[i] = (name, encoded_etag(etag, encoding).encode("latin-1"))
+            return
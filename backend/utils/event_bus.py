@@ -0,0 +1,195 @@
+import asyncio
+import logging
+import os
+from collections import defaultdict
+from database.db_connection import MONGO_URI, get_db
+from database.repositories import packages_repo, bookings_repo, users_repo
+from models.event_model import (
+    MODERATION_EVENTS, PackageCreated, PackageUpdated, PackageDeleted, BookingCreated, UserRoleChanged,
+)
+
+logger = logging.getLogger("tripsync.events")
+
+# --------------------------
+# Internal event bus
+#   EVENT_SOURCE          -> local (default) | change_stream
+#   EVENT_DRAIN_TIMEOUT   -> seconds to finish queued events on shutdown
+#   EVENT_STREAM_RETRY    -> seconds between change stream reconnects
+#
+# Routes publish a typed event (models/event_model.py) after a successful
+# write and return; subscribers run on one background task per process,
+# in publish order, so side effects never add to request latency.
+#
+# Subscribers are either:
+#   once        shared side effects (rollups, notifications) - run on the
+#               events published by the process that made the write
+#   per_worker  process-local state (search index) - run on the events a
+#               source reports for every worker's writes
+#
+# The route that makes a write updates its own process's state inline,
+# so reads right after it see it. Other workers learn about the write
+# from the source:
+#   local          none - a single process (tests and the default); tests
+#                  can stand in for a source with deliver()
+#   change_stream  each worker watches packages/bookings/users (replica
+#                  set required; see server.py)
+# --------------------------
+
+EVENT_SOURCE = os.getenv("EVENT_SOURCE", "local")
+EVENT_DRAIN_TIMEOUT = float(os.getenv("EVENT_DRAIN_TIMEOUT", "10"))
+EVENT_STREAM_RETRY = float(os.getenv("EVENT_STREAM_RETRY", "5"))
+
+# who an event is delivered to
+ONCE, PER_WORKER = "once", "per_worker"
+
+
+class EventBus:
+    def __init__(self, source=EVENT_SOURCE):
+        self.source = source
+        self.subscribers = defaultdict(list)   # event class -> [(handler, per_worker)]
+        self.queue = None
+        self.task = None
+        self.stream_task = None
+        self.published = 0
+        self.failures = 0
+
+    def subscribe(self, *event_types, per_worker=False):
+        # decorator for `async def handler(event)`; subscribing to a base
+        # class (e.g. PackagesModerated) also receives its subclasses
+        def register(handler):
+            for event_type in event_types:
+                self.subscribers[event_type].append((handler, per_worker))
+            return handler
+        return register
+
+    def start(self, stream_source=None):
+        if self.task:
+            return
+        self.queue = asyncio.Queue()
+        self.task = asyncio.create_task(self._run())
+        if self.source == "change_stream":
+            if stream_source is None and MONGO_URI.startswith("mongomock://"):
+                logger.warning("change streams need a replica set, using local events")
+            else:
+                self.stream_task = asyncio.create_task((stream_source or ChangeStreamSource()).run(self))
+
+    async def stop(self, drain_timeout=0):
+        if self.stream_task:
+            self.stream_task.cancel()
+            await asyncio.gather(self.stream_task, return_exceptions=True)
+            self.stream_task = None
+        if self.task and drain_timeout:
+            try:
+                await asyncio.wait_for(self.queue.join(), drain_timeout)
+            except asyncio.TimeoutError:
+                logger.warning("event queue not drained, %s events dropped", self.queue.qsize())
+        if self.task:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+        self.task = None
+
+    def publish(self, event):
+        # request path: enqueue and return
+        self.start()
+        self.published += 1
+        self.queue.put_nowait((event, ONCE))
+
+    def deliver(self, event):
+        # from a source that sees every worker's writes
+        self.start()
+        self.queue.put_nowait((event, PER_WORKER))
+
+    async def join(self):
+        # tests: wait until everything published so far has been handled
+        if self.queue is not None:
+            await self.queue.join()
+
+    async def _run(self):
+        while True:
+            event, audience = await self.queue.get()
+            try:
+                await self.dispatch(event, audience)
+            finally:
+                self.queue.task_done()
+
+    async def dispatch(self, event, audience=ONCE):
+        for event_type in type(event).__mro__:
+            for handler, per_worker in self.subscribers.get(event_type, ()):
+                if per_worker != (audience == PER_WORKER):
+                    continue
+                try:
+                    await handler(event)
+                except Exception:
+                    # one failing subscriber must not stop the others
+                    self.failures += 1
+                    logger.exception("%s handler %s failed", type(event).__name__, handler.__name__)
+
+
+# --------------------------
+# Change stream source
+# One database-level stream per worker, filtered server side to the
+# changes that map to events. Events built here only carry what the
+# change reports (no previous status / role).
+# --------------------------
+def change_pipeline():
+    return [{"$match": {"$or": [
+        {"ns.coll": packages_repo.name, "operationType": {"$in": ["insert", "update", "replace", "delete"]}},
+        {"ns.coll": bookings_repo.name, "operationType": "insert"},
+        {"ns.coll": users_repo.name, "operationType": "update",
+         "updateDescription.updatedFields.role": {"$exists": True}},
+    ]}}]
+
+
+def change_events(change):
+    op, collection = change["operationType"], change["ns"]["coll"]
+    doc = change.get("fullDocument")
+    doc_id = str(change["documentKey"]["_id"])
+    fields = change.get("updateDescription", {}).get("updatedFields", {})
+
+    if collection == packages_repo.name:
+        if op == "insert":
+            return [PackageCreated(package=doc)]
+        if op == "delete":
+            return [PackageDeleted(package_id=doc_id)]
+        if doc is None:
+            return []   # deleted before the lookup; the delete follows
+        events = [PackageUpdated(package=doc)]
+        if fields.get("status") in MODERATION_EVENTS:
+            events.append(MODERATION_EVENTS[fields["status"]](package_ids=[doc_id]))
+        return events
+
+    if collection == bookings_repo.name and op == "insert":
+        return [BookingCreated(booking=doc)]
+
+    if collection == users_repo.name and "role" in fields:
+        return [UserRoleChanged(user_id=doc_id, email=(doc or {}).get("email"), role=fields["role"])]
+    return []
+
+
+def watch_database():
+    return get_db().watch(change_pipeline(), full_document="updateLookup")
+
+
+class ChangeStreamSource:
+    def __init__(self, watch=watch_database, retry_delay=EVENT_STREAM_RETRY):
+        self.watch = watch      # returns an async context manager / iterator of changes
+        self.retry_delay = retry_delay
+
+    async def run(self, bus):
+        while True:
+            try:
+                # the driver resumes by itself after transient errors;
+                # anything that gets here restarts the stream from now
+                async with self.watch() as stream:
+                    logger.info("change stream open")
+                    async for change in stream:
+                        for event in change_events(change):
+                            bus.deliver(event)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("change stream unavailable (%s), retrying in %ss", exc, self.retry_delay)
+            await asyncio.sleep(self.retry_delay)
+
+
+event_bus = EventBus()
@@ -0,0 +1,78 @@
+import logging
+from database.rollups import record_submission, record_submissions, record_moderation
+from models.event_model import (
+    PackageCreated, PackagesCreated, PackageUpdated, PackagesModerated, PackageDeleted, BookingCreated, UserRoleChanged,
+)
+from utils.event_bus import event_bus
+from utils.search_index import search_index
+
+# --------------------------
+# Event subscribers (utils/event_bus.py)
+# Imported once by app.py to register them.
+# Catalog cache invalidation and this process's search index update stay
+# inline in the routes: the next read (and its ETag) must already see the
+# write.
+# --------------------------
+
+notify_logger = logging.getLogger("tripsync.notifications")
+
+
+# --------------------------
+# Search index (per worker)
+# Writes made by other workers, as reported by the change stream.
+# --------------------------
+@event_bus.subscribe(PackageCreated, PackageUpdated, per_worker=True)
+async def index_package(event):
+    search_index.add(event.package)
+
+
+@event_bus.subscribe(PackagesModerated, per_worker=True)
+async def index_moderation(event):
+    for package_id in event.package_ids:
+        search_index.set_status(package_id, event.status)
+
+
+@event_bus.subscribe(PackageDeleted, per_worker=True)
+async def unindex_package(event):
+    search_index.remove(event.package_id)
+
+
+# --------------------------
+# Analytics rollups (once)
+# --------------------------
+@event_bus.subscribe(PackageCreated)
+async def count_submission(event):
+    await record_submission(event.package)
+
+
+@event_bus.subscribe(PackagesCreated)
+async def count_submissions(event):
+    await record_submissions(event.packages)
+
+
+@event_bus.subscribe(PackagesModerated)
+async def count_moderation(event):
+    for old_status, count in event.previous.items():
+        await record_moderation(old_status, event.status, count)
+
+
+# --------------------------
+# Notifications (once)
+# No delivery channel yet - messages go to the tripsync.notifications
+# logger, where a mail/push sender can pick them up.
+# --------------------------
+@event_bus.subscribe(BookingCreated)
+async def notify_booking(event):
+    booking = event.booking
+    if booking.get("package_owner"):
+        notify_logger.info(
+            "to %s: new booking for '%s' on %s (%s persons)",
+            booking["package_owner"], booking.get("package_title"), booking.get("date"), booking.get("persons"),
+        )
+
+
+@event_bus.subscribe(UserRoleChanged)
+async def notify_role_change(event):
+    if event.email:
+        notify_logger.info("to %s: your role is now %s", event.email, event.role)
+
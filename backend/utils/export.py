@@ -0,0 +1,84 @@
+import csv
+import io
+from datetime import datetime
+from bson import ObjectId
+from fastapi.responses import StreamingResponse
+from utils.serialization import dumps
+
+# --------------------------
+# Streaming NDJSON / CSV export
+# Documents are pulled from a Mongo cursor and written out in small
+# chunks, so memory stays flat regardless of collection size.
+# --------------------------
+
+CHUNK_ROWS = 500
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return "; ".join(str(v) for v in value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def id_range(date_from=None, date_to=None):
+    # ObjectIds embed their creation time, so a date range is an _id range
+    query = {}
+    if date_from:
+        query["$gte"] = ObjectId.from_datetime(date_from)
+    if date_to:
+        query["$lt"] = ObjectId.from_datetime(date_to)
+    return {"_id": query} if query else {}
+
+
+async def ndjson_rows(docs, serialize):
+    lines = []
+    async for doc in docs:
+        lines.append(dumps(serialize(doc)))
+        if len(lines) >= CHUNK_ROWS:
+            yield b"\n".join(lines) + b"\n"
+            lines = []
+    if lines:
+        yield b"\n".join(lines) + b"\n"
+
+
+async def csv_rows(docs, serialize, columns):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(columns)
+
+    rows = 0
+    async for doc in docs:
+        item = serialize(doc)
+        writer.writerow([_csv_value(item.get(c)) for c in columns])
+        rows += 1
+        if rows >= CHUNK_ROWS:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate(0)
+            rows = 0
+
+    if buf.tell():
+        yield buf.getvalue()
+
+
+def export_response(docs, name, fmt, serialize, columns):
+    if fmt == "csv":
+        body = csv_rows(docs, serialize, columns)
+    else:
+        body = ndjson_rows(docs, serialize)
+
+    stamp = datetime.utcnow().strftime("%Y%m%d")
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}-{stamp}.{fmt}"'},
+    )
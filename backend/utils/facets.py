@@ -0,0 +1,111 @@
+from fastapi import HTTPException
+
+# --------------------------
+# Catalog filters + facet counts
+#   ?category=a&category=b   -> multi-value (any of)
+#   ?location=Goa, India     -> multi-value, exact stored location
+#   ?min_price / max_price, min_days / max_days, min_rating / max_rating
+#   ?facets=true             -> counts per category/location/price/days/rating
+#
+# Facet counts are disjunctive: each facet ignores its own filter, so the
+# UI can show how many results picking another value would give.
+# All facets come back from one $facet aggregation.
+# --------------------------
+
+PRICE_BUCKETS = [0, 10000, 25000, 50000, 100000, 200000]
+RATING_BUCKETS = [0, 3, 4, 4.5, 5.01]
+MAX_LOCATION_FACETS = 50
+
+RANGE_FIELDS = ("price", "days", "rating")
+
+
+def build_filters(category=None, location=None, ranges=None):
+    # returns {field: condition}; kept per field so facets can drop their own
+    filters = {}
+    if category:
+        filters["category"] = category[0] if len(category) == 1 else {"$in": category}
+    if location:
+        filters["location"] = location[0] if len(location) == 1 else {"$in": location}
+
+    for field, (low, high) in (ranges or {}).items():
+        if low is not None and high is not None and low > high:
+            raise HTTPException(400, f"min_{field} is greater than max_{field}")
+        cond = {}
+        if low is not None:
+            cond["$gte"] = low
+        if high is not None:
+            cond["$lte"] = high
+        if cond:
+            filters[field] = cond
+    return filters
+
+
+def _without(filters, field):
+    return {k: v for k, v in filters.items() if k != field}
+
+
+def _bucket(field, boundaries):
+    return {"$bucket": {
+        "groupBy": f"${field}",
+        "boundaries": boundaries,
+        "default": "other",
+        "output": {"count": {"$sum": 1}},
+    }}
+
+
+def _count_by(field, limit=None):
+    stages = [
+        {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+        {"$sort": {"count": -1, "_id": 1}},
+    ]
+    if limit:
+        stages.append({"$limit": limit})
+    return stages
+
+
+def facet_pipeline(base, filters):
+    # price/rating buckets only see documents that have the field
+    facet = {
+        "category": [{"$match": _without(filters, "category")}] + _count_by("category"),
+        "location": [{"$match": _without(filters, "location")}] + _count_by("location", MAX_LOCATION_FACETS),
+        "days": [{"$match": _without(filters, "days")}] + _count_by("days"),
+        "price": [
+            {"$match": {**_without(filters, "price"), "price": {"$type": "number"}}},
+            _bucket("price", PRICE_BUCKETS),
+        ],
+        "rating": [
+            {"$match": {**_without(filters, "rating"), "rating": {"$type": "number"}}},
+            _bucket("rating", RATING_BUCKETS),
+        ],
+        "total": [{"$match": filters}, {"$count": "count"}],
+    }
+    return [{"$match": base}, {"$facet": facet}]
+
+
+def _label_buckets(rows, boundaries):
+    upper = dict(zip(boundaries, boundaries[1:]))
+    out = []
+    for row in rows:
+        low = row["_id"]
+        if low == "other":
+            out.append({"min": boundaries[-1], "max": None, "count": row["count"]})
+        else:
+            out.append({"min": low, "max": upper[low], "count": row["count"]})
+    return out
+
+
+def shape_facets(result):
+    facets = result[0] if result else {}
+    total = facets.get("total") or [{"count": 0}]
+    return {
+        "total": total[0]["count"],
+        "category": [{"value": r["_id"], "count": r["count"]} for r in facets.get("category", [])],
+        "location": [{"value": r["_id"], "count": r["count"]} for r in facets.get("location", [])],
+        "days": [{"value": r["_id"], "count": r["count"]} for r in facets.get("days", [])],
+        "price": _label_buckets(facets.get("price", []), PRICE_BUCKETS),
+        "rating": _label_buckets(facets.get("rating", []), RATING_BUCKETS),
+    }
+
+
+async def facet_counts(repo, base, filters):
+    return shape_facets(await repo.aggregate(facet_pipeline(base, filters)))
@@ -0,0 +1,65 @@
+# --------------------------
+# Offline gazetteer
+# Fallback coordinates for package geocoding when the geocode cache has
+# no entry and OpenTripMap is unavailable or not configured.
+# Keys are lower-case place names; values are (lon, lat) - GeoJSON order.
+# Covers the seeded catalog and common Indian destinations.
+# --------------------------
+
+PLACES = {
+    # India
+    "goa": (74.124, 15.299),
+    "jaipur": (75.787, 26.912),
+    "kashmir": (74.797, 34.084),
+    "srinagar": (74.797, 34.084),
+    "kochi": (76.267, 9.931),
+    "kerala": (76.271, 10.851),
+    "munnar": (77.060, 10.089),
+    "manali": (77.189, 32.240),
+    "shimla": (77.173, 31.105),
+    "leh": (77.577, 34.152),
+    "ladakh": (77.577, 34.152),
+    "rishikesh": (78.267, 30.087),
+    "udaipur": (73.712, 24.585),
+    "agra": (78.008, 27.176),
+    "varanasi": (82.973, 25.317),
+    "darjeeling": (88.263, 27.036),
+    "andaman": (92.727, 11.623),
+    "ooty": (76.695, 11.410),
+    "delhi": (77.209, 28.614),
+    "new delhi": (77.209, 28.614),
+    "mumbai": (72.878, 19.076),
+    "bengaluru": (77.595, 12.972),
+    "bangalore": (77.595, 12.972),
+    "chennai": (80.271, 13.083),
+    "kolkata": (88.364, 22.573),
+    "hyderabad": (78.487, 17.385),
+    "pune": (73.857, 18.520),
+
+    # International
+    "bali": (115.189, -8.409),
+    "ubud": (115.263, -8.507),
+    "barcelona": (2.173, 41.385),
+    "cairo": (31.236, 30.044),
+    "cusco": (-71.967, -13.532),
+    "dubai": (55.271, 25.205),
+    "dubrovnik": (18.094, 42.651),
+    "greek islands": (25.376, 36.393),
+    "santorini": (25.432, 36.393),
+    "hanoi": (105.834, 21.028),
+    "vietnam": (108.277, 14.058),
+    "interlaken": (7.864, 46.686),
+    "london": (-0.128, 51.507),
+    "maldives": (73.221, 3.203),
+    "marrakech": (-7.981, 31.629),
+    "new york": (-74.006, 40.713),
+    "oslo": (10.752, 59.914),
+    "paris": (2.352, 48.857),
+    "phuket": (98.339, 7.880),
+    "reykjavik": (-21.817, 64.126),
+    "rome": (12.496, 41.903),
+    "singapore": (103.820, 1.352),
+    "sydney": (151.209, -33.869),
+    "tokyo": (139.650, 35.676),
+    "vancouver": (-123.121, 49.283),
+}
@@ -0,0 +1,130 @@
+import asyncio
+import os
+from datetime import datetime
+from database.repositories import geocodes_repo
+from utils.cache import MemoryBackend
+from utils.gazetteer import PLACES
+from utils.http_client import external_client, UpstreamUnavailable
+
+# --------------------------
+# Location -> GeoJSON point
+# Lookup order:
+#   1. in-process memo
+#   2. geocodes collection (_id = normalized location)
+#   3. offline gazetteer (full name, then its comma-separated parts)
+#   4. OpenTripMap geoname, when OPENTRIPMAP_KEY is set
+# Hits from 3/4 are written back to the geocodes collection, so every
+# location is resolved remotely at most once. Definite "not found"
+# answers are remembered for MISS_TTL; an unreachable upstream raises
+# UpstreamUnavailable and is not remembered.
+# --------------------------
+
+OPENTRIPMAP_KEY = os.getenv("OPENTRIPMAP_KEY", "")
+OPENTRIPMAP_URL = os.getenv("OPENTRIPMAP_URL", "https://api.opentripmap.com")
+GEOCODE_TTL = 7 * 24 * 3600
+MISS_TTL = 10 * 60
+GEOCODE_MEMO_SIZE = int(os.getenv("GEOCODE_MEMO_SIZE", "10000"))
+GEOCODE_CONCURRENCY = int(os.getenv("GEOCODE_CONCURRENCY", "20"))
+
+# keyed by user input (?city=), so both are bounded LRUs
+_memo = MemoryBackend(maxsize=GEOCODE_MEMO_SIZE)      # normalized location -> point
+_misses = MemoryBackend(maxsize=GEOCODE_MEMO_SIZE)    # normalized location -> True, for MISS_TTL
+
+
+def normalize(location):
+    return " ".join(str(location or "").lower().split())
+
+
+def point(lon, lat):
+    return {"type": "Point", "coordinates": [lon, lat]}
+
+
+def offline_lookup(key):
+    if key in PLACES:
+        return point(*PLACES[key])
+    for part in key.split(","):
+        part = part.strip()
+        if part in PLACES:
+            return point(*PLACES[part])
+    return None
+
+
+async def remote_lookup(location):
+    # UpstreamUnavailable propagates: an outage is not a "not found"
+    _, geo = await external_client.get_json(
+        f"{OPENTRIPMAP_URL}/0.1/en/places/geoname",
+        {"name": location, "apikey": OPENTRIPMAP_KEY},
+        cache_key=f"geoname:{normalize(location)}", ttl=GEOCODE_TTL,
+    )
+    if not isinstance(geo, dict) or "lat" not in geo:
+        return None
+    return point(geo["lon"], geo["lat"])
+
+
+async def geocode(location):
+    key = normalize(location)
+    if not key:
+        return None
+    geo = await _memo.get(key)
+    if geo is not None:
+        return geo
+    if await _misses.get(key):
+        return None
+
+    doc = await geocodes_repo.get_by_id(key)
+    if doc:
+        await _memo.set(key, doc["geo"])
+        return doc["geo"]
+
+    geo, source = offline_lookup(key), "gazetteer"
+    if geo is None and OPENTRIPMAP_KEY:
+        geo, source = await remote_lookup(location), "opentripmap"
+
+    if geo is not None:
+        await geocodes_repo.update_one(
+            {"_id": key},
+            {"$set": {"geo": geo, "source": source, "updated_at": datetime.utcnow()}},
+            upsert=True,
+        )
+        await _memo.set(key, geo)
+    else:
+        # retried after MISS_TTL, so a later remote lookup can still succeed
+        await _misses.set(key, True, ex=MISS_TTL)
+    return geo
+
+
+async def locate(pkg):
+    # sets pkg["geo"]; unknown locations get no point (skipped by the 2dsphere index).
+    # A package write never fails because the geocoder is down - the point
+    # is filled in later by the backfill_package_geo migration.
+    try:
+        geo = await geocode(pkg.get("location"))
+    except UpstreamUnavailable:
+        geo = None
+    if geo is not None:
+        pkg["geo"] = geo
+    else:
+        pkg.pop("geo", None)
+    return geo
+
+
+async def locate_many(pkgs):
+    # bulk writes: geocode each distinct location once, concurrently
+    # (at most GEOCODE_CONCURRENCY lookups in flight), then set the points
+    limit = asyncio.Semaphore(GEOCODE_CONCURRENCY)
+
+    async def lookup(key):
+        async with limit:
+            try:
+                return await geocode(key)
+            except UpstreamUnavailable:
+                return None
+
+    keys = list({normalize(p.get("location")) for p in pkgs})
+    found = dict(zip(keys, await asyncio.gather(*[lookup(k) for k in keys])))
+    for pkg in pkgs:
+        geo = found[normalize(pkg.get("location"))]
+        if geo is not None:
+            pkg["geo"] = geo
+        else:
+            pkg.pop("geo", None)
@@ -0,0 +1,71 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from passlib.context import CryptContext
+from utils.metrics import HASH_LATENCY, observe
+
+# --------------------------
+# Password hashing off the event loop
+# argon2 releases the GIL, so a small dedicated thread pool gives real
+# parallelism without starving the default threadpool.
+#   HASH_WORKERS      -> concurrent hash/verify operations
+#   HASH_QUEUE_LIMIT  -> extra operations allowed to wait for a worker;
+#                        beyond that callers get HashingOverloaded
+# --------------------------
+
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+HASH_QUEUE_LIMIT = int(os.getenv("HASH_QUEUE_LIMIT", "64"))
+
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto"
+)
+
+
+class HashingOverloaded(Exception):
+    pass
+
+
+class HashingPool:
+    def __init__(self, context, workers=HASH_WORKERS, queue_limit=HASH_QUEUE_LIMIT):
+        self.context = context
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.pending = 0
+        self.rejected = 0
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="argon2")
+
+    async def run(self, fn, *args):
+        # only touched from the event loop thread, so a plain counter is safe
+        if self.pending >= self.workers + self.queue_limit:
+            self.rejected += 1
+            raise HashingOverloaded()
+
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password):
+        start = time.perf_counter()
+        try:
+            return await self.run(self.context.hash, password)
+        finally:
+            observe(HASH_LATENCY, start, "hash")
+
+    async def verify_and_update(self, password, hashed):
+        # returns (valid, new_hash); new_hash is set when the stored hash
+        # was made with outdated CryptContext parameters
+        start = time.perf_counter()
+        try:
+            return await self.run(self.context.verify_and_update, password, hashed)
+        finally:
+            observe(HASH_LATENCY, start, "verify")
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
+
+
+hashing_pool = HashingPool(pwd_context)
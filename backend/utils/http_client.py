@@ -0,0 +1,157 @@
+import asyncio
+import os
+import time
+import httpx
+from utils.cache import MemoryBackend
+from utils.metrics import EXTERNAL_LATENCY, observe
+
+# --------------------------
+# Shared async HTTP client for third-party APIs
+#   - one pooled httpx.AsyncClient per process (keep-alive reuse)
+#   - per-call timeouts, retries with backoff for transport errors / 5xx
+#   - TTL cache for successful JSON responses
+#   - request coalescing: concurrent identical lookups share one call
+#   - per-host circuit breaker; half-open lets a single probe through
+# --------------------------
+
+HTTP_TIMEOUT = float(os.getenv("EXTERNAL_HTTP_TIMEOUT", "5"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("EXTERNAL_HTTP_MAX_CONNECTIONS", "100"))
+HTTP_RETRIES = int(os.getenv("EXTERNAL_HTTP_RETRIES", "1"))
+HTTP_RETRY_BACKOFF = float(os.getenv("EXTERNAL_HTTP_RETRY_BACKOFF", "0.1"))
+BREAKER_THRESHOLD = int(os.getenv("EXTERNAL_BREAKER_THRESHOLD", "5"))
+BREAKER_RESET = float(os.getenv("EXTERNAL_BREAKER_RESET", "30"))
+
+
+class UpstreamUnavailable(Exception):
+    pass
+
+
+class CircuitBreaker:
+    def __init__(self, threshold=BREAKER_THRESHOLD, reset_after=BREAKER_RESET):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def allow(self):
+        if self.opened_at is None:
+            return True
+        if self.probing or time.monotonic() - self.opened_at < self.reset_after:
+            return False
+        # half-open: this caller is the one probe; the rest are rejected
+        # until it records its outcome
+        self.probing = True
+        return True
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.probing or self.failures >= self.threshold:
+            # a failed probe re-opens for another full cool-down
+            self.opened_at = time.monotonic()
+        self.probing = False
+
+
+class ExternalClient:
+    def __init__(
+        self, timeout=HTTP_TIMEOUT, max_connections=HTTP_MAX_CONNECTIONS, retries=HTTP_RETRIES,
+        retry_backoff=HTTP_RETRY_BACKOFF, breaker_threshold=BREAKER_THRESHOLD, breaker_reset=BREAKER_RESET,
+    ):
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset = breaker_reset
+        self.cache = MemoryBackend(maxsize=10_000)
+        self.breakers = {}
+        self.inflight = {}
+        self._client = None
+
+    @property
+    def client(self):
+        # created lazily so it binds to the running event loop
+        if self._client is None:
+            limits = httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+            )
+            self._client = httpx.AsyncClient(timeout=self.timeout, limits=limits)
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def breaker(self, url):
+        host = httpx.URL(url).host
+        if host not in self.breakers:
+            self.breakers[host] = CircuitBreaker(self.breaker_threshold, self.breaker_reset)
+        return self.breakers[host]
+
+    async def get_json(self, url, params=None, cache_key=None, ttl=None, timeout=None):
+        # returns (status_code, json); only 200 responses are cached
+        if cache_key:
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                return 200, cached
+
+        key = cache_key or (url, tuple(sorted((params or {}).items())))
+        task = self.inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(url, params, cache_key, ttl, timeout))
+            self.inflight[key] = task
+            task.add_done_callback(lambda _: self.inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _fetch(self, url, params, cache_key, ttl, timeout):
+        breaker = self.breaker(url)
+        if not breaker.allow():
+            raise UpstreamUnavailable(f"circuit open for {httpx.URL(url).host}")
+
+        # one breaker outcome per call, whatever ends it (a probe must
+        # always report back)
+        try:
+            res = await self._get(url, params, timeout)
+        except BaseException:
+            breaker.record_failure()
+            raise
+        breaker.record_success()
+
+        try:
+            data = res.json()
+        except ValueError:
+            data = None
+
+        if res.status_code == 200 and cache_key and ttl:
+            await self.cache.set(cache_key, data, ex=ttl)
+        return res.status_code, data
+
+    async def _get(self, url, params, timeout):
+        # GETs are idempotent: retry transport errors and 5xx with backoff
+        host = httpx.URL(url).host
+        for attempt in range(self.retries + 1):
+            if attempt:
+                await asyncio.sleep(self.retry_backoff * 2 ** (attempt - 1))
+            start = time.perf_counter()
+            try:
+                res = await self.client.get(url, params=params, timeout=timeout or self.timeout)
+            except httpx.HTTPError as exc:
+                observe(EXTERNAL_LATENCY, start, host, "error")
+                error = UpstreamUnavailable(str(exc) or type(exc).__name__)
+                error.__cause__ = exc
+                continue
+            observe(EXTERNAL_LATENCY, start, host, res.status_code)
+            if res.status_code < 500:
+                return res
+            error = UpstreamUnavailable(f"upstream returned {res.status_code}")
+        raise error
+
+
+external_client = ExternalClient()
@@ -0,0 +1,77 @@
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+from pymongo.errors import DuplicateKeyError
+from database.repositories import idempotency_repo
+
+# --------------------------
+# Idempotency-Key support for unsafe POSTs
+# The first request with a key claims it (unique _id); retries with the
+# same key replay the stored response instead of running twice.
+# Keys are scoped per user and expire via a TTL index after a day.
+# A claim is a lease: a key left in_progress longer than
+# IDEMPOTENCY_LEASE_SECONDS (its worker died mid-request) is taken over
+# by the next retry instead of answering 409 until it expires.
+# --------------------------
+
+IDEMPOTENCY_LEASE_SECONDS = int(os.getenv("IDEMPOTENCY_LEASE_SECONDS", "60"))
+
+
+def request_fingerprint(body: dict):
+    raw = json.dumps(body, sort_keys=True, default=str).encode()
+    return hashlib.sha256(raw).hexdigest()
+
+
+def scoped_key(user_email, key):
+    return f"{user_email}:{key}"
+
+
+async def begin(user_email, key, body):
+    # returns the stored response for a replay, None for a fresh request
+    _id = scoped_key(user_email, key)
+    fingerprint = request_fingerprint(body)
+
+    now = datetime.utcnow()
+    try:
+        await idempotency_repo.insert_one({
+            "_id": _id,
+            "fingerprint": fingerprint,
+            "state": "in_progress",
+            "created_at": now,
+            "claimed_at": now,
+        })
+        return None
+    except DuplicateKeyError:
+        pass
+
+    existing = await idempotency_repo.get_by_id(_id)
+    if existing is None:
+        # expired between insert and read - treat as fresh
+        return await begin(user_email, key, body)
+    if existing["fingerprint"] != fingerprint:
+        raise HTTPException(422, "Idempotency-Key was already used with a different request")
+    if existing["state"] != "done":
+        # take over an abandoned claim; only one retry wins the update
+        cutoff = now - timedelta(seconds=IDEMPOTENCY_LEASE_SECONDS)
+        taken = await idempotency_repo.find_one_and_update(
+            {"_id": _id, "state": "in_progress", "$or": [{"claimed_at": {"$lt": cutoff}}, {"claimed_at": None}]},
+            {"$set": {"claimed_at": now}},
+        )
+        if taken is None:
+            raise HTTPException(409, "A request with this Idempotency-Key is still in progress")
+        return None
+    return existing["response"]
+
+
+async def complete(user_email, key, response):
+    await idempotency_repo.update_one(
+        {"_id": scoped_key(user_email, key)},
+        {"$set": {"state": "done", "response": response}},
+    )
+
+
+async def abort(user_email, key):
+    # failed requests release the key so the client can retry
+    await idempotency_repo.delete_one({"_id": scoped_key(user_email, key)})
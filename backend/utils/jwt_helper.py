@@ -1,10 +1,15 @@
+import hashlib
 import os
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from jose import jwt
+from utils.metrics import JWT_LATENCY, timed
 
 JWT_SECRET = os.getenv("JWT_SECRET", "super_secret_change_me")
 JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "1440"))
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "10000"))
 
 def create_access_token(data: dict, expires_delta=ACCESS_TOKEN_EXPIRE_MINUTES):
     to_encode = data.copy()
@@ -13,8 +18,62 @@ def create_access_token(data: dict, expires_delta=ACCESS_TOKEN_EXPIRE_MINUTES):
     encoded = jwt.encode(to_encode, JWT_SECRET, algorithm=JWT_ALGORITHM)
     return encoded
 
+@timed(JWT_LATENCY)
 def decode_token(token: str):
     try:
         return jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
     except:
         return None
+
+
+# --------------------------
+# Verified-token cache
+# Bounded LRU keyed by sha256(token). Entries are dropped once the
+# token's own `exp` has passed, so expiry is still enforced.
+# --------------------------
+class TokenCache:
+    def __init__(self, maxsize=JWT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()   # digest -> (exp, claims)
+        self.hits = 0
+        self.misses = 0
+        self.decode_seconds = 0.0
+
+    def verify(self, token: str):
+        key = hashlib.sha256(token.encode()).digest()
+        entry = self.entries.get(key)
+        if entry is not None:
+            exp, claims = entry
+            if exp is None or exp > time.time():
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return dict(claims)
+            del self.entries[key]
+
+        self.misses += 1
+        start = time.perf_counter()
+        claims = decode_token(token)
+        self.decode_seconds += time.perf_counter() - start
+
+        # invalid tokens are not cached - they would only crowd out good ones
+        if claims:
+            self.entries[key] = (claims.get("exp"), claims)
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+            claims = dict(claims)
+        return claims
+
+    def stats(self):
+        return {
+            "size": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "decode_seconds_total": round(self.decode_seconds, 6),
+            "decode_avg_us": round(self.decode_seconds / self.misses * 1e6, 2) if self.misses else 0.0,
+        }
+
+
+token_cache = TokenCache()
+
+def verify_token(token: str):
+    return token_cache.verify(token)
@@ -0,0 +1,239 @@
+import bisect
+import functools
+import os
+import time
+from fastapi import Request, Response
+from starlette.routing import Match, Route
+
+# --------------------------
+# Prometheus-style metrics (text exposition format, no client library)
+#   METRICS=0        -> disabled: no middleware, no /metrics, hooks are no-ops
+#   METRICS_TOKEN    -> if set, /metrics requires "Authorization: Bearer <token>"
+#
+# Exposed:
+#   http_requests_total{method,route,status}
+#   http_request_duration_seconds{method,route}      (histogram)
+#   http_requests_in_flight
+#   db_operation_duration_seconds{collection,op}     (histogram)
+#   password_hash_duration_seconds{op}               (histogram)
+#   jwt_decode_duration_seconds                      (histogram)
+#   external_http_duration_seconds{host,outcome}     (histogram)
+#   rate_limited_total{group}
+#   + gauges read from existing counters (caches, hashing pool, payments)
+#
+# Routes are labelled by their path template, never the raw URL, so
+# label cardinality stays bounded.
+# --------------------------
+
+METRICS = os.getenv("METRICS", "1") == "1"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(
+        '%s="%s"' % (n, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for n, v in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        self.name, self.help, self.labels = name, help, labels
+        self.values = {}
+
+    def inc(self, *label_values, amount=1):
+        self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def samples(self):
+        for label_values, value in self.values.items():
+            yield self.name, _labels(self.labels, label_values), value
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *label_values, amount=1):
+        self.inc(*label_values, amount=-amount)
+
+    def set(self, value, *label_values):
+        self.values[label_values] = value
+
+
+class FuncMetric:
+    # value read at scrape time from counters the app already keeps
+    def __init__(self, name, help, fn, kind="gauge"):
+        self.name, self.help, self.fn, self.kind = name, help, fn, kind
+        self.labels = ()
+
+    def samples(self):
+        yield self.name, "", self.fn()
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.labels = name, help, labels
+        self.buckets = tuple(buckets)
+        self.values = {}   # label values -> [per-bucket counts..., +Inf count, sum]
+
+    def observe(self, value, *label_values):
+        series = self.values.get(label_values)
+        if series is None:
+            series = self.values[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def samples(self):
+        for label_values, series in self.values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series):
+                cumulative += count
+                yield (self.name + "_bucket",
+                       _labels(self.labels + ("le",), label_values + (bound,)), cumulative)
+            yield self.name + "_sum", _labels(self.labels, label_values), series[-1]
+            yield self.name + "_count", _labels(self.labels, label_values), cumulative
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {value}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+HTTP_REQUESTS = registry.register(Counter(
+    "http_requests_total", "HTTP requests by route and status", ("method", "route", "status")))
+HTTP_LATENCY = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "route")))
+HTTP_IN_FLIGHT = registry.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served"))
+DB_LATENCY = registry.register(Histogram(
+    "db_operation_duration_seconds", "MongoDB call latency", ("collection", "op")))
+HASH_LATENCY = registry.register(Histogram(
+    "password_hash_duration_seconds", "argon2 hash/verify latency incl. queueing", ("op",),
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)))
+JWT_LATENCY = registry.register(Histogram(
+    "jwt_decode_duration_seconds", "JWT signature verification latency",
+    buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.005)))
+EXTERNAL_LATENCY = registry.register(Histogram(
+    "external_http_duration_seconds", "Third-party API call latency", ("host", "outcome")))
+RATE_LIMITED = registry.register(Counter(
+    "rate_limited_total", "Requests rejected with 429 by route group", ("group",)))
+
+
+# --------------------------
+# Timing hooks
+# With METRICS=0 the decorators return the function unchanged.
+# --------------------------
+def timed(histogram, *label_values):
+    def wrap(fn):
+        if not METRICS:
+            return fn
+
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start, *label_values)
+        return inner
+    return wrap
+
+
+def timed_db(op):
+    # for Repository methods: labels come from the instance's collection
+    def wrap(fn):
+        if not METRICS:
+            return fn
+
+        @functools.wraps(fn)
+        async def inner(self, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await fn(self, *args, **kwargs)
+            finally:
+                DB_LATENCY.observe(time.perf_counter() - start, self.name, op)
+        return inner
+    return wrap
+
+
+def observe(histogram, start, *label_values):
+    if METRICS:
+        histogram.observe(time.perf_counter() - start, *label_values)
+
+
+# --------------------------
+# ASGI middleware
+# Plain ASGI (not BaseHTTPMiddleware) to keep per-request overhead small.
+# --------------------------
+def route_template(scope):
+    # FastAPI >= 0.140 keeps included routers nested: scope["route"].path
+    # is relative, the prefixed template is on the effective route context
+    # (an internal key - fastapi is pinned in requirements.txt)
+    ctx = scope.get("fastapi", {}).get("effective_route_context")
+    path = getattr(ctx, "path", None)
+    if path:
+        return path
+    # otherwise a matching top-level route; never the raw request path,
+    # which would give the label one value per URL
+    for route in getattr(scope.get("app"), "routes", ()):
+        if isinstance(route, Route) and route.matches(scope)[0] == Match.FULL:
+            return route.path
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_IN_FLIGHT.dec()
+            path = route_template(scope)
+            method = scope["method"]
+            HTTP_LATENCY.observe(elapsed, method, path)
+            HTTP_REQUESTS.inc(method, path, status[0])
+
+
+async def metrics_endpoint(request: Request):
+    if METRICS_TOKEN and request.headers.get("authorization") != f"Bearer {METRICS_TOKEN}":
+        return Response(status_code=401)
+    return Response(registry.render(), media_type=CONTENT_TYPE)
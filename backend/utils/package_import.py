@@ -0,0 +1,222 @@
+import csv
+import json
+import os
+import time
+from datetime import datetime
+from pydantic import ValidationError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from database.repositories import packages_repo
+from models.package_model import PackageCreate
+from utils.geocoding import locate_many
+
+# --------------------------
+# Bulk package import / upsert
+# Rows come from an NDJSON or CSV byte stream, are validated against
+# PackageCreate in batches and written with one unordered bulk_write per
+# batch. Each row is upserted on its natural key, so re-importing a
+# catalog updates packages in place instead of duplicating them.
+# Imported packages also carry import_key (the natural key as one string,
+# unique index): when two imports of the same row race, the losing insert
+# fails on it and the row is reported as skipped.
+# Locations are geocoded once per distinct value per batch, concurrently.
+#   IMPORT_BATCH_SIZE   -> rows per bulk_write (default 1000)
+#
+# CSV: first line is the header; list fields are "|" separated and
+# quoted values may not contain newlines.
+# --------------------------
+
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+MAX_REPORTED_ERRORS = 1000
+DUPLICATE_KEY = 11000
+
+NATURAL_KEY = ("created_by", "title", "location")
+LIST_FIELDS = ("offers", "inclusions", "highlights", "itinerary", "gallery")
+FORMATS = ("ndjson", "csv")
+
+
+# --------------------------
+# Parsing
+# Both parsers yield (row_number, row_dict, error) from async byte chunks
+# --------------------------
+async def iter_lines(chunks):
+    buf = b""
+    async for chunk in chunks:
+        buf += chunk
+        *lines, buf = buf.split(b"\n")
+        for line in lines:
+            yield line
+    if buf:
+        yield buf
+
+
+async def ndjson_rows(chunks):
+    row_no = 0
+    async for line in iter_lines(chunks):
+        row_no += 1
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield row_no, None, f"invalid JSON: {exc}"
+            continue
+        if not isinstance(row, dict):
+            yield row_no, None, "row must be a JSON object"
+            continue
+        yield row_no, row, None
+
+
+async def csv_rows(chunks):
+    header, row_no = None, 0
+    async for line in iter_lines(chunks):
+        row_no += 1
+        text = line.decode("utf-8-sig").rstrip("\r")
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [h.strip() for h in values]
+            continue
+        if len(values) > len(header):
+            yield row_no, None, f"expected {len(header)} columns, got {len(values)}"
+            continue
+
+        row = {}
+        for name, value in zip(header, values):
+            if value == "":
+                continue   # empty cell -> model default
+            if name in LIST_FIELDS:
+                value = [v.strip() for v in value.split("|") if v.strip()]
+            row[name] = value
+        yield row_no, row, None
+
+
+def parse_rows(chunks, fmt):
+    return csv_rows(chunks) if fmt == "csv" else ndjson_rows(chunks)
+
+
+def detect_format(content_type, filename=None):
+    if (content_type and "csv" in content_type) or (filename and filename.endswith(".csv")):
+        return "csv"
+    return "ndjson"
+
+
+# --------------------------
+# Validation + write
+# --------------------------
+def validation_message(exc):
+    return "; ".join(
+        f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in exc.errors()
+    )
+
+
+def natural_key(doc):
+    return tuple(doc.get(k) for k in NATURAL_KEY)
+
+
+def import_key(doc):
+    return json.dumps(natural_key(doc), separators=(",", ":"))
+
+
+async def write_batch(batch, report, on_batch=None):
+    # batch: [(row_no, validated doc), ...]
+    await locate_many([doc for _, doc in batch])
+    now = datetime.utcnow()
+    ops = [
+        UpdateOne(
+            {k: doc.get(k) for k in NATURAL_KEY},
+            {"$set": {**doc, "import_key": import_key(doc)}, "$setOnInsert": {"created_at": now}},
+            upsert=True,
+        )
+        for _, doc in batch
+    ]
+
+    try:
+        result = (await packages_repo.bulk_write(ops, ordered=False)).bulk_api_result
+    except BulkWriteError as exc:
+        # unordered: every other row in the batch was still written
+        result = exc.details
+
+    failed = set()
+    for err in result.get("writeErrors", []):
+        failed.add(err["index"])
+        if err.get("code") == DUPLICATE_KEY:
+            # a concurrent import inserted the same row first
+            report["skipped"] += 1
+        else:
+            add_error(report, batch[err["index"]][0], err.get("errmsg", "write failed"))
+
+    upserted = {u["index"]: u["_id"] for u in result.get("upserted", [])}
+    report["inserted"] += len(upserted)
+    report["updated"] += len(batch) - len(upserted) - len(failed)
+
+    if on_batch is None:
+        return
+
+    inserted, updated = [], []
+    for i, (_, doc) in enumerate(batch):
+        if i in upserted:
+            inserted.append({**doc, "_id": upserted[i], "created_at": now})
+        elif i not in failed:
+            updated.append(doc)
+
+    if updated:
+        # matched rows: one indexed lookup for the ids of the existing documents
+        found = await packages_repo.find(
+            {
+                "created_by": {"$in": list({d.get("created_by") for d in updated})},
+                "title": {"$in": list({d["title"] for d in updated})},
+            },
+            {k: 1 for k in NATURAL_KEY},
+        )
+        ids = {natural_key(p): p["_id"] for p in found}
+        updated = [{**d, "_id": ids[natural_key(d)]} for d in updated if natural_key(d) in ids]
+
+    await on_batch(inserted, updated)
+
+
+def add_error(report, row_no, message):
+    report["failed"] += 1
+    if len(report["errors"]) < MAX_REPORTED_ERRORS:
+        report["errors"].append({"row": row_no, "error": message})
+
+
+async def import_packages(rows, owner=None, status=None, batch_size=IMPORT_BATCH_SIZE, on_batch=None):
+    """
+    rows: async iterable of (row_number, row_dict, parse_error).
+    owner/status, when given, override the values in every row.
+    on_batch(inserted_docs, updated_docs) runs after each written batch.
+    """
+    report = {"received": 0, "inserted": 0, "updated": 0, "skipped": 0, "failed": 0, "errors": []}
+    started = time.perf_counter()
+    batch = []
+
+    async for row_no, row, error in rows:
+        report["received"] += 1
+        if error:
+            add_error(report, row_no, error)
+            continue
+
+        if owner is not None:
+            row["created_by"] = owner
+        if status is not None:
+            row["status"] = status
+
+        try:
+            # model_dump: .dict() raises a deprecation warning per row
+            doc = PackageCreate.model_validate(row).model_dump()
+        except ValidationError as exc:
+            add_error(report, row_no, validation_message(exc))
+            continue
+
+        batch.append((row_no, doc))
+        if len(batch) >= batch_size:
+            await write_batch(batch, report, on_batch)
+            batch = []
+
+    if batch:
+        await write_batch(batch, report, on_batch)
+
+    report["seconds"] = round(time.perf_counter() - started, 3)
+    return report
@@ -0,0 +1,116 @@
+import base64
+from datetime import datetime
+from fastapi import HTTPException
+from bson import ObjectId, json_util
+from pymongo import ASCENDING, DESCENDING
+
+# --------------------------
+# Keyset (cursor) pagination for list endpoints
+#   ?limit=20                -> first page
+#   ?limit=20&after=<cursor> -> next page
+#   ?fields=title,price      -> projection
+#   ?sort=-price             -> sort key ("-" = descending), _id breaks ties
+# --------------------------
+
+MAX_LIMIT = 500
+
+# what a cursor may hold: values to compare against, never operators
+CURSOR_TYPES = (str, int, float, datetime, ObjectId, type(None))
+
+
+def encode_cursor(values):
+    raw = json_util.dumps(values).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return json_util.loads(base64.urlsafe_b64decode(padded))
+    except Exception:
+        raise HTTPException(400, "Invalid cursor")
+
+
+def parse_sort(sort, allowed):
+    field = sort.lstrip("-") if sort else "_id"
+    if field not in allowed:
+        raise HTTPException(400, f"Cannot sort by '{field}'")
+    direction = DESCENDING if sort and sort.startswith("-") else ASCENDING
+    return field, direction
+
+
+def parse_fields(fields, always=()):
+    if not fields:
+        return None
+    projection = {f.strip(): 1 for f in fields.split(",") if f.strip()}
+    for f in always:
+        projection[f] = 1
+    return projection
+
+
+def keyset_filter(field, direction, cursor_values):
+    if not isinstance(cursor_values, list) or len(cursor_values) != 2:
+        raise HTTPException(400, "Invalid cursor")
+    if not all(isinstance(v, CURSOR_TYPES) for v in cursor_values):
+        # e.g. {"$ne": null} would turn into an operator expression
+        raise HTTPException(400, "Invalid cursor")
+    value, last_id = cursor_values
+    op = "$gt" if direction == ASCENDING else "$lt"
+    if field == "_id":
+        return {"_id": {op: last_id}}
+
+    # Mongo sorts missing/null first, and $gt/$lt never match across types
+    if value is None:
+        if direction == ASCENDING:
+            return {"$or": [{field: {"$ne": None}}, {field: None, "_id": {op: last_id}}]}
+        return {field: None, "_id": {op: last_id}}
+
+    clauses = [
+        {field: {op: value}},
+        {field: value, "_id": {op: last_id}},
+    ]
+    if direction == DESCENDING:
+        clauses.append({field: None})
+    return {"$or": clauses}
+
+
+# --------------------------
+# Run one page against a repository
+# Returns (docs, next_cursor); next_cursor is None on the last page.
+# Without a limit the response keeps the legacy plain list, but is still
+# capped at MAX_LIMIT documents.
+# --------------------------
+async def paginate(repo, query, limit=None, after=None, fields=None, sort=None,
+                   allowed_sorts=("_id",), always_fields=()):
+    field, direction = parse_sort(sort, allowed_sorts)
+    projection = parse_fields(fields, always=(field,) + tuple(always_fields))
+
+    if after:
+        query = {"$and": [query, keyset_filter(field, direction, decode_cursor(after))]}
+
+    order = [(field, direction)]
+    if field != "_id":
+        order.append(("_id", direction))
+
+    # fetch one extra document to know whether another page exists
+    limit = min(limit or MAX_LIMIT, MAX_LIMIT)
+    docs = await repo.find(query, projection, sort=order, limit=limit + 1)
+
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        last = docs[-1]
+        next_cursor = encode_cursor([last.get(field), last["_id"]])
+
+    return docs, next_cursor
+
+
+# --------------------------
+# Paged (or faceted) requests get an envelope; others keep the plain list
+# --------------------------
+def page_response(items, next_cursor, limit, facets=None):
+    if facets is not None:
+        return {"items": items, "next_cursor": next_cursor, "facets": facets}
+    if not limit:
+        return items
+    return {"items": items, "next_cursor": next_cursor}
@@ -0,0 +1,48 @@
+import asyncio
+import os
+from abc import ABC, abstractmethod
+import random
+import uuid
+from utils.payment_mock import process_dummy_payment
+
+# --------------------------
+# Payment gateway interface
+# A gateway takes an amount + booking reference and returns
+# {"payment_id", "status": "success" | "failed", "amount"}.
+#   PAYMENT_GATEWAY              -> mock (default)
+#   PAYMENT_MOCK_LATENCY         -> simulated seconds per charge
+#   PAYMENT_MOCK_FAILURE_RATE    -> 0.0 - 1.0
+# --------------------------
+
+PAYMENT_GATEWAY = os.getenv("PAYMENT_GATEWAY", "mock")
+PAYMENT_MOCK_LATENCY = float(os.getenv("PAYMENT_MOCK_LATENCY", "0"))
+PAYMENT_MOCK_FAILURE_RATE = float(os.getenv("PAYMENT_MOCK_FAILURE_RATE", "0"))
+
+
+class PaymentGateway(ABC):
+    @abstractmethod
+    async def charge(self, amount: float, reference: str):
+        ...
+
+
+class MockGateway(PaymentGateway):
+    def __init__(self, latency=PAYMENT_MOCK_LATENCY, failure_rate=PAYMENT_MOCK_FAILURE_RATE):
+        self.latency = latency
+        self.failure_rate = failure_rate
+
+    async def charge(self, amount: float, reference: str):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if self.failure_rate and random.random() < self.failure_rate:
+            return {"payment_id": str(uuid.uuid4()), "status": "failed", "amount": amount}
+        return process_dummy_payment(amount)
+
+
+GATEWAYS = {
+    "mock": MockGateway,
+}
+
+
+def get_gateway(name=PAYMENT_GATEWAY):
+    return GATEWAYS[name]()
@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import os
+import socket
+from datetime import datetime, timedelta
+from database.repositories import bookings_repo
+from database.rollups import record_booking
+from utils.capacity import release
+from utils.payment_gateway import get_gateway
+
+logger = logging.getLogger("tripsync.payments")
+
+PAYMENT_WORKERS = int(os.getenv("PAYMENT_WORKERS", "8"))
+PAYMENT_DRAIN_TIMEOUT = float(os.getenv("PAYMENT_DRAIN_TIMEOUT", "10"))
+PAYMENT_CHARGE_TIMEOUT = float(os.getenv("PAYMENT_CHARGE_TIMEOUT", "30"))
+PAYMENT_LEASE_SECONDS = float(os.getenv("PAYMENT_LEASE_SECONDS", "120"))
+
+# --------------------------
+# Background payment processing
+# Bookings are stored with payment_status "pending" and their id is put
+# on an in-process queue. Workers claim a booking (pending -> processing,
+# atomic, so two processes never claim the same booking), call the
+# gateway and write the outcome back.
+#
+# A claim records claimed_at / claimed_by and is a lease: recover() only
+# takes back claims older than PAYMENT_LEASE_SECONDS, i.e. left behind by
+# a process that died - never one a live worker is still charging. The
+# gateway call is capped at PAYMENT_CHARGE_TIMEOUT, well inside the lease,
+# and the outcome is only written while the claim is still ours, so a
+# worker whose lease expired never overwrites the one that re-claimed it.
+#
+# A charge that times out or errors may still have gone through: the
+# booking is marked "unknown" (seats kept, never retried automatically)
+# for reconciliation against the gateway, not failed.
+# --------------------------
+
+
+def worker_id():
+    # evaluated per claim: server.py forks its workers after import
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class PaymentWorker:
+    def __init__(self, workers=PAYMENT_WORKERS, gateway=None):
+        self.workers = workers
+        self.gateway = gateway or get_gateway()
+        self.queue = None
+        self.tasks = []
+
+    def start(self):
+        if self.tasks:
+            return
+        self.queue = asyncio.Queue()
+        self.tasks = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+
+    async def stop(self, drain_timeout=0):
+        # let queued payments finish first; anything left stays pending
+        # and is picked up by recover() on the next start
+        if self.tasks and drain_timeout:
+            try:
+                await asyncio.wait_for(self.queue.join(), drain_timeout)
+            except asyncio.TimeoutError:
+                logger.warning("payment queue not drained, %s bookings left pending", self.queue.qsize())
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    def enqueue(self, booking_id):
+        self.start()
+        self.queue.put_nowait(booking_id)
+
+    async def recover(self, lease_seconds=PAYMENT_LEASE_SECONDS):
+        # release expired claims, then queue everything pending; a booking
+        # queued by several processes is still only claimed once
+        # (index: payment_status_claimed_at)
+        cutoff = datetime.utcnow() - timedelta(seconds=lease_seconds)
+        await bookings_repo.update_many(
+            {"payment_status": "processing", "$or": [{"claimed_at": {"$lt": cutoff}}, {"claimed_at": None}]},
+            {"$set": {"payment_status": "pending"}, "$unset": {"claimed_at": "", "claimed_by": ""}},
+        )
+        async for b in bookings_repo.stream({"payment_status": "pending"}, {"_id": 1}):
+            self.enqueue(b["_id"])
+
+    async def _run(self):
+        while True:
+            booking_id = await self.queue.get()
+            try:
+                await self.process(booking_id)
+            except Exception:
+                logger.exception("payment processing failed for booking %s", booking_id)
+            finally:
+                self.queue.task_done()
+
+    async def process(self, booking_id):
+        claimed_by = worker_id()
+        booking = await bookings_repo.find_one_and_update(
+            {"_id": booking_id, "payment_status": "pending"},
+            {"$set": {"payment_status": "processing", "claimed_at": datetime.utcnow(), "claimed_by": claimed_by}},
+        )
+        if booking is None:
+            return  # already claimed elsewhere
+
+        try:
+            payment = await asyncio.wait_for(
+                self.gateway.charge(booking["total"], str(booking_id)), PAYMENT_CHARGE_TIMEOUT
+            )
+        except Exception:
+            # no answer: the charge may or may not have happened
+            logger.exception("gateway error for booking %s, outcome unknown", booking_id)
+            payment = {"payment_id": None, "status": "unknown"}
+
+        booking = await bookings_repo.find_one_and_update(
+            {"_id": booking_id, "payment_status": "processing", "claimed_by": claimed_by},
+            {
+                "$set": {
+                    "payment_id": payment["payment_id"],
+                    "payment_status": payment["status"],
+                    "paid_at": datetime.utcnow() if payment["status"] == "success" else None,
+                },
+                "$unset": {"claimed_at": "", "claimed_by": ""},
+            },
+        )
+
+        if booking is None:
+            logger.error("lease on booking %s expired before the charge finished; result %s dropped",
+                           booking_id, payment["status"])
+            return
+
+        if payment["status"] == "success":
+            await record_booking(booking)
+        elif payment["status"] == "failed" and booking.get("seats_reserved"):
+            # give the seats back
+            await release(booking["package_id"], booking["date"], booking["persons"])
+
+
+payment_worker = PaymentWorker()
@@ -0,0 +1,256 @@
+import logging
+import math
+import os
+import time
+from collections import OrderedDict
+from utils.jwt_helper import verify_token
+from utils.metrics import METRICS, RATE_LIMITED
+
+logger = logging.getLogger("tripsync.ratelimit")
+
+# --------------------------
+# Token-bucket rate limiting per route group
+#   RATE_LIMIT=0                 -> disabled
+#   RATE_LIMIT_BACKEND           -> memory (default, per process) | redis (shared)
+#   RATE_LIMIT_<GROUP>_IP        -> "<burst>/<seconds>" per client IP
+#   RATE_LIMIT_<GROUP>_USER      -> "<burst>/<seconds>" per JWT email
+#                                   ("0" turns that key off)
+#   REDIS_URL                    -> used by the redis backend
+#
+# A bucket holds up to <burst> tokens and refills at burst/seconds per
+# second; each request takes one. An empty bucket answers 429 with
+# Retry-After. Requests outside every group only pay for the path match.
+# The memory backend is per worker process - use redis to share limits
+# across workers and instances.
+# --------------------------
+
+RATE_LIMIT = os.getenv("RATE_LIMIT", "1") == "1"
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_SIZE = int(os.getenv("RATE_LIMIT_SIZE", "100000"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://127.0.0.1:6379/0")
+
+
+def parse_rate(value):
+    # "10/60" -> (capacity 10, refill 10/60 tokens per second); "0" -> None
+    count, _, seconds = value.partition("/")
+    count = int(count)
+    if count <= 0:
+        return None
+    return count, count / float(seconds or 1)
+
+
+def group_rate(group, key, default):
+    return parse_rate(os.getenv(f"RATE_LIMIT_{group.upper()}_{key}", default))
+
+
+class Rule:
+    def __init__(self, group, method, path, prefix=True, query=None):
+        self.group = group
+        self.method = method
+        self.path = path
+        self.prefix = prefix
+        self.query = query          # required query parameter name, as bytes
+
+    def matches(self, method, path, query_string):
+        if method != self.method:
+            return False
+        if not (path.startswith(self.path) if self.prefix else path == self.path):
+            return False
+        if self.query is None:
+            return True
+        return query_string.startswith(self.query + b"=") or b"&" + self.query + b"=" in query_string
+
+
+# (ip rate, user rate) per group; login/register carry no token, so auth is per IP
+LIMITS = {
+    "auth": (group_rate("auth", "IP", "20/60"), None),
+    "booking": (group_rate("booking", "IP", "60/60"), group_rate("booking", "USER", "10/60")),
+    "search": (group_rate("search", "IP", "100/10"), group_rate("search", "USER", "100/10")),
+    "external": (group_rate("external", "IP", "30/60"), group_rate("external", "USER", "30/60")),
+}
+
+RULES = [
+    Rule("auth", "POST", "/api/auth/"),
+    Rule("booking", "POST", "/api/bookings"),
+    Rule("search", "GET", "/api/packages/suggest"),
+    Rule("search", "GET", "/api/packages/", prefix=False, query=b"q"),
+    Rule("external", "GET", "/api/external/"),
+]
+
+
+# --------------------------
+# Backends
+# take(checks) takes one token from each (key, capacity, rate) bucket and
+# returns 0 when the request may proceed, otherwise the seconds until
+# every bucket has a token again. One call (one Redis round trip) per
+# request, however many keys apply.
+# --------------------------
+class MemoryBuckets:
+    def __init__(self, maxsize=RATE_LIMIT_SIZE):
+        self.maxsize = maxsize
+        self.buckets = OrderedDict()   # key -> (tokens, updated_at, full_at), least recently used first
+
+    async def take(self, checks):
+        now = time.monotonic()
+        retry_after = 0.0
+        for key, capacity, rate in checks:
+            retry_after = max(retry_after, self.take_one(key, capacity, rate, now))
+        return retry_after
+
+    def take_one(self, key, capacity, rate, now):
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            tokens = capacity
+            if len(self.buckets) >= self.maxsize:
+                self.sweep(now)
+        else:
+            tokens = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+
+        retry_after = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            retry_after = (1 - tokens) / rate
+        self.buckets[key] = (tokens, now, now + (capacity - tokens) / rate)
+        self.buckets.move_to_end(key)
+        return retry_after
+
+    def sweep(self, now):
+        # a bucket that has refilled completely is the same as no bucket
+        self.buckets = OrderedDict((k, b) for k, b in self.buckets.items() if b[2] > now)
+        # still full: evict the least recently used tenth rather than
+        # everyone's limits, so rotating source IPs cannot reset the table
+        if len(self.buckets) >= self.maxsize:
+            for _ in range(len(self.buckets) - self.maxsize * 9 // 10):
+                self.buckets.popitem(last=False)
+
+
+# atomic refill + take for every key; ARGV holds capacity, rate per key.
+# Uses the server clock so app hosts need not agree on the time.
+TOKEN_BUCKET_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local retry = 0
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[2 * i - 1])
+    local rate = tonumber(ARGV[2 * i])
+    local bucket = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(bucket[1])
+    if tokens == nil then
+        tokens = capacity
+    else
+        tokens = math.min(capacity, tokens + (now - tonumber(bucket[2])) * rate)
+    end
+    if tokens >= 1 then
+        tokens = tokens - 1
+    else
+        retry = math.max(retry, (1 - tokens) / rate)
+    end
+    redis.call('HSET', key, 'tokens', tokens, 'ts', now)
+    redis.call('PEXPIRE', key, math.ceil((capacity - tokens) / rate * 1000) + 1000)
+end
+return tostring(retry)
+"""
+
+
+class RedisBuckets:
+    # works with redis.asyncio.Redis or any compatible fake (e.g. fakeredis)
+    def __init__(self, client, prefix="ratelimit:"):
+        self.client = client
+        self.prefix = prefix
+        self.script = client.register_script(TOKEN_BUCKET_LUA)
+
+    async def take(self, checks):
+        keys, args = [], []
+        for key, capacity, rate in checks:
+            keys.append(self.prefix + key)
+            args += [capacity, rate]
+        return float(await self.script(keys=keys, args=args))
+
+
+def make_backend(name=RATE_LIMIT_BACKEND):
+    if name == "redis":
+        import redis.asyncio as redis   # optional dependency
+        return RedisBuckets(redis.from_url(REDIS_URL))
+    return MemoryBuckets()
+
+
+# --------------------------
+# ASGI middleware
+# Plain ASGI so unmatched requests only cost a scan of the few rules
+# for their method.
+# --------------------------
+def client_ip(scope):
+    # uvicorn's proxy_headers (server.py) already resolved X-Forwarded-For
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def bearer_email(scope):
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer" or not token:
+                return None
+            claims = verify_token(token)
+            if not claims:
+                return None
+            # AuthBearer reuses these claims instead of verifying again
+            scope.setdefault("state", {})["jwt_claims"] = (token, claims)
+            return claims.get("email")
+    return None
+
+
+class RateLimitMiddleware:
+    def __init__(self, app, backend=None, rules=None, limits=None):
+        self.app = app
+        self.backend = backend or make_backend()
+        self.limits = limits or LIMITS
+        self.rules = {}
+        for rule in rules or RULES:
+            self.rules.setdefault(rule.method, []).append(rule)
+
+    def match(self, scope):
+        method, path, query_string = scope["method"], scope["path"], scope["query_string"]
+        for rule in self.rules.get(method, ()):
+            if rule.matches(method, path, query_string):
+                return rule.group
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        group = self.match(scope)
+        if group is None:
+            return await self.app(scope, receive, send)
+
+        ip_rate, user_rate = self.limits[group]
+        checks = []
+        if ip_rate:
+            checks.append((f"{group}:ip:{client_ip(scope)}",) + ip_rate)
+        if user_rate:
+            email = bearer_email(scope)
+            if email:
+                checks.append((f"{group}:user:{email}",) + user_rate)
+
+        try:
+            retry_after = await self.backend.take(checks) if checks else 0.0
+        except Exception:
+            # a broken shared backend must not take the API down with it
+            logger.exception("rate limit backend failed, allowing request")
+            retry_after = 0.0
+
+        if retry_after <= 0:
+            return await self.app(scope, receive, send)
+
+        if METRICS:
+            RATE_LIMITED.inc(group)
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": b'{"detail":"Too many requests"}'})
@@ -0,0 +1,239 @@
+import bisect
+import heapq
+import os
+import re
+from collections import defaultdict
+
+# --------------------------
+# In-process inverted index for package search
+# Replaces the unanchored $regex queries in package_routes.get_packages.
+# User input is only ever tokenized, never compiled as a regex.
+# --------------------------
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Relevance weight of a term per field
+FIELD_WEIGHTS = {
+    "title": 3.0,
+    "location": 3.0,
+    "highlights": 2.0,
+    "description": 1.0,
+}
+
+# Prefix matches score lower than exact term matches
+PREFIX_FACTOR = 0.5
+MIN_PREFIX_LEN = 2
+MAX_PREFIX_EXPANSION = 50
+
+INDEXED_FIELDS = list(FIELD_WEIGHTS) + ["status", "category"]
+
+
+def tokenize(text):
+    if not text:
+        return []
+    if isinstance(text, (list, tuple)):
+        text = " ".join(str(t) for t in text)
+    return TOKEN_RE.findall(str(text).lower())
+
+
+class PackageSearchIndex:
+    def __init__(self):
+        # term -> {weight: {doc_id, ...}}  (impact-ordered postings)
+        self.postings = defaultdict(lambda: defaultdict(set))
+        self.vocab = []                     # sorted terms, for prefix lookups
+        self.doc_terms = {}                 # doc_id -> {term: weight}
+        self.doc_meta = {}                  # doc_id -> (status, category, title)
+        self.token = os.urandom(4).hex()    # tells processes apart in state()
+        self.generation = 0                 # bumped by every write
+        self.by_status = defaultdict(set)
+        self.by_category = defaultdict(set)
+
+    def __len__(self):
+        return len(self.doc_terms)
+
+    def state(self):
+        # changes whenever this index does; part of the cache key for ?q=
+        # lists, so results built from a lagging index are never shared
+        return f"{self.token}.{self.generation}"
+
+    # --------------------------
+    # Write side
+    # --------------------------
+    def add(self, pkg):
+        doc_id = str(pkg["_id"]) if "_id" in pkg else str(pkg["id"])
+        self.remove(doc_id)
+
+        weights = defaultdict(float)
+        for field, weight in FIELD_WEIGHTS.items():
+            for term in tokenize(pkg.get(field)):
+                weights[term] += weight
+
+        for term, weight in weights.items():
+            buckets = self.postings[term]
+            if not buckets:
+                bisect.insort(self.vocab, term)
+            buckets[weight].add(doc_id)
+
+        status, category = pkg.get("status"), pkg.get("category")
+        self.doc_terms[doc_id] = dict(weights)
+        self.doc_meta[doc_id] = (status, category, pkg.get("title", ""))
+        self.by_status[status].add(doc_id)
+        self.by_category[category].add(doc_id)
+
+    def remove(self, doc_id):
+        self.generation += 1
+        doc_id = str(doc_id)
+        terms = self.doc_terms.pop(doc_id, None)
+        meta = self.doc_meta.pop(doc_id, None)
+        if meta:
+            self.by_status[meta[0]].discard(doc_id)
+            self.by_category[meta[1]].discard(doc_id)
+        if not terms:
+            return
+
+        for term, weight in terms.items():
+            buckets = self.postings.get(term)
+            if buckets is None:
+                continue
+            docs = buckets.get(weight)
+            if docs is not None:
+                docs.discard(doc_id)
+                if not docs:
+                    del buckets[weight]
+            if not buckets:
+                del self.postings[term]
+                i = bisect.bisect_left(self.vocab, term)
+                if i < len(self.vocab) and self.vocab[i] == term:
+                    del self.vocab[i]
+
+    def set_status(self, doc_id, status):
+        self.generation += 1
+        doc_id = str(doc_id)
+        meta = self.doc_meta.get(doc_id)
+        if meta:
+            self.by_status[meta[0]].discard(doc_id)
+            self.by_status[status].add(doc_id)
+            self.doc_meta[doc_id] = (status, meta[1], meta[2])
+
+    def clear(self):
+        self.generation += 1
+        self.postings.clear()
+        self.vocab.clear()
+        self.doc_terms.clear()
+        self.doc_meta.clear()
+        self.by_status.clear()
+        self.by_category.clear()
+
+    async def rebuild(self, repo):
+        self.clear()
+        projection = {f: 1 for f in INDEXED_FIELDS}
+        async for pkg in repo.stream({}, projection):
+            self.add(pkg)
+
+    # --------------------------
+    # Read side
+    # --------------------------
+    def _expand(self, term):
+        # exact term + vocabulary terms starting with it
+        matches = []
+        if term in self.postings:
+            matches.append((term, 1.0))
+
+        if len(term) >= MIN_PREFIX_LEN:
+            i = bisect.bisect_left(self.vocab, term)
+            while i < len(self.vocab) and len(matches) < MAX_PREFIX_EXPANSION:
+                candidate = self.vocab[i]
+                if not candidate.startswith(term):
+                    break
+                if candidate != term:
+                    matches.append((candidate, PREFIX_FACTOR))
+                i += 1
+        return matches
+
+    def _groups(self, term):
+        # (score, doc set) pairs for one query term, best score first
+        groups = [
+            (weight * factor, docs)
+            for candidate, factor in self._expand(term)
+            for weight, docs in self.postings[candidate].items()
+        ]
+        groups.sort(key=lambda g: g[0], reverse=True)
+        return groups
+
+    def _allowed(self, status, category):
+        allowed = None
+        if status is not None:
+            allowed = self.by_status.get(status, set())
+        if category is not None:
+            cat = self.by_category.get(category, set())
+            allowed = cat if allowed is None else allowed & cat
+        return allowed
+
+    def _top_single(self, groups, allowed, limit):
+        # groups are impact ordered, so stop as soon as `limit` docs are found
+        out, seen = [], set()
+        for _, docs in groups:
+            hit = docs & allowed if allowed is not None else docs
+            if seen:
+                hit = hit - seen
+            if not hit:
+                continue
+            need = limit - len(out)
+            # ties broken by newest ObjectId first
+            take = heapq.nlargest(need, hit) if len(hit) > need else sorted(hit, reverse=True)
+            out.extend(take)
+            if len(out) >= limit:
+                break
+            seen.update(take)
+        return out
+
+    def search(self, q, status="approved", category=None, limit=None):
+        terms = list(dict.fromkeys(tokenize(q)))
+        if not terms:
+            return []
+
+        per_term = [self._groups(t) for t in terms]
+        if not all(per_term):
+            return []
+
+        allowed = self._allowed(status, category)
+        if len(per_term) == 1 and limit:
+            return self._top_single(per_term[0], allowed, limit)
+
+        # every query term must match (exactly or as a prefix)
+        per_term.sort(key=lambda g: sum(len(d) for _, d in g))
+        candidates = set().union(*(d for _, d in per_term[0]))
+        if allowed is not None:
+            candidates &= allowed
+        for groups in per_term[1:]:
+            if not candidates:
+                return []
+            candidates = set().union(*(d & candidates for _, d in groups))
+        if not candidates:
+            return []
+
+        # a doc scores the best group it appears in, summed over terms
+        scores = dict.fromkeys(candidates, 0.0)
+        for groups in per_term:
+            seen = set()
+            for score, docs in groups:
+                hit = docs & candidates
+                if seen:
+                    hit -= seen
+                for doc_id in hit:
+                    scores[doc_id] += score
+                seen |= hit
+
+        key = lambda item: (item[1], item[0])
+        if limit:
+            ranked = heapq.nlargest(limit, scores.items(), key=key)
+        else:
+            ranked = sorted(scores.items(), key=key, reverse=True)
+        return [doc_id for doc_id, _ in ranked]
+
+    def suggest(self, prefix, status="approved", limit=10):
+        ids = self.search(prefix, status=status, limit=limit)
+        return [{"id": doc_id, "title": self.doc_meta[doc_id][2]} for doc_id in ids]
+
+
+search_index = PackageSearchIndex()
@@ -0,0 +1,60 @@
+import json
+from datetime import date, datetime
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+
+# --------------------------
+# Response encoding
+# Mongo documents go straight to JSON bytes with orjson: ObjectIds and
+# datetimes are handled by the encoder, so there is no jsonable_encoder
+# pass that rebuilds every dict and list first (~40x faster on a 10k
+# package listing, see benchmarks/bench_serialization.py).
+#
+# Routes that return a plain dict still work (FastAPI encodes it, then
+# MongoJSONResponse renders it); list endpoints return json_response(...)
+# directly. Their response_model then documents the shape only - FastAPI
+# does not re-validate a Response object.
+# --------------------------
+
+try:
+    import orjson   # optional speed-up; stdlib json is the fallback
+except ImportError:
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    return str(value)   # Decimal128, UUID, ...
+
+
+if orjson is not None:
+    def dumps(content):
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+else:
+    def dumps(content):
+        return json.dumps(content, default=_default, separators=(",", ":")).encode()
+
+
+class MongoJSONResponse(JSONResponse):
+    def render(self, content):
+        return dumps(content)
+
+
+def json_response(content, status_code=200, headers=None):
+    return MongoJSONResponse(content, status_code=status_code, headers=headers)
+
+
+# --------------------------
+# Mongo doc -> API item
+# In place (no copy): "_id" becomes the string "id"; hidden fields are dropped.
+# --------------------------
+def serialize_doc(doc, hidden=()):
+    doc["id"] = str(doc.pop("_id"))
+    for field in hidden:
+        doc.pop(field, None)
+    return doc
@@ -16,7 +16,8 @@ export default function PopularCarousel() {
     async function load() {
       try {
         const res = await api.get("/packages?limit=6");
-        setBanners(res.data || []);
+        // ?limit= responses are paged: {items, next_cursor}
+        setBanners(res.data?.items || []);
         // wait a tick so CSS/layout stabilizes before Slick calculates sizes
         setTimeout(() => setReady(true), 50);
       } catch (e) {